@@ -0,0 +1,90 @@
+import os
+import logging
+import tkinter as tk
+
+
+class AssetCache:
+    """Launcher images, resized once and cached on disk.
+
+    Each resized icon, and each GIF flattened into a horizontal strip of
+    resized frames, is saved as a PNG named after the source file, the target
+    size and the source's mtime. Tk decodes those PNGs natively, so a warm
+    start never imports PIL or walks GIF frames. A changed source file gets a
+    new cache name. Images are also kept in memory and only built on first
+    request.
+    """
+
+    def __init__(self, cache_dir, resource_path=None):
+        self.cache_dir = cache_dir
+        self.resource_path = resource_path or (lambda relative_path: relative_path)
+        self.images = {}  # (path, size) -> PhotoImage or list of PhotoImage frames
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(__name__)
+
+    def icon(self, relative_path, size):
+        """A PhotoImage of the image at `relative_path` resized to `size` (width, height)."""
+        key = (relative_path, size)
+        if key not in self.images:
+            cached_path = self._cached_path(relative_path, size, "png")
+            if not os.path.exists(cached_path):
+                self._build(relative_path, size, cached_path, strip=False)
+            else:
+                self.hits += 1
+            self.images[key] = tk.PhotoImage(file=cached_path)
+        return self.images[key]
+
+    def frames(self, relative_path, size):
+        """Every frame of an animated GIF resized to `size`, as a list of PhotoImages."""
+        key = (relative_path, size)
+        if key not in self.images:
+            cached_path = self._cached_path(relative_path, size, "strip.png")
+            if not os.path.exists(cached_path):
+                self._build(relative_path, size, cached_path, strip=True)
+            else:
+                self.hits += 1
+            strip = tk.PhotoImage(file=cached_path)
+            width, height = size
+            frames = []
+            for index in range(strip.width() // width):
+                frame = tk.PhotoImage(width=width, height=height)
+                frame.tk.call(frame, "copy", strip, "-from", index * width, 0, (index + 1) * width, height)
+                frames.append(frame)
+            self.images[key] = frames
+        return self.images[key]
+
+    def _cached_path(self, relative_path, size, suffix):
+        source = self.resource_path(relative_path)
+        name = os.path.splitext(os.path.basename(source))[0].replace(" ", "_")
+        mtime = os.stat(source).st_mtime_ns
+        return os.path.join(self.cache_dir, f"{name}-{size[0]}x{size[1]}-{mtime}.{suffix}")
+
+    def _build(self, relative_path, size, cached_path, strip):
+        """Decode and resize with PIL (imported only on a cache miss) and write the cached PNG."""
+        from PIL import Image, ImageSequence
+
+        self.misses += 1
+        with Image.open(self.resource_path(relative_path)) as source:
+            if strip:
+                frames = [frame.convert("RGBA").resize(size) for frame in ImageSequence.Iterator(source)]
+                image = Image.new("RGBA", (size[0] * len(frames), size[1]))
+                for index, frame in enumerate(frames):
+                    image.paste(frame, (index * size[0], 0))
+            else:
+                image = source.convert("RGBA").resize(size)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._remove_stale(cached_path)
+        temp_path = cached_path + ".tmp"
+        image.save(temp_path, format="PNG")
+        os.replace(temp_path, cached_path)
+
+    def _remove_stale(self, cached_path):
+        """Delete cache files for older versions of the same source and size."""
+        prefix = os.path.basename(cached_path).rsplit("-", 1)[0] + "-"
+        suffix = os.path.basename(cached_path).split(".", 1)[1]
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):].split(".", 1)[0].isdigit():
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
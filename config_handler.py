@@ -13,10 +13,59 @@ class ConfigHandler:
         self.sql_user = ""
         self.sql_database = ""
         self.sql_port = 3306  # Default port for MySQL/MariaDB
+        self.sql_pool_size = 5  # Pooled connections shared by the SQL tab and background jobs
+        self.sql_query_timeout = 30  # Seconds before the server aborts a statement (0 disables)
+        self.sql_reconnect_attempts = 5  # Reconnect attempts, with backoff, after the database goes away
+        self.sql_transfer_batch_size = 5000  # Rows per chunk when exporting or importing tables
+        self.sql_transfer_transaction_rows = 50000  # Rows per commit when importing tables
+        self.sql_cache_enabled = False  # Reuse results of repeated SELECTs from the SQL tab
+        self.sql_cache_max_bytes = 32 * 1024 * 1024  # Memory the query result cache may use
+        self.sql_cache_ttl = 30  # Seconds a cached result is served before it is re-read
+        self.sql_status_probe_interval = 5  # Seconds between background database health checks
+        self.sql_query_library = "assets/config/queries.json"  # Saved queries shown in the SQL tab
+        self.sql_prepared_cache_size = 32  # Prepared statements kept per pooled connection
+        self.sql_result_max_rows = 100000  # Rows of a SQL tab result kept in memory for the grid
+        self.sql_backup_dir = ""  # Where database backups go; asked for each time when empty
+        self.sql_backup_workers = 4  # Connections dumping or restoring tables in parallel
+        self.sql_backup_chunk_rows = 100000  # Rows per compressed backup chunk file
+        self.sql_backup_compression = "gzip"  # Backup chunk compression: "gzip" or "zstd"
+        self.api_host = "127.0.0.1"  # Headless control API address; keep it local unless api_token is set
+        self.api_port = 8089
+        self.api_token = ""  # Required in an X-Launcher-Token header when set
+        self.metrics_port = 0  # Serve OpenMetrics on /metrics at this port alongside the GUI; 0 disables
         self.auto_start_servers = False  # Default to False for auto-start servers
         self.text_color = "#ffffff"  # Default text color
         self.bg_color = "#1e1e1e"  # Default background color
-        
+        self.log_flush_interval_ms = 50  # How often the GUI drains queued server output
+        self.log_max_lines_per_frame = 2000  # Max lines inserted into the log tabs per tick
+        self.log_view_max_lines = 100000  # Lines each server tab keeps searchable; older ones are trimmed
+        self.log_store_path = "logs/log_index.sqlite3"  # Parsed, searchable server output
+        self.log_store_retention_hours = 72  # Parsed records older than this are pruned
+        self.log_buffer_max_lines = 5000  # Lines of each server stream kept in memory
+        self.log_buffer_max_bytes = 1024 * 1024  # Bytes of each server stream kept in memory
+        self.log_rotate_bytes = 64 * 1024 * 1024  # Rotate server log files at this size
+        self.log_rotate_seconds = 24 * 3600  # ...or after this many seconds
+        self.log_compression = "gzip"  # Compression for rotated log files: "gzip", "zstd" or None
+        self.process_rescan_interval = 300  # Seconds between full process table scans
+        self.restart_policy = {"backoff_initial": 1.0, "backoff_max": 60.0, "max_restarts": 5, "window": 300}
+        self.crash_loop_threshold = 3  # Identical crashes that hold a server's automatic restarts...
+        self.crash_loop_window = 600  # ...when they happen within this many seconds
+        self.server_dependencies = {"Map Server": ["World Server"]}  # Servers that must be up before another starts
+        # Readiness signals used when starting all servers: "log_pattern" regex and/or TCP "port"
+        self.server_readiness = {
+            name: {"log_pattern": r"(?i)\b(ready|listening)\b"}
+            for name in ("World Server", "Search Server", "Map Server", "Connect Server")
+        }
+        self.server_ready_timeout = 30  # Seconds to wait for a ready signal before moving on
+        # Optional xi_map shards, e.g. {"name": "Map Server 1", "port": 54230, "cpu_affinity": [0, 1], "zones": [[0, 150]]}
+        self.map_instances = []
+        self.asset_cache_dir = "assets/cache"  # Pre-resized icons and GIF frame strips
+        self.resource_sample_interval = 1.0  # Seconds between host resource samples
+        self.resource_history_samples = 600  # Raw samples kept; minute and hour averages are kept for longer
+        self.resource_process_detail_interval = 30.0  # Seconds between per-process USS/open files/connections reads
+        self.resource_refresh_ms = 1000  # Chart refresh rate while the Resources tab is visible
+        self.resource_hidden_refresh_ms = 5000  # How often to check for the tab while it is hidden
+        self.players_poll_interval = 5  # Seconds between players-online polls while the Resources tab is shown
 
     def load_config(self):
         """Load configuration from file."""
@@ -29,9 +78,54 @@ class ConfigHandler:
                 self.sql_user = config.get("sql_user", "")
                 self.sql_database = config.get("sql_database", "")
                 self.sql_port = config.get("sql_port", 3306)  # Load the port or default to 3306
+                self.sql_pool_size = config.get("sql_pool_size", 5)
+                self.sql_query_timeout = config.get("sql_query_timeout", 30)
+                self.sql_reconnect_attempts = config.get("sql_reconnect_attempts", 5)
+                self.sql_transfer_batch_size = config.get("sql_transfer_batch_size", 5000)
+                self.sql_transfer_transaction_rows = config.get("sql_transfer_transaction_rows", 50000)
+                self.sql_cache_enabled = config.get("sql_cache_enabled", False)
+                self.sql_cache_max_bytes = config.get("sql_cache_max_bytes", 32 * 1024 * 1024)
+                self.sql_cache_ttl = config.get("sql_cache_ttl", 30)
+                self.sql_status_probe_interval = config.get("sql_status_probe_interval", 5)
+                self.sql_query_library = config.get("sql_query_library", "assets/config/queries.json")
+                self.sql_prepared_cache_size = config.get("sql_prepared_cache_size", 32)
+                self.sql_result_max_rows = config.get("sql_result_max_rows", 100000)
+                self.sql_backup_dir = config.get("sql_backup_dir", "")
+                self.sql_backup_workers = config.get("sql_backup_workers", 4)
+                self.sql_backup_chunk_rows = config.get("sql_backup_chunk_rows", 100000)
+                self.sql_backup_compression = config.get("sql_backup_compression", "gzip")
+                self.api_host = config.get("api_host", "127.0.0.1")
+                self.api_port = config.get("api_port", 8089)
+                self.api_token = config.get("api_token", "")
+                self.metrics_port = config.get("metrics_port", 0)
                 self.auto_start_servers = config.get("auto_start_servers", False)
                 self.text_color = config.get("text_color", "#ffffff")
                 self.bg_color = config.get("bg_color", "#1e1e1e")
+                self.log_flush_interval_ms = config.get("log_flush_interval_ms", 50)
+                self.log_max_lines_per_frame = config.get("log_max_lines_per_frame", 2000)
+                self.log_view_max_lines = config.get("log_view_max_lines", 100000)
+                self.log_store_path = config.get("log_store_path", "logs/log_index.sqlite3")
+                self.log_store_retention_hours = config.get("log_store_retention_hours", 72)
+                self.log_buffer_max_lines = config.get("log_buffer_max_lines", 5000)
+                self.log_buffer_max_bytes = config.get("log_buffer_max_bytes", 1024 * 1024)
+                self.log_rotate_bytes = config.get("log_rotate_bytes", 64 * 1024 * 1024)
+                self.log_rotate_seconds = config.get("log_rotate_seconds", 24 * 3600)
+                self.log_compression = config.get("log_compression", "gzip")
+                self.process_rescan_interval = config.get("process_rescan_interval", 300)
+                self.restart_policy = config.get("restart_policy", self.restart_policy)
+                self.crash_loop_threshold = config.get("crash_loop_threshold", 3)
+                self.crash_loop_window = config.get("crash_loop_window", 600)
+                self.server_dependencies = config.get("server_dependencies", self.server_dependencies)
+                self.server_readiness = config.get("server_readiness", self.server_readiness)
+                self.server_ready_timeout = config.get("server_ready_timeout", 30)
+                self.map_instances = config.get("map_instances", [])
+                self.asset_cache_dir = config.get("asset_cache_dir", "assets/cache")
+                self.resource_sample_interval = config.get("resource_sample_interval", 1.0)
+                self.resource_history_samples = config.get("resource_history_samples", 600)
+                self.resource_process_detail_interval = config.get("resource_process_detail_interval", 30.0)
+                self.resource_refresh_ms = config.get("resource_refresh_ms", 1000)
+                self.resource_hidden_refresh_ms = config.get("resource_hidden_refresh_ms", 5000)
+                self.players_poll_interval = config.get("players_poll_interval", 5)
             return True
         else:
             self.text_color = "#ffffff"
@@ -54,9 +148,54 @@ class ConfigHandler:
             "sql_user": self.sql_user,
             "sql_database": self.sql_database,
             "sql_port": self.sql_port,
+            "sql_pool_size": self.sql_pool_size,
+            "sql_query_timeout": self.sql_query_timeout,
+            "sql_reconnect_attempts": self.sql_reconnect_attempts,
+            "sql_transfer_batch_size": self.sql_transfer_batch_size,
+            "sql_transfer_transaction_rows": self.sql_transfer_transaction_rows,
+            "sql_cache_enabled": self.sql_cache_enabled,
+            "sql_cache_max_bytes": self.sql_cache_max_bytes,
+            "sql_cache_ttl": self.sql_cache_ttl,
+            "sql_status_probe_interval": self.sql_status_probe_interval,
+            "sql_query_library": self.sql_query_library,
+            "sql_prepared_cache_size": self.sql_prepared_cache_size,
+            "sql_result_max_rows": self.sql_result_max_rows,
+            "sql_backup_dir": self.sql_backup_dir,
+            "sql_backup_workers": self.sql_backup_workers,
+            "sql_backup_chunk_rows": self.sql_backup_chunk_rows,
+            "sql_backup_compression": self.sql_backup_compression,
+            "api_host": self.api_host,
+            "api_port": self.api_port,
+            "api_token": self.api_token,
+            "metrics_port": self.metrics_port,
             "auto_start_servers": self.auto_start_servers,
             "text_color": self.text_color,
-            "bg_color": self.bg_color
+            "bg_color": self.bg_color,
+            "log_flush_interval_ms": self.log_flush_interval_ms,
+            "log_max_lines_per_frame": self.log_max_lines_per_frame,
+            "log_view_max_lines": self.log_view_max_lines,
+            "log_store_path": self.log_store_path,
+            "log_store_retention_hours": self.log_store_retention_hours,
+            "log_buffer_max_lines": self.log_buffer_max_lines,
+            "log_buffer_max_bytes": self.log_buffer_max_bytes,
+            "log_rotate_bytes": self.log_rotate_bytes,
+            "log_rotate_seconds": self.log_rotate_seconds,
+            "log_compression": self.log_compression,
+            "process_rescan_interval": self.process_rescan_interval,
+            "restart_policy": self.restart_policy,
+            "crash_loop_threshold": self.crash_loop_threshold,
+            "crash_loop_window": self.crash_loop_window,
+            "server_dependencies": self.server_dependencies,
+            "server_readiness": self.server_readiness,
+            "server_ready_timeout": self.server_ready_timeout,
+            "map_instances": self.map_instances,
+            "asset_cache_dir": self.asset_cache_dir,
+            "resource_sample_interval": self.resource_sample_interval,
+            "resource_history_samples": self.resource_history_samples,
+            "resource_process_detail_interval": self.resource_process_detail_interval,
+            "resource_refresh_ms": self.resource_refresh_ms,
+            "resource_hidden_refresh_ms": self.resource_hidden_refresh_ms,
+            "players_poll_interval": self.players_poll_interval
         }
 
         # Save the config to file
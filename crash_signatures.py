@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+
+# Volatile parts of a crash message that differ between otherwise identical crashes
+_NORMALIZERS = [
+    (re.compile(r"^\s*(\[[^\]]*\d{1,2}:\d{2}:\d{2}[^\]]*\]\s*)+"), ""),  # Leading timestamps
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),  # Addresses
+    (re.compile(r"\b[0-9a-fA-F]{8,}\b"), "<id>"),  # Bare hex ids
+    (re.compile(r"\d+"), "#"),  # Counters, ids, pids, line numbers
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_line(line):
+    """Strip timestamps, addresses and numbers so repeats of one crash read the same."""
+    for pattern, replacement in _NORMALIZERS:
+        line = pattern.sub(replacement, line)
+    return line.strip()
+
+
+def fingerprint(server_name, returncode, tail, lines=8):
+    """Signature of a crash: a short hash of the server, the exit code and the last non-empty normalized lines.
+
+    The server is part of the hash so two servers (or map instances) dying
+    with the same code and the same or an empty tail never share an entry.
+    """
+    normalized = [normalize_line(line) for line in tail]
+    normalized = [line for line in normalized if line][-lines:]
+    digest = hashlib.sha1(f"{server_name}\n{returncode}\n".encode("utf-8", "replace")
+                          + "\n".join(normalized).encode("utf-8", "replace"))
+    return digest.hexdigest()[:16], normalized
+
+
+class CrashIndex:
+    """Every distinct crash signature seen, persisted as JSON next to the crash logs.
+
+    Each entry keeps the server, exit code, normalized tail, count, first and
+    last seen times and the one crash log written for it, so repeats of a
+    known crash are appended to that log instead of creating a new file. It
+    also remembers each server's recent crashes to spot a crash loop: the same
+    signature `threshold` times within `window` seconds.
+    """
+
+    def __init__(self, path, threshold=3, window=600):
+        self.path = path
+        self.threshold = threshold
+        self.window = window
+        self.signatures = {}  # signature -> entry dict
+        self.recent = {}  # server name -> deque of (monotonic time, signature)
+        self.lock = threading.Lock()  # Exit handlers for different servers run in parallel
+        self.logger = logging.getLogger(__name__)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                self.signatures = json.load(file)
+        except FileNotFoundError:
+            self.signatures = {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to read crash signatures from {self.path}: {e}")
+            self.signatures = {}
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.signatures, indent=4)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                file.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Failed to save crash signatures to {self.path}: {e}")
+
+    def record(self, server_name, returncode, tail):
+        """Count one crash and return (signature, entry, crash_loop)."""
+        signature, normalized = fingerprint(server_name, returncode, tail)
+        now = time.time()
+        with self.lock:
+            entry = self.signatures.get(signature)
+            if entry is None:
+                entry = self.signatures[signature] = {
+                    "server": server_name, "returncode": returncode, "tail": normalized,
+                    "count": 0, "first_seen": now, "last_seen": now, "log_file": None
+                }
+            entry["count"] += 1
+            entry["last_seen"] = now
+
+            recent = self.recent.setdefault(server_name, deque())
+            moment = time.monotonic()
+            recent.append((moment, signature))
+            while recent and moment - recent[0][0] > self.window:
+                recent.popleft()
+            crash_loop = sum(1 for _, seen in recent if seen == signature) >= self.threshold
+        return signature, entry, crash_loop
+
+    def reset(self, server_name):
+        """Forget a server's recent crashes, e.g. when it is started by hand."""
+        with self.lock:
+            self.recent.pop(server_name, None)
+
+    def summary(self, server_name=None):
+        """Entries sorted by count, most frequent first, optionally for one server."""
+        with self.lock:
+            entries = [
+                dict(entry, signature=signature) for signature, entry in self.signatures.items()
+                if server_name is None or entry["server"] == server_name
+            ]
+        return sorted(entries, key=lambda entry: entry["count"], reverse=True)
@@ -0,0 +1,348 @@
+import time
+LAUNCH_TIME = time.perf_counter()
+
+import os
+import sys
+import json
+import signal
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+from config_handler import ConfigHandler
+from server_manager import ServerManager
+from resource_monitor import ResourceMonitor
+from log_store import LogStore
+from metrics import REGISTRY, CONTENT_TYPE
+
+# Headless entry point: no tkinter, PIL or matplotlib is imported anywhere below.
+# SQLManager (and mysql.connector) is imported on a background thread, and only
+# when a database host is configured, so it never delays startup.
+
+
+class ControlAPI:
+    """Local JSON API for running the launcher without the GUI.
+
+    GET  /metrics                             OpenMetrics exposition for Prometheus
+    GET  /api/status                          every server's state
+    GET  /api/servers/<name>/log?lines=200&stream=stdout
+    GET  /api/metrics                         host and per-server resource usage
+    GET  /api/logs?server=&level=&since=&text=&limit=   parsed log records
+    POST /api/servers/<name>/start | /stop
+    POST /api/servers/<name>/auto-restart     body {"enabled": true}
+    POST /api/start-all | /api/stop-all
+
+    Server names use their normal spelling, URL-encoded ("Map%20Server").
+    It binds to localhost by default. POSTs must be sent as
+    Content-Type: application/json, and a browser Origin must match the Host,
+    so a web page can't drive the API with a plain form post. Without a token,
+    the Host header must name this machine's loopback address, which blocks
+    DNS rebinding. When `token` is set, every request must send it in an
+    X-Launcher-Token header.
+    """
+
+    def __init__(self, server_manager, resource_monitor, log_store=None, host="127.0.0.1", port=8089, token=""):
+        self.server_manager = server_manager
+        self.resource_monitor = resource_monitor
+        self.log_store = log_store
+        self.sql_manager = None  # Set once the database connection is up
+        self.host = host
+        self.port = port
+        self.token = token
+        self.routes = {}  # (method, path) -> handler(query, body) returning (status, payload)
+        self.prefix_routes = []  # (method, prefix, suffix, handler(name, query, body))
+        self.httpd = None
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+        self.route("GET", "/metrics", lambda query, body: (200, REGISTRY.render(), CONTENT_TYPE))
+        self.route("GET", "/api/status", lambda query, body: (200, self.status()))
+        self.route("GET", "/api/metrics", lambda query, body: (200, self.metrics()))
+        self.route("GET", "/api/logs", self.search_logs)
+        self.route("POST", "/api/start-all", self.start_all)
+        self.route("POST", "/api/stop-all", self.stop_all)
+        self.server_route("GET", "/log", self.log_tail)
+        self.server_route("POST", "/start", self.start_server)
+        self.server_route("POST", "/stop", self.stop_server)
+        self.server_route("POST", "/auto-restart", self.set_auto_restart)
+
+    def route(self, method, path, handler):
+        """Register handler(query, body) -> (status, payload[, content type]) for an exact path."""
+        self.routes[(method, path)] = handler
+
+    def server_route(self, method, suffix, handler):
+        """Register handler(server_name, query, body) for /api/servers/<name><suffix>."""
+        self.prefix_routes.append((method, "/api/servers/", suffix, handler))
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.handle(self, "GET")
+
+            def do_POST(self):
+                api.handle(self, "POST")
+
+            def log_message(self, format, *args):
+                api.logger.debug(format % args)
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="ControlAPI")
+        self._thread.start()
+        self.logger.info(f"Control API listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def handle(self, request, method):
+        if self.token and request.headers.get("X-Launcher-Token") != self.token:
+            return self._reply(request, 401, {"error": "missing or wrong X-Launcher-Token"})
+        host = request.headers.get("Host", "")
+        if not self.token and host not in self.local_hosts():
+            return self._reply(request, 403, {"error": f"requests must be addressed to this machine, not {host}"})
+        if method == "POST":
+            content_type = request.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+            if content_type != "application/json":
+                return self._reply(request, 415, {"error": "POST requests must be sent as application/json"})
+            origin = request.headers.get("Origin")
+            if origin and urlparse(origin).netloc != host:
+                return self._reply(request, 403, {"error": f"cross-origin request from {origin} refused"})
+        url = urlparse(request.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = {}
+        try:
+            length = int(request.headers.get("Content-Length") or 0)
+            if length:
+                body = json.loads(request.rfile.read(length))
+        except ValueError:
+            return self._reply(request, 400, {"error": "bad Content-Length or request body is not valid JSON"})
+
+        try:
+            handler = self.routes.get((method, url.path))
+            if handler:
+                return self._reply(request, *handler(query, body))
+            for route_method, prefix, suffix, server_handler in self.prefix_routes:
+                if route_method == method and url.path.startswith(prefix) and url.path.endswith(suffix):
+                    server_name = unquote(url.path[len(prefix):len(url.path) - len(suffix)])
+                    if server_name not in self.server_manager.servers:
+                        return self._reply(request, 404, {"error": f"unknown server: {server_name}"})
+                    return self._reply(request, *server_handler(server_name, query, body))
+            self._reply(request, 404, {"error": f"no route for {method} {url.path}"})
+        except Exception as e:
+            self.logger.error(f"Control API {method} {url.path} failed: {e}")
+            self._reply(request, 500, {"error": str(e)})
+
+    def local_hosts(self):
+        """Host header values accepted without a token."""
+        names = {self.host, "localhost", "127.0.0.1", "[::1]"}
+        return {f"{name}:{self.port}" for name in names} | (names if self.port == 80 else set())
+
+    @staticmethod
+    def _reply(request, status, payload, content_type=None):
+        if isinstance(payload, (bytes, str)):
+            data, content_type = payload, content_type or "text/plain; charset=utf-8"
+        else:
+            data, content_type = json.dumps(payload), "application/json"
+        data = data.encode("utf-8") if isinstance(data, str) else data
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def status(self):
+        manager = self.server_manager
+        pids = manager.get_server_pids()
+        servers = {}
+        for server_name in manager.server_names():
+            policy = manager.get_restart_policy(server_name)
+            servers[server_name] = {
+                "running": manager.is_server_running(server_name),
+                "pid": pids.get(server_name),
+                "auto_restart": policy.enabled,
+                "restart_hold": getattr(policy, "held", None),
+                "recent_restarts": len(getattr(policy, "restart_times", ()))
+            }
+        sql_connected = self.sql_manager.is_connected() if self.sql_manager else None
+        return {"servers": servers, "sql_connected": sql_connected, "uptime": time.perf_counter() - LAUNCH_TIME}
+
+    def metrics(self):
+        monitor = self.resource_monitor
+        host = {metric: monitor.latest(metric) for metric in ("cpu", "memory", "disk", "net_sent", "net_recv")}
+        return {"host": host, "servers": monitor.get_process_metrics()}
+
+    def search_logs(self, query, body):
+        if not self.log_store:
+            return 404, {"error": "the log store is disabled"}
+        records = self.log_store.search(
+            server=query.get("server"),
+            level=query.get("level"),
+            subsystem=query.get("subsystem"),
+            since=float(query["since"]) if query.get("since") else None,
+            text=query.get("text"),
+            limit=int(query.get("limit", 1000))
+        )
+        columns = ("ts", "server", "stream", "level", "subsystem", "zone", "message")
+        return 200, {"records": [dict(zip(columns, record)) for record in records]}
+
+    def log_tail(self, server_name, query, body):
+        stream = query.get("stream", "stdout")
+        buffers = self.server_manager.server_logs.get(server_name)
+        if not buffers or stream not in buffers:
+            return 200, {"lines": []}
+        return 200, {"lines": buffers[stream].tail(int(query.get("lines", 200)))}
+
+    def start_server(self, server_name, query, body):
+        # The callback stays registered as the server's output callback after this request,
+        # so it forwards to the log and only collects what is emitted while the request runs
+        messages = []
+        collecting = [True]
+
+        def output_callback(message):
+            if collecting:
+                messages.append(message)
+            log_server_message(server_name, message)
+
+        process = self.server_manager.start_server(server_name, output_callback)
+        collecting.clear()
+        return (200 if process else 409), {"started": bool(process), "messages": messages}
+
+    def stop_server(self, server_name, query, body):
+        # stop_server waits for the process to exit, so keep it off the request thread
+        threading.Thread(target=self.server_manager.stop_server, args=(server_name,), daemon=True).start()
+        return 202, {"stopping": server_name}
+
+    def set_auto_restart(self, server_name, query, body):
+        enabled = bool(body.get("enabled", True))
+        self.server_manager.set_auto_restart(server_name, enabled)
+        return 200, {"auto_restart": enabled}
+
+    def start_all(self, query, body):
+        self.server_manager.start_all_servers(log_server_message)
+        return 202, {"starting": self.server_manager.server_names()}
+
+    def stop_all(self, query, body):
+        for server_name in self.server_manager.server_names():
+            threading.Thread(target=self.server_manager.stop_server, args=(server_name,), daemon=True).start()
+        return 202, {"stopping": self.server_manager.server_names()}
+
+
+def log_server_message(server_name, message):
+    """Output callback for headless runs: log launcher notices, skip the per-line output."""
+    # Output lines already reach the ring buffers, log files and log store
+    if not message.startswith(f"[{server_name}]["):
+        logging.getLogger("servers").info(message)
+
+
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        filename='ffxi_server_manager.log',
+        filemode='a'
+    )
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    console.setFormatter(logging.Formatter('%(name)-12s: %(levelname)-8s %(message)s'))
+    logging.getLogger('').addHandler(console)
+
+
+def connect_sql(config_handler, api):
+    """Connect to the configured database in the background. The password comes from XI_SQL_PASSWORD."""
+    logger = logging.getLogger(__name__)
+    from sql_manager import SQLManager
+    from query_cache import QueryCache
+
+    sql_manager = SQLManager(
+        pool_size=config_handler.sql_pool_size,
+        query_timeout=config_handler.sql_query_timeout,
+        reconnect_attempts=config_handler.sql_reconnect_attempts,
+        prepared_cache_size=config_handler.sql_prepared_cache_size,
+        query_cache=QueryCache(
+            enabled=config_handler.sql_cache_enabled,
+            max_bytes=config_handler.sql_cache_max_bytes,
+            ttl=config_handler.sql_cache_ttl
+        )
+    )
+    if sql_manager.connect(config_handler.sql_host, config_handler.sql_user, os.environ.get("XI_SQL_PASSWORD", ""),
+                           config_handler.sql_database, config_handler.sql_port):
+        logger.info(f"Connected to database {config_handler.sql_database} on {config_handler.sql_host}")
+        api.server_manager.set_zone_shard_writer(sql_manager.execute_statements)
+    else:
+        logger.error(f"Could not connect to database on {config_handler.sql_host}")
+    api.sql_manager = sql_manager
+
+
+def main():
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    logger.info("Starting FFXI Server Manager (headless)")
+
+    config_handler = ConfigHandler()
+    config_handler.load_config()
+
+    server_manager = ServerManager(
+        config_handler.server_dir,
+        log_max_lines=config_handler.log_buffer_max_lines,
+        log_max_bytes=config_handler.log_buffer_max_bytes,
+        log_output_dir=config_handler.log_output_dir,
+        log_rotate_bytes=config_handler.log_rotate_bytes,
+        log_rotate_seconds=config_handler.log_rotate_seconds,
+        log_compression=config_handler.log_compression,
+        process_rescan_interval=config_handler.process_rescan_interval,
+        restart_policy_options=config_handler.restart_policy,
+        server_dependencies=config_handler.server_dependencies,
+        server_readiness=config_handler.server_readiness,
+        ready_timeout=config_handler.server_ready_timeout,
+        map_instances=config_handler.map_instances,
+        crash_loop_threshold=config_handler.crash_loop_threshold,
+        crash_loop_window=config_handler.crash_loop_window
+    )
+    for server_name in server_manager.server_names():
+        server_manager.set_auto_restart(server_name, True)  # Same default as the GUI's restart checkboxes
+
+    log_store = LogStore(config_handler.log_store_path, retention=config_handler.log_store_retention_hours * 3600)
+    log_store.start()
+    server_manager.add_line_listener(log_store.add)
+
+    resource_monitor = ResourceMonitor(
+        resolution=config_handler.resource_sample_interval,
+        retention=config_handler.resource_history_samples,
+        detail_interval=config_handler.resource_process_detail_interval
+    )
+    resource_monitor.set_process_source(server_manager.get_server_pids)
+    resource_monitor.start()
+
+    api = ControlAPI(server_manager, resource_monitor, log_store,
+                     host=config_handler.api_host, port=config_handler.api_port, token=config_handler.api_token)
+    api.start()
+
+    if config_handler.sql_host:
+        threading.Thread(target=connect_sql, args=(config_handler, api), daemon=True, name="SQLConnect").start()
+    if config_handler.auto_start_servers:
+        server_manager.start_all_servers(log_server_message)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    logger.info(f"Launcher ready in {(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms")
+    # Wake up periodically so signals are handled promptly on Windows
+    while not stop_event.wait(1):
+        pass
+
+    logger.info("Shutting down FFXI Server Manager...")
+    api.stop()
+    for server_name in server_manager.server_names():
+        server_manager.stop_server(server_name)
+    resource_monitor.stop()
+    log_store.stop()
+    if api.sql_manager:
+        api.sql_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
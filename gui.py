@@ -6,27 +6,34 @@ from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 import threading
 import logging
-from PIL import Image, ImageTk
-import psutil  # For resource monitoring
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import time
 from datetime import datetime
-import mysql.connector
 import tkinter.colorchooser as colorchooser
 import sys
 import tkinter.messagebox as messagebox
+import tkinter.simpledialog as simpledialog
 import subprocess
-from updater import check_and_update, get_local_version, is_newer_version, download_and_install_update
 import json
+import queue
+from log_bus import LogBus
+from result_grid import ResultGrid
+from sql_jobs import QueryCancelled
+from query_library import QueryLibrary
+from asset_cache import AssetCache
+from player_tracker import PlayerTracker
+from players_panel import PlayersPanel
+from sql_status import SQLStatusController
+from log_view import LogView
+from concurrent.futures import ThreadPoolExecutor
 
 class GUI:
-    def __init__(self, root, config_handler, server_manager, resource_monitor, sql_manager, version):
+    def __init__(self, root, config_handler, server_manager, resource_monitor, sql_manager, version, backup_engine=None):
         self.root = root
         self.config_handler = config_handler
         self.server_manager = server_manager
         self.resource_monitor = resource_monitor
         self.sql_manager = sql_manager
+        self.backup_engine = backup_engine
         self.version = version  # Store the version
 
         self.log_output_dir = self.config_handler.log_output_dir or "No directory selected"
@@ -44,11 +51,16 @@ class GUI:
         self.server_text_logs = {}
         self.server_tabs = {}
 
-        # Load icons for server buttons
-        self.load_icons()
+        # Server output is queued here by the reader threads and drained on the Tk thread
+        self.log_bus = LogBus(max_lines_per_frame=self.config_handler.log_max_lines_per_frame)
+        self.ui_calls = queue.SimpleQueue()  # Callbacks posted by worker threads, run on the Tk thread
+        self.log_search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LogSearch")
+        self.current_query_job = None
+        self.first_rows_elapsed = 0.0  # Time to the first page of the result in the grid
 
-        # Load SQL connection status GIFs (IMPORTANT)
-        self.load_sql_status_icons()  # Ensure this is called here
+        # Icons are resized once and cached on disk; the status GIFs load when the SQL tab is first shown
+        self.assets = AssetCache(self.config_handler.asset_cache_dir, self.resource_path)
+        self.load_icons()
 
         # Set up the GUI layout with tabs
         self.setup_layout()
@@ -61,8 +73,14 @@ class GUI:
         self.apply_text_color(self.current_text_color)
         self.apply_background_color(self.current_bg_color)
 
+        # Start draining queued log lines into the server tabs and worker callbacks
+        self.flush_log_bus()
+        self.process_ui_calls()
+
         if self.auto_start_servers_var.get():
             self.start_all_servers()  # Auto-start servers if the checkbox is selected
+        else:
+            self.rescan_processes()  # Show servers that are already running, e.g. after a launcher restart
             
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
        
@@ -108,12 +126,15 @@ class GUI:
         
     def on_closing(self):
         """Handle cleanup on application exit."""
-        # Stop all servers before exiting
-        self.stop_all_servers()
+        # Stop all servers before exiting; each stop is bounded by its kill timeout
+        for thread in self.stop_all_servers():
+            thread.join()
+        self.result_grid.close()  # Stop a result still reading pages in the background
 
         # Any other cleanup (e.g., saving settings, logs, etc.)
         self.log_message("Shutting down FFXI Server Manager...")
         self.save_auto_start_setting()
+        self.sql_status.stop()
         # Destroy the main window (close the application)
         self.root.quit()  # Use `quit()` to ensure the entire application shuts down
         self.root.destroy()
@@ -129,60 +150,8 @@ class GUI:
 
     # Example usage to load an icon
     #icon_path = resource_path('assets/images/icon.png')
-    def load_sql_status_icons(self):
-        """Load images used for connection status (animated GIFs for both connected and disconnected)."""
-        try:
-            # Load the connected GIF and store the frames
-            self.connected_gif = Image.open(self.resource_path("assets/images/connected.gif"))
-            self.connected_gif_frames = []
-            for frame_index in range(self.get_gif_frame_count(self.connected_gif)):
-                self.connected_gif.seek(frame_index)
-                frame = self.connected_gif.copy().resize((30, 30)).convert('RGBA')
-                self.connected_gif_frames.append(ImageTk.PhotoImage(frame))
-
-            # Load the disconnected GIF and store the frames
-            self.disconnected_gif = Image.open(self.resource_path("assets/images/disconnected.gif"))
-            self.disconnected_gif_frames = []
-            for frame_index in range(self.get_gif_frame_count(self.disconnected_gif)):
-                self.disconnected_gif.seek(frame_index)
-                frame = self.disconnected_gif.copy().resize((30, 30)).convert('RGBA')
-                self.disconnected_gif_frames.append(ImageTk.PhotoImage(frame))
-
-            # Initialize frame index for animation
-            self.gif_frame_index = 0
-            self.current_gif_frames = self.disconnected_gif_frames  # Default to disconnected GIF
-        except Exception as e:
-            logging.error(f"Error loading status icons: {e}")
-
-
-    
-    def get_gif_frame_count(self, gif_image):
-        """Helper function to get the number of frames in a GIF."""
-        frame_count = 0
-        try:
-            while True:
-                gif_image.seek(frame_count)
-                frame_count += 1
-        except EOFError:
-            pass  # Reached the end of the GIF
-        return frame_count        
     
     
-    def animate_sql_status(self):
-        """Animate the connection status icon using the current GIF frames."""
-        if hasattr(self, 'current_gif_frames') and self.current_gif_frames:
-            frame = self.current_gif_frames[self.gif_frame_index]
-            self.sql_status_icon.config(image=frame)
-
-            # Update the frame index
-            self.gif_frame_index = (self.gif_frame_index + 1) % len(self.current_gif_frames)
-
-            # Continue the animation after 100 milliseconds
-            self.root.after(160, self.animate_sql_status)
-
-
-
-    
 
     def clear_results(self):
         """Clear any unread results before executing a new query."""
@@ -192,23 +161,27 @@ class GUI:
 
     def load_icons(self):
         """Load images used for server buttons and actions."""
-        self.world_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/world_icon.png")).resize((60, 60)))
-        self.search_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/search_icon.png")).resize((60, 60)))
-        self.map_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/map_icon.png")).resize((60, 60)))
-        self.connect_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/connect_icon.png")).resize((60, 60)))
-        self.start_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/start_icon.png")).resize((60, 60)))
-        self.stop_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/stop_icon.png")).resize((60, 60)))
+        self.world_icon = self.assets.icon("assets/images/world_icon.png", (60, 60))
+        self.search_icon = self.assets.icon("assets/images/search_icon.png", (60, 60))
+        self.map_icon = self.assets.icon("assets/images/map_icon.png", (60, 60))
+        self.connect_icon = self.assets.icon("assets/images/connect_icon.png", (60, 60))
+        self.start_icon = self.assets.icon("assets/images/start_icon.png", (60, 60))
+        self.stop_icon = self.assets.icon("assets/images/stop_icon.png", (60, 60))
+
+    def load_sql_status_frames(self, connected):
+        """Frames of the connected or disconnected status GIF, resized for the SQL tab."""
+        gif = "assets/images/connected.gif" if connected else "assets/images/disconnected.gif"
+        return self.assets.frames(gif, (30, 30))
 
     def update_sql_status_icon(self, connected):
-        """Update the connection status icon based on the connection state."""
-        if connected:
-            self.current_gif_frames = self.connected_gif_frames  # Use connected GIF frames
-        else:
-            self.current_gif_frames = self.disconnected_gif_frames  # Use disconnected GIF frames
+        """Show a known connection state right away and have the status probe confirm it."""
+        self.sql_status.set_state(connected)
+        self.sql_status.probe_now()
 
-        # Start animating from the first frame of the selected GIF
-        self.gif_frame_index = 0
-        self.animate_sql_status()
+    def on_sql_status_changed(self, connected):
+        """Called by the status controller only when the connection state flips."""
+        state = "active" if connected else "not active"
+        self.log_message(f"Database connection is {state}.", "SQL")
 
 
     def setup_layout(self):
@@ -221,15 +194,15 @@ class GUI:
         self.notebook.add(self.main_tab, text='Main Control')
 
         # Resource Monitoring Tab
-        #self.resource_tab = tk.Frame(self.notebook, bg='#1e1e1e')
-        #self.notebook.add(self.resource_tab, text='Resources')
+        self.resource_tab = tk.Frame(self.notebook, bg='#1e1e1e')
+        self.notebook.add(self.resource_tab, text='Resources')
 
         # SQL Management Tab
         self.sql_tab = tk.Frame(self.notebook, bg='#1e1e1e')
         self.notebook.add(self.sql_tab, text='SQL Management')
 
         self.setup_main_tab()
-        #self.setup_resource_tab()
+        self.setup_resource_tab()
         self.setup_sql_tab()
 
     def setup_main_tab(self):
@@ -238,7 +211,7 @@ class GUI:
         self.sidebar = tk.Frame(self.main_tab, width=200, bg='#333333')
         self.sidebar.pack(side=tk.LEFT, fill=tk.Y)
 
-        self.exit_icon = ImageTk.PhotoImage(Image.open(self.resource_path("assets/images/exit.png")).resize((60, 60)))
+        self.exit_icon = self.assets.icon("assets/images/exit.png", (60, 60))
 
         # Add the exit button at the bottom of the sidebar
         self.exit_button = tk.Button(
@@ -259,6 +232,55 @@ class GUI:
         self.add_server_buttons()
         self.add_auto_restart_and_directories()
         
+    def setup_resource_tab(self):
+        """Configure the Resources tab with streaming host and per-server charts and the players online panel."""
+        self.player_tracker = PlayerTracker(self.sql_manager, instance_for_zone=self.server_manager.get_zone_instance)
+        self.players_poll = None  # Future of the poll in flight
+        self.players_panel = PlayersPanel(self.resource_tab, self.player_tracker)
+        self.players_panel.pack(side=tk.BOTTOM, fill=tk.X)
+        self.resource_charts = None  # Built the first time the tab is shown, matplotlib is slow to import
+        # Draw right away when the tab is opened instead of waiting for the slow hidden-tab tick
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_notebook_tab_changed, add="+")
+        self.update_resource_tab()
+
+    def on_notebook_tab_changed(self, event):
+        if self.notebook.select() == str(self.resource_tab):
+            self.get_resource_charts().refresh()
+
+    def get_resource_charts(self):
+        if self.resource_charts is None:
+            from resource_charts import ResourceCharts
+            self.resource_charts = ResourceCharts(self.resource_tab, self.resource_monitor)
+        return self.resource_charts
+
+    def update_resource_tab(self):
+        """Refresh the resource charts, throttled to a slow idle check while the tab is hidden."""
+        if self.notebook.select() == str(self.resource_tab):
+            self.get_resource_charts().refresh()
+            self.poll_players()
+            delay = self.config_handler.resource_refresh_ms
+        else:
+            delay = self.config_handler.resource_hidden_refresh_ms
+        self.root.after(delay, self.update_resource_tab)
+
+    def poll_players(self):
+        """Start an incremental players-online poll on the SQL worker pool if one is due."""
+        if self.sql_manager.pool is None or (self.players_poll and not self.players_poll.done()):
+            return
+        last_poll = self.player_tracker.last_poll
+        if last_poll and time.time() - last_poll < self.config_handler.players_poll_interval:
+            return
+        self.players_poll = self.sql_manager.executor.submit(self.player_tracker.poll)
+        self.players_poll.add_done_callback(lambda future: self.call_on_ui_thread(self.on_players_polled, future))
+
+    def on_players_polled(self, future):
+        error = future.exception()
+        if error:
+            self.player_tracker.last_poll = time.time()  # Wait a full interval before trying again
+            self.players_panel.summary_label.config(text=f"Players online: unavailable ({error})")
+            return
+        self.players_panel.update(future.result())
+
     def setup_menu_bar(self):
         """Create the menu bar with Exit and Settings options."""
         menu_bar = tk.Menu(self.root)
@@ -311,7 +333,12 @@ class GUI:
         # Button to choose log output directory
         tk.Button(settings_window, text="Browse...", command=self.choose_log_directory).pack(pady=5)
          # Add 'Check for Updates' button
-        tk.Button(settings_window, text="Check for Updates", command=check_and_update).pack(pady=20)
+        tk.Button(settings_window, text="Check for Updates", command=self.check_for_updates).pack(pady=20)
+
+    def check_for_updates(self):
+        """Run the updater; it pulls in requests, so it's only imported when asked for."""
+        from updater import check_and_update
+        check_and_update()
     
 
    
@@ -360,10 +387,7 @@ class GUI:
         # Initialize BooleanVars for each server's checkbox if they aren't initialized already
         if not self.restart_checkboxes:
             self.restart_checkboxes = {
-                "World Server": tk.BooleanVar(value=True),
-                "Search Server": tk.BooleanVar(value=True),
-                "Connect Server": tk.BooleanVar(value=True),
-                "Map Server": tk.BooleanVar(value=True),
+                server_name: tk.BooleanVar(value=True) for server_name in self.server_manager.server_names()
             }
     
          # Create the checkboxes for each server
@@ -372,9 +396,11 @@ class GUI:
                 self.sidebar, text=f"Auto-Restart {server}",
                 variable=self.restart_checkboxes[server],
                 bg='#555555', fg='black',
-                onvalue=True, offvalue=False
+                onvalue=True, offvalue=False,
+                command=lambda s=server: self.server_manager.set_auto_restart(s, self.restart_checkboxes[s].get())
             )
             checkbox.pack(pady=5, anchor="w")
+            self.server_manager.set_auto_restart(server, self.restart_checkboxes[server].get())
 
         saved_auto_start_value = self.config_handler.get_auto_start_servers()
         # Add a checkbox for auto-starting servers when the program loads
@@ -395,6 +421,9 @@ class GUI:
         self.stop_all_button = tk.Button(self.sidebar, text="Stop All Servers", command=self.stop_all_servers, bg='#dc3545', fg='#ffffff')
         self.stop_all_button.pack(pady=10, fill=tk.X)
 
+        self.rescan_button = tk.Button(self.sidebar, text="Find Running Servers", command=self.rescan_processes, bg='#555555', fg='#ffffff')
+        self.rescan_button.pack(pady=10, fill=tk.X)
+
     def choose_server_directory(self):
         """Prompt the user to select the server directory and update the settings window."""
         self.settings_window.attributes('-topmost', False)
@@ -437,12 +466,15 @@ class GUI:
 
     def add_server_buttons(self):
         """Create buttons for starting and stopping each server and initialize their tabs."""
+        # One entry per managed server; every map instance gets its own tab
         servers_with_icons = [
-            ("World Server", self.world_icon, self.stop_world_server),
-            ("Search Server", self.search_icon, self.stop_search_server),
-            ("Map Server", self.map_icon, self.stop_map_server),
-            ("Connect Server", self.connect_icon, self.stop_connect_server),
-    ]
+            (
+                server_name,
+                getattr(self, f"{self.server_manager.servers[server_name]['icon']}_icon"),
+                lambda s=server_name: self.stop_server(s)
+            )
+            for server_name in self.server_manager.server_names()
+        ]
 
         for server_name, icon, stop_function in servers_with_icons:
             # Create a button for each server in the sidebar
@@ -458,9 +490,10 @@ class GUI:
             self.server_tabs[server_name] = server_frame
             self.server_notebook.add(server_frame, text=server_name)
 
-            # Add a text log area for each server in its respective tab
-            self.server_text_logs[server_name] = ScrolledText(
-                server_frame, height=20, width=60, bg='#2e2e2e', fg='#ffffff', insertbackground='#ffffff'
+            # Virtualized log view for each server; only the visible lines live in the widget
+            self.server_text_logs[server_name] = LogView(
+                server_frame, self.log_search_executor, self.call_on_ui_thread,
+                max_lines=self.config_handler.log_view_max_lines
             )
             self.server_text_logs[server_name].pack(fill=tk.BOTH, expand=True)
 
@@ -485,39 +518,20 @@ class GUI:
         """Start the selected server and begin monitoring it."""
         process = self.server_manager.start_server(server_name, lambda line: self.log_message(line, server_name))
         if process:  # Ensure the process object is returned
+            # Crash detection and auto-restart are handled by the ServerManager's supervisor
             self.log_message(f"Started {server_name} with PID: {process.pid}", server_name)
-
-            def restart_if_needed():
-                current_process = process  # Track the current process in this thread
-                while True:
-                    if current_process.poll() is not None:  # Process stopped
-                        self.log_message(f"{server_name} has stopped.", server_name)
-                        if self.restart_checkboxes[server_name].get():  # Check auto-restart flag
-                            self.log_message(f"Restarting {server_name} due to crash...", server_name)
-                            new_process = self.server_manager.start_server(server_name, lambda line: self.log_message(line, server_name))
-                            current_process = new_process  # Update the process reference to the new one
-                        else:
-                            break
-                    time.sleep(1)
-
-            # Start the monitoring thread without passing `args` since restart_if_needed doesn't need it
-            threading.Thread(target=restart_if_needed, daemon=True).start()
         else:
             self.log_message(f"Failed to start {server_name}.", server_name)
 
 
 
     def stop_server(self, server_name):
-        """Stop the selected server and kill the process, only if it's running."""
-        process = self.server_manager.processes.get(server_name)
-    
-        if process and process.poll() is None:  # Ensure the process is running before attempting to stop
-            self.log_message(f"Stopping {server_name}...")
-            process.terminate()  # Gracefully terminate the process
-            process.wait()  # Wait for the process to fully terminate
-            self.log_message(f"{server_name} has been stopped.")
-        else:
-            self.log_message(f"No running process found for {server_name}.")
+        """Stop a server on a background thread; waiting for the process to exit would freeze the Tk loop."""
+        thread = threading.Thread(
+            target=self.server_manager.stop_server, args=(server_name,), daemon=True, name=f"Stop {server_name}"
+        )
+        thread.start()
+        return thread
 
     def save_server_log(self, server_name):
         """Save the server log to the selected log output directory."""
@@ -525,8 +539,8 @@ class GUI:
             self.log_message("Please choose a log output directory.")
             return
 
-        # Get the log content from the text widget
-        log_content = self.server_text_logs[server_name].get("1.0", tk.END)
+        # Everything still held by the log view, not just the lines on screen
+        log_content = self.server_text_logs[server_name].get_text()
 
         # Create the log file name with the server name and timestamp
         log_filename = f"{server_name}_{self.get_timestamp()}.txt"
@@ -546,38 +560,86 @@ class GUI:
 
     def stop_world_server(self):
         """Stop only the World Server (xi_world.exe)."""
-        self.server_manager.stop_server("World Server")
+        self.stop_server("World Server")
 
     def stop_search_server(self):
         """Stop only the Search Server (xi_search.exe)."""
-        self.server_manager.stop_server("Search Server")
+        self.stop_server("Search Server")
 
     def stop_map_server(self):
         """Stop only the Map Server (xi_map.exe)."""
-        self.server_manager.stop_server("Map Server")
+        self.stop_server("Map Server")
 
     def stop_connect_server(self):
         """Stop only the Connect Server (xi_connect.exe)."""
-        self.server_manager.stop_server("Connect Server")
+        self.stop_server("Connect Server")
 
 
     def start_all_servers(self):
-        """Start all servers at once."""
-        for server_name in self.server_text_logs.keys():
-            self.start_server(server_name)
+        """Start all servers in dependency order, in parallel where dependencies allow."""
+        self.server_manager.start_all_servers(
+            lambda server_name, message: self.log_message(message, server_name),
+            server_names=list(self.server_text_logs.keys())
+        )
 
     def stop_all_servers(self):
-        """Stop all servers by calling their respective stop functions."""
-        self.stop_world_server()
-        self.stop_search_server()
-        self.stop_map_server()
-        self.stop_connect_server()
+        """Stop all servers, including every map instance, in parallel. Returns the stopping threads."""
+        return [self.stop_server(server_name) for server_name in self.server_manager.server_names()]
+
+    def rescan_processes(self):
+        """Adopt servers started outside the launcher; the process table scan runs off the Tk thread."""
+        self.rescan_button.config(state=tk.DISABLED)
+
+        def scan():
+            try:
+                found = self.server_manager.rescan_processes()
+            except Exception as e:
+                self.call_on_ui_thread(self.on_rescan_done, {}, e)
+                return
+            self.call_on_ui_thread(self.on_rescan_done, found, None)
+
+        threading.Thread(target=scan, daemon=True, name="ProcessRescan").start()
+
+    def on_rescan_done(self, found, error):
+        self.rescan_button.config(state=tk.NORMAL)
+        if error:
+            self.log_to_error_log(f"Failed to scan for running servers: {error}")
+            return
+        for server_name, pid in found.items():
+            self.log_message(f"{server_name} is running (PID {pid}).", server_name)
 
     def log_message(self, message, server_name=None):
-        """Display log messages in the appropriate server's log window."""
+        """Queue a log message for the appropriate server's log window. Safe to call from any thread."""
         if server_name and server_name in self.server_text_logs:
-            self.server_text_logs[server_name].insert(tk.END, message + '\n')
-            self.server_text_logs[server_name].see(tk.END)
+            self.log_bus.push(server_name, message)
+
+    def call_on_ui_thread(self, func, *args):
+        """Run func(*args) on the Tk thread. Safe to call from any thread."""
+        self.ui_calls.put((func, args))
+
+    def process_ui_calls(self):
+        """Run callbacks posted by worker threads."""
+        while True:
+            try:
+                func, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"UI callback {func} failed: {e}")
+        self.root.after(self.config_handler.log_flush_interval_ms, self.process_ui_calls)
+
+    def flush_log_bus(self):
+        """Drain queued log lines on the Tk thread with one append per server tab."""
+        for server_name, lines in self.log_bus.drain().items():
+            log_view = self.server_text_logs.get(server_name)
+            if log_view:
+                log_view.append(lines)
+
+        # Come back almost immediately while a burst is still queued, otherwise idle at the configured rate
+        delay = 1 if self.log_bus.pending() else self.config_handler.log_flush_interval_ms
+        self.root.after(delay, self.flush_log_bus)
 
    
 
@@ -621,12 +683,69 @@ class GUI:
         self.query_text = ScrolledText(self.sql_tab, height=10, width=100, bg='#2e2e2e', fg='#ffffff', insertbackground='#ffffff')
         self.query_text.pack(pady=10, padx=10)
 
+        # Saved, parameterised queries run as prepared statements
+        self.query_library = QueryLibrary(self.config_handler.sql_query_library)
+        self.query_library.load()
+        library_controls = tk.Frame(self.sql_tab, bg='#1e1e1e')
+        library_controls.pack(pady=5)
+        tk.Label(library_controls, text="Saved Queries:", fg="white", bg='#1e1e1e').pack(side=tk.LEFT, padx=5)
+        self.saved_query_var = tk.StringVar()
+        self.saved_query_combo = ttk.Combobox(library_controls, textvariable=self.saved_query_var, state="readonly", width=40,
+                                              values=self.query_library.names())
+        self.saved_query_combo.pack(side=tk.LEFT, padx=5)
+        self.saved_query_combo.bind("<<ComboboxSelected>>", self.on_saved_query_selected)
+        self.run_saved_query_button = tk.Button(library_controls, text="Run Saved", command=self.run_saved_query, bg='#28a745', fg='#ffffff')
+        self.run_saved_query_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(library_controls, text="Reload", command=self.reload_query_library, bg='#555555', fg='#ffffff').pack(side=tk.LEFT, padx=5)
+        self.saved_query_description = tk.Label(library_controls, text="", bg='#1e1e1e', fg='#aaaaaa')
+        self.saved_query_description.pack(side=tk.LEFT, padx=5)
+
         # Button to execute the query
-        self.execute_query_button = tk.Button(self.sql_tab, text="Execute Query", command=self.execute_query, bg='#28a745', fg='#ffffff')
-        self.execute_query_button.pack(pady=5)
+        query_controls = tk.Frame(self.sql_tab, bg='#1e1e1e')
+        query_controls.pack(pady=5)
+
+        self.execute_query_button = tk.Button(query_controls, text="Execute Query", command=self.execute_query, bg='#28a745', fg='#ffffff')
+        self.execute_query_button.pack(side=tk.LEFT, padx=5)
+
+        # Cancel stops the running statement on the server with KILL QUERY
+        self.cancel_query_button = tk.Button(query_controls, text="Cancel Query", command=self.cancel_query, bg='#dc3545', fg='#ffffff', state=tk.DISABLED)
+        self.cancel_query_button.pack(side=tk.LEFT, padx=5)
+
+        # Bulk table export/import (CSV, or Parquet when pyarrow is installed)
+        self.export_table_button = tk.Button(query_controls, text="Export Table", command=self.export_table, bg='#555555', fg='#ffffff')
+        self.export_table_button.pack(side=tk.LEFT, padx=5)
+        self.import_table_button = tk.Button(query_controls, text="Import Table", command=self.import_table, bg='#555555', fg='#ffffff')
+        self.import_table_button.pack(side=tk.LEFT, padx=5)
+
+        # Whole-database backup/restore from a consistent snapshot, in parallel
+        self.backup_button = tk.Button(query_controls, text="Backup DB", command=self.backup_database, bg='#555555', fg='#ffffff')
+        self.backup_button.pack(side=tk.LEFT, padx=5)
+        self.restore_button = tk.Button(query_controls, text="Restore DB", command=self.restore_database, bg='#555555', fg='#ffffff')
+        self.restore_button.pack(side=tk.LEFT, padx=5)
+
+        self.query_progress = ttk.Progressbar(query_controls, mode='indeterminate', length=150)
+        self.query_progress.pack(side=tk.LEFT, padx=5)
+
+        self.query_status_label = tk.Label(query_controls, text="", bg='#1e1e1e', fg='#ffffff')
+        self.query_status_label.pack(side=tk.LEFT, padx=5)
+
+        # Opt-in result cache for repeated SELECTs, with its hit/miss counters
+        self.query_cache_var = tk.BooleanVar(value=self.sql_manager.query_cache.enabled)
+        self.query_cache_checkbox = tk.Checkbutton(
+            query_controls, text="Cache results", variable=self.query_cache_var, command=self.toggle_query_cache,
+            bg='#1e1e1e', fg='#ffffff', selectcolor='#2e2e2e'
+        )
+        self.query_cache_checkbox.pack(side=tk.LEFT, padx=5)
+        self.query_cache_label = tk.Label(query_controls, text="", bg='#1e1e1e', fg='#aaaaaa')
+        self.query_cache_label.pack(side=tk.LEFT, padx=5)
+        self.update_query_cache_label()
+
+        # Virtualized grid for result rows; only the visible window is kept in the widget
+        self.result_grid = ResultGrid(self.sql_tab, on_progress=self.update_result_summary)
+        self.result_grid.pack(fill=tk.BOTH, expand=True, pady=5, padx=10)
 
-        # Text box to display the query result
-        self.result_text = ScrolledText(self.sql_tab, height=10, width=100, bg='#2e2e2e', fg='#ffffff', insertbackground='#ffffff')
+        # Text box for query status messages
+        self.result_text = ScrolledText(self.sql_tab, height=5, width=100, bg='#2e2e2e', fg='#ffffff', insertbackground='#ffffff')
         self.result_text.pack(pady=10, padx=10)
 
          # Add a new tab for Errors/Logs
@@ -641,9 +760,17 @@ class GUI:
         self.sql_status_label.pack(side=tk.LEFT, padx=10, pady=10)
 
         # Display the initial status as disconnected (use the first frame of the disconnected GIF)
-        self.sql_status_icon = tk.Label(self.sql_tab, image=self.disconnected_gif_frames[6], bg='#1e1e1e')
+        self.sql_status_icon = tk.Label(self.sql_tab, bg='#1e1e1e')
         self.sql_status_icon.pack(side=tk.LEFT, padx=5, pady=10)
 
+        # One background probe and one animation timer drive the icon
+        self.sql_status = SQLStatusController(
+            self.root, self.sql_manager, self.sql_status_icon,
+            self.load_sql_status_frames, self.call_on_ui_thread,
+            probe_interval=self.config_handler.sql_status_probe_interval, on_change=self.on_sql_status_changed
+        )
+        self.sql_status.start()
+
         # Clear Query button to clear the query input text box
         self.clear_query_button = tk.Button(self.sql_tab, text="Clear Query", command=self.clear_query, bg='#ffcc00', fg='#000000')
         self.clear_query_button.pack(pady=5)
@@ -673,7 +800,7 @@ class GUI:
     def disconnect_sql(self):
         """Disconnect from the SQL database."""
         try:
-            if self.sql_manager.is_connected():
+            if self.sql_manager.pool is not None:
                 self.sql_manager.close()  # Disconnect from the database
                 self.log_message("Successfully disconnected from the SQL database.", "SQL")
                 self.update_sql_status_icon(connected=False)  # Switch to disconnected GIF
@@ -713,26 +840,239 @@ class GUI:
 
     
     def execute_query(self):
-        """Trigger query execution from the SQLManager."""
+        """Run the query on the SQLManager worker pool so the Tk loop stays responsive."""
         query = self.query_text.get("1.0", tk.END).strip()
-        if query:
-            # Clear previous results before displaying new ones
-            self.result_text.delete("1.0", tk.END)
-            self.sql_manager.execute_query(query)
-        else:
+        if not query:
             self.result_text.insert(tk.END, "Please enter a SQL query.\n")
+            return
+        if self.current_query_job:
+            self.log_to_error_log("A query is already running. Cancel it or wait for it to finish.")
+            return
 
+        self.start_query(lambda: self.sql_manager.open_stream(query))
+
+    def start_query(self, submit):
+        """Clear the previous result and run the job returned by submit(), showing it when done."""
+        self.result_text.delete("1.0", tk.END)
+        self.result_grid.close()
+        job = submit()
+        self.current_query_job = job
+        job.future.add_done_callback(lambda future: self.call_on_ui_thread(self.on_query_done, job))
+
+        self.execute_query_button.config(state=tk.DISABLED)
+        self.run_saved_query_button.config(state=tk.DISABLED)
+        self.cancel_query_button.config(state=tk.NORMAL)
+        self.query_status_label.config(text="Running...")
+        self.query_progress.start(10)
+
+    def on_saved_query_selected(self, event=None):
+        named_query = self.query_library.get(self.saved_query_var.get())
+        self.saved_query_description.config(text=named_query.description if named_query else "")
+
+    def run_saved_query(self):
+        """Prompt for a saved query's parameters and run it as a prepared statement."""
+        named_query = self.query_library.get(self.saved_query_var.get())
+        if not named_query:
+            self.log_to_error_log("Choose a saved query first.")
+            return
+        if self.current_query_job:
+            self.log_to_error_log("A query is already running. Cancel it or wait for it to finish.")
+            return
+        values = []
+        for label in named_query.params:
+            value = simpledialog.askstring(named_query.name, f"{label}:", parent=self.root)
+            if value is None:
+                return
+            values.append(value)
+        self.start_query(lambda: self.sql_manager.submit_prepared(named_query.sql, values))
+
+    def reload_query_library(self):
+        """Re-read the saved query file after it has been edited."""
+        self.query_library.load()
+        self.saved_query_combo.config(values=self.query_library.names())
+        if self.saved_query_var.get() not in self.query_library.queries:
+            self.saved_query_var.set("")
+        self.on_saved_query_selected()
+
+    def export_table(self):
+        """Ask for a table and a destination file, then stream the table out on the worker pool."""
+        table = simpledialog.askstring("Export Table", "Table to export:", parent=self.root)
+        if not table:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.root, defaultextension=".csv", initialfile=f"{table}.csv",
+            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")]
+        )
+        if path:
+            file_format = "parquet" if path.lower().endswith(".parquet") else "csv"
+            self.start_transfer(
+                "Exported", table, path,
+                lambda progress: self.sql_manager.submit_export(table, path, file_format, progress)
+            )
 
-    def check_connection_status(self):
-        """Check if the database connection is active and update the status icon."""
-        if self.sql_manager.is_connected():
-            self.log_message("Database connection is active.", "SQL")
-            self.update_sql_status_icon(connected=True)
-        else:
-            self.log_message("Database connection is not active.", "SQL")
-            self.update_sql_status_icon(connected=False)
+    def import_table(self):
+        """Ask for a source file and a target table, then load it on the worker pool."""
+        path = filedialog.askopenfilename(parent=self.root, filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")])
+        if not path:
+            return
+        default_table = os.path.splitext(os.path.basename(path))[0]
+        table = simpledialog.askstring("Import Table", "Table to import into:", initialvalue=default_table, parent=self.root)
+        if table:
+            file_format = "parquet" if path.lower().endswith(".parquet") else "csv"
+            self.start_transfer(
+                "Imported", table, path,
+                lambda progress: self.sql_manager.submit_import(table, path, file_format, progress)
+            )
+
+    def backup_database(self):
+        """Back up the whole database into a new folder under the configured backup directory."""
+        if not self.backup_engine or self.sql_manager.connection_config is None:
+            self.log_to_error_log("Connect to the database before taking a backup.")
+            return
+        directory = self.config_handler.sql_backup_dir or filedialog.askdirectory(parent=self.root, title="Backup Directory")
+        if directory:
+            database = self.sql_manager.connection_config["database"]
+            self.start_transfer(
+                "Backed up", database, directory,
+                lambda progress: self.backup_engine.submit_backup(directory, progress)
+            )
+
+    def restore_database(self):
+        """Restore a backup folder over the connected database after confirmation."""
+        if not self.backup_engine or self.sql_manager.connection_config is None:
+            self.log_to_error_log("Connect to the database before restoring a backup.")
+            return
+        folder = filedialog.askdirectory(parent=self.root, title="Backup To Restore",
+                                         initialdir=self.config_handler.sql_backup_dir or None)
+        if not folder:
+            return
+        database = self.sql_manager.connection_config["database"]
+        if not messagebox.askyesno("Restore Database",
+                                   f"Replace every table in '{database}' with the backup in {folder}?", parent=self.root):
+            return
+        self.start_transfer(
+            "Restored", database, folder,
+            lambda progress: self.backup_engine.submit_restore(folder, progress)
+        )
 
-        # Schedule the next check in 1000 milliseconds (1 second)
-        self.root.after(1000, self.check_connection_status)  
+    def start_transfer(self, verb, table, path, submit):
+        """Run an export, import, backup or restore job with a live progress readout.
 
+        submit(progress) starts the job and returns its QueryJob.
+        """
+        if self.current_query_job:
+            self.log_to_error_log("A query is already running. Cancel it or wait for it to finish.")
+            return
 
+        def progress(rows, total):
+            # total is an estimated row count for exports and a fraction of the file for imports
+            if total is None:
+                text = f"{verb} {rows} rows"
+            elif isinstance(total, float):
+                text = f"{verb} {rows} rows ({total:.0%})"
+            else:
+                text = f"{verb} {rows} of ~{total} rows"
+            self.call_on_ui_thread(self.query_status_label.config, {"text": text})
+
+        try:
+            job = submit(progress)
+        except ValueError as e:
+            self.log_to_error_log(str(e))
+            return
+        self.current_query_job = job
+        job.future.add_done_callback(lambda future: self.call_on_ui_thread(self.on_transfer_done, job, verb, table, path))
+        self.execute_query_button.config(state=tk.DISABLED)
+        self.cancel_query_button.config(state=tk.NORMAL)
+        self.query_status_label.config(text=f"{verb} 0 rows")
+        self.query_progress.start(10)
+
+    def on_transfer_done(self, job, verb, table, path):
+        """Report the outcome of an export or import and reset the controls."""
+        self.current_query_job = None
+        self.query_progress.stop()
+        self.execute_query_button.config(state=tk.NORMAL)
+        self.cancel_query_button.config(state=tk.DISABLED)
+
+        error = None if job.future.cancelled() else job.future.exception()
+        if job.future.cancelled() or isinstance(error, QueryCancelled):
+            self.query_status_label.config(text=f"Cancelled after {job.rows_fetched} rows")
+        elif error:
+            self.query_status_label.config(text="Failed")
+            self.log_to_error_log(f"Transfer of {table} ({path}) failed: {error}")
+        else:
+            elapsed = time.monotonic() - job.started_at
+            self.query_status_label.config(text=f"{verb} {job.rows_fetched} rows in {elapsed:.1f}s")
+            result = job.future.result()
+            target = result if isinstance(result, str) else path  # Backups resolve to the folder they created
+            self.result_text.insert(tk.END, f"{verb} {job.rows_fetched} rows ({table} <-> {target}).\n")
+
+    def toggle_query_cache(self):
+        """Turn the query result cache on or off and remember the choice."""
+        enabled = self.query_cache_var.get()
+        self.sql_manager.query_cache.enabled = enabled
+        if not enabled:
+            self.sql_manager.query_cache.clear()
+        self.config_handler.sql_cache_enabled = enabled
+        self.config_handler.save_config()
+        self.update_query_cache_label()
+
+    def update_query_cache_label(self):
+        stats = self.sql_manager.query_cache.stats()
+        if not self.sql_manager.query_cache.enabled:
+            self.query_cache_label.config(text="")
+            return
+        self.query_cache_label.config(
+            text=f"Cache: {stats['hits']} hits / {stats['misses']} misses, "
+                 f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KB)"
+        )
+
+    def cancel_query(self):
+        """Cancel the running query."""
+        if self.current_query_job:
+            self.query_status_label.config(text="Cancelling...")
+            self.sql_manager.cancel_query(self.current_query_job)
+
+    def on_query_done(self, job):
+        """Show the outcome of a finished query and reset the controls."""
+        self.current_query_job = None
+        self.query_progress.stop()
+        self.execute_query_button.config(state=tk.NORMAL)
+        self.run_saved_query_button.config(state=tk.NORMAL)
+        self.cancel_query_button.config(state=tk.DISABLED)
+        self.update_query_cache_label()
+
+        elapsed = time.monotonic() - job.started_at
+        if job.future.cancelled():
+            self.query_status_label.config(text="Cancelled")
+            return
+        error = job.future.exception()
+        if isinstance(error, QueryCancelled):
+            self.query_status_label.config(text=f"Cancelled after {job.rows_fetched} rows")
+        elif error:
+            self.query_status_label.config(text="Failed")
+            self.log_to_error_log(f"SQL query failed: {error}")
+        else:
+            result = job.future.result()
+            if isinstance(result, dict):
+                summary = f"{result['rowcount']} rows affected"
+                self.result_text.insert(tk.END, f"Query executed successfully. {summary}.\n")
+                self.query_status_label.config(text=f"{summary} in {elapsed:.2f}s")
+            else:
+                self.first_rows_elapsed = elapsed
+                self.result_grid.show(result)
+                self.update_result_summary(result, result.loading)
+
+    def update_result_summary(self, stream, loading):
+        """Report how many rows a result holds so far; called again as later pages arrive."""
+        rows = len(stream.rows)
+        if loading:
+            summary = f"{rows}+ rows (loading)"
+        elif stream.truncated:
+            summary = f"{rows} rows (only the first {rows} kept)"
+        elif stream.error:
+            summary = f"{rows} rows (reading stopped: {stream.error})"
+        else:
+            summary = f"{rows} rows"
+        self.query_status_label.config(text=f"{summary}, first rows in {self.first_rows_elapsed:.2f}s")
+        if not loading:
+            self.result_text.insert(tk.END, f"Query executed successfully. {summary}.\n")
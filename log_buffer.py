@@ -0,0 +1,39 @@
+import threading
+from collections import deque
+
+
+class LogRingBuffer:
+    """Bounded in-memory tail of a server output stream.
+
+    Only the most recent lines are kept in RAM, capped by both line count and
+    total bytes. The full history is written to disk by the server's
+    RotatingLogWriter, so nothing here grows while a server stays up.
+    """
+
+    def __init__(self, max_lines=5000, max_bytes=1024 * 1024):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.lines = deque()
+        self.size_bytes = 0
+        self.lock = threading.Lock()
+
+    def append(self, line):
+        """Add a line to the tail, evicting the oldest lines once a cap is hit."""
+        line_bytes = len(line.encode("utf-8", errors="replace"))
+        with self.lock:
+            self.lines.append((line, line_bytes))
+            self.size_bytes += line_bytes
+            while self.lines and (len(self.lines) > self.max_lines or self.size_bytes > self.max_bytes):
+                _, evicted_bytes = self.lines.popleft()
+                self.size_bytes -= evicted_bytes
+
+    def tail(self, count=None):
+        """Return a copy of the last `count` lines (or everything held in memory)."""
+        with self.lock:
+            lines = [line for line, _ in self.lines]
+        if count is not None:
+            return lines[-count:]
+        return lines
+
+    def __len__(self):
+        return len(self.lines)
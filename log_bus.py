@@ -0,0 +1,39 @@
+import queue
+import logging
+
+
+class LogBus:
+    """Thread-safe queue between the server output readers and the GUI log widgets.
+
+    Reader threads call push() for every line they capture. The Tk thread calls
+    drain() on a root.after tick and gets the pending lines grouped by server so
+    each tab can be updated with a single insert.
+    """
+
+    def __init__(self, max_lines_per_frame=2000):
+        self.queue = queue.SimpleQueue()
+        self.max_lines_per_frame = max_lines_per_frame
+        self.logger = logging.getLogger(__name__)
+
+    def push(self, server_name, message):
+        """Queue a line for a server tab. Safe to call from any thread."""
+        self.queue.put((server_name, message))
+
+    def pending(self):
+        """Approximate number of lines waiting to be drained."""
+        return self.queue.qsize()
+
+    def drain(self):
+        """Pop up to max_lines_per_frame lines and return them grouped by server.
+
+        Lines beyond the per-frame limit stay queued for the next tick, so bursts
+        are spread across frames instead of being dropped.
+        """
+        batches = {}
+        for _ in range(self.max_lines_per_frame):
+            try:
+                server_name, message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault(server_name, []).append(message)
+        return batches
@@ -0,0 +1,299 @@
+import os
+import re
+import math
+import queue
+import sqlite3
+import threading
+import time
+import datetime
+import logging
+
+LEVELS = {
+    "trace": "trace", "debug": "debug", "info": "info", "status": "info", "notice": "info",
+    "warn": "warning", "warning": "warning", "error": "error", "err": "error",
+    "critical": "critical", "fatal": "critical", "lua": None
+}
+
+# The process a line came from is already the record's server, so these tags don't name a subsystem
+PROCESS_TAGS = {"map", "world", "search", "connect", "login", "xi_map", "xi_world", "xi_search", "xi_connect"}
+
+# spdlog style "[10/18/24 12:34:56:789]", "[12:34:56.789]" or "[12:34:56]", followed by any number of "[tag]" groups
+_PREFIX = re.compile(r"^\s*(?:\[(?P<stamp>(?:\d{1,2}/\d{1,2}/\d{2,4} )?\d{1,2}:\d{2}:\d{2})(?:[:.](?P<fraction>\d{1,3}))?\]\s*)?"
+                     r"(?P<tags>(?:\[[^\]\[]{1,32}\]\s*)*)")
+_TAG = re.compile(r"\[([^\]\[]{1,32})\]")
+_LUA = re.compile(r"(?i)\blua(utils)?\b")
+_ZONE = re.compile(r"(?i)\bzone(?:[ _]?id)?\s*[:=#]?\s*\(?(\d{1,3})\b")
+
+
+class LineParser:
+    """Splits xi_* output lines into (timestamp, level, subsystem, zone, message).
+
+    Handles the spdlog prefix used by xi_world/xi_map/xi_search/xi_connect,
+    e.g. "[10/18/24 12:34:56:789][map][error] message", and older "[12:34:56]
+    [Status]" lines. Lines without a recognisable prefix keep their receive
+    time and an "info" level. Any line mentioning Lua is put in the "lua"
+    subsystem unless a tag names another one; process tags like [map] only
+    repeat the server. Timestamps are parsed once per distinct second and tag
+    groups once per distinct combination, so most lines cost one regex match.
+    """
+
+    def __init__(self):
+        self._stamps = {}  # "[...]" stamp without the fraction -> (epoch seconds, valid from, valid until)
+        self._tags = {}  # Raw "[map][error]" tag text -> (level, subsystem); the set of tags is small
+
+    def parse_batch(self, batch):
+        """Rows ready for the records table from queued (received, server, stream, line) tuples.
+
+        Each row is (timestamp, server, stream, level, subsystem, zone, message).
+        """
+        prefix, lua, zone_search = _PREFIX.match, _LUA.search, _ZONE.search
+        stamps, tags_cache = self._stamps, self._tags
+        rows = []
+        append = rows.append
+        for received, server_name, output_type, line in batch:
+            match = prefix(line)
+            message = line[match.end():].strip()
+            stamp, fraction, tags = match.group("stamp", "fraction", "tags")
+            if stamp:
+                cached = stamps.get(stamp)
+                if cached is None or not cached[1] <= received < cached[2]:
+                    cached = self._timestamp(stamp, received)
+                timestamp = cached[0] + (int(fraction) / 10 ** len(fraction) if fraction else 0.0)
+            else:
+                timestamp = received
+
+            parsed = tags_cache.get(tags)
+            if parsed is None:
+                parsed = tags_cache[tags] = self._parse_tags(tags) if len(tags_cache) < 1024 else (None, None)
+            level, subsystem = parsed
+            # Cheap substring checks keep the regexes off most lines
+            if subsystem is None and ("ua" in message or "UA" in message) and lua(message):
+                subsystem = "lua"
+            zone = zone_search(message) if "one" in message or "ONE" in message else None
+            if level is None:
+                level = "error" if output_type == "stderr" else "info"  # Unlabelled stderr output is an error
+            append((timestamp, server_name, output_type, level, subsystem, int(zone.group(1)) if zone else None, message))
+        return rows
+
+    @staticmethod
+    def _parse_tags(tags):
+        level = None
+        subsystem = None
+        for tag in _TAG.findall(tags):
+            name = tag.strip().lower()
+            if LEVELS.get(name):
+                level = LEVELS[name]
+            elif subsystem is None and not name.isdigit() and name not in PROCESS_TAGS:
+                subsystem = name
+        return level, subsystem
+
+    def _timestamp(self, stamp, received):
+        """Parse a stamp (to the second) and cache it; time-only stamps hold for the day the line arrived."""
+        if len(self._stamps) >= 4096:
+            self._stamps.clear()
+        try:
+            if "/" in stamp:
+                month_day_year, clock = stamp.split(" ")
+                month, day, year = (int(part) for part in month_day_year.split("/"))
+                year += 2000 if year < 100 else 0
+                hour, minute, second = (int(part) for part in clock.split(":"))
+                entry = (datetime.datetime(year, month, day, hour, minute, second).timestamp(), -math.inf, math.inf)
+            else:
+                # Time of day only: take the date the line was received
+                hour, minute, second = (int(part) for part in stamp.split(":"))
+                midnight = datetime.datetime.fromtimestamp(received).replace(hour=0, minute=0, second=0, microsecond=0)
+                next_midnight = (midnight + datetime.timedelta(days=1)).timestamp()
+                moment = midnight.replace(hour=hour, minute=minute, second=second)
+                entry = (moment.timestamp(), midnight.timestamp(), next_midnight)
+        except ValueError:
+            return received, received, received  # Not a real date; an empty range is never reused
+        self._stamps[stamp] = entry
+        return entry
+
+
+class LogStore:
+    """Parsed server output in SQLite, with an FTS5 index on the message text.
+
+    add() is registered as a ServerManager line listener and only queues the
+    raw line, so the supervisor's pipe readers never wait on parsing or disk.
+    A writer thread parses queued lines and inserts them in large
+    transactions, which keeps up with tens of thousands of lines a second.
+    If the writer ever falls `max_pending` lines behind, new lines are
+    dropped and counted rather than slowing the servers down. Records older
+    than `retention` seconds are pruned hourly.
+    """
+
+    def __init__(self, path, retention=72 * 3600, batch_size=5000, max_pending=500000):
+        self.path = path
+        self.retention = retention
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.queue = queue.SimpleQueue()
+        self.dropped = 0
+        self.written = 0
+        self.fts = False  # Whether this SQLite build has FTS5
+        self.parser = LineParser()
+        self.logger = logging.getLogger(__name__)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._read_local = threading.local()
+
+    def start(self):
+        """Create the database if needed and start the writer thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = self._connect()
+        self._create_schema(connection)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(connection,), daemon=True, name="LogStore")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def add(self, server_name, output_type, line):
+        """Line listener: queue one output line. Never blocks."""
+        if self.queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self.queue.put((time.time(), server_name, output_type, line))
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")  # Readers don't block the writer
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _create_schema(self, connection):
+        connection.executescript(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " id INTEGER PRIMARY KEY, ts REAL NOT NULL, server TEXT NOT NULL, stream TEXT NOT NULL,"
+            " level TEXT NOT NULL, subsystem TEXT, zone INTEGER, message TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS records_server_level_ts ON records (server, level, ts);"
+            "CREATE INDEX IF NOT EXISTS records_ts ON records (ts);"
+        )
+        try:
+            connection.executescript(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+                " message, content='records', content_rowid='id');"
+                "CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN"
+                " INSERT INTO records_fts (records_fts, rowid, message) VALUES ('delete', old.id, old.message); END;"
+            )
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"SQLite FTS5 unavailable ({e}); log text search will use LIKE.")
+        connection.commit()
+
+    def _run(self, connection):
+        next_prune = time.monotonic()
+        while not self._stop_event.is_set():
+            batch = self._take_batch()
+            if batch:
+                self._write_logged(connection, batch)
+            if time.monotonic() >= next_prune:
+                self._prune(connection)
+                next_prune = time.monotonic() + 3600
+        remaining = self._take_batch(wait=False)
+        if remaining:
+            self._write_logged(connection, remaining)
+        connection.close()
+
+    def _write_logged(self, connection, batch):
+        """Write a batch, logging rather than raising so one bad batch can't stop the writer thread."""
+        try:
+            self._write(connection, batch)
+        except Exception as e:
+            self.logger.error(f"Failed to store {len(batch)} log lines: {e}")
+
+    def _take_batch(self, wait=True):
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=0.5) if wait else self.queue.get_nowait())
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, connection, batch):
+        rows = self.parser.parse_batch(batch)
+        with connection:
+            connection.executemany(
+                "INSERT INTO records (ts, server, stream, level, subsystem, zone, message) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if self.fts:
+                # Only this thread writes, so the batch got the ids just below the last one inserted.
+                # Index it in one statement; a per-row trigger costs about as much as the insert.
+                last_id = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+                connection.execute(
+                    "INSERT INTO records_fts (rowid, message) SELECT id, message FROM records WHERE id > ?",
+                    (last_id - len(rows),)
+                )
+        self.written += len(rows)
+
+    def _prune(self, connection):
+        try:
+            with connection:
+                connection.execute("DELETE FROM records WHERE ts < ?", (time.time() - self.retention,))
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to prune old log records: {e}")
+
+    def _reader(self):
+        """A read connection per calling thread; WAL lets reads run alongside the writer."""
+        connection = getattr(self._read_local, "connection", None)
+        if connection is None:
+            connection = self._read_local.connection = sqlite3.connect(self.path)
+        return connection
+
+    def search(self, server=None, level=None, subsystem=None, since=None, text=None, limit=1000):
+        """Newest matching records as (ts, server, stream, level, subsystem, zone, message) tuples.
+
+        `since` is seconds ago, e.g. 3600 for "the last hour"; `text` is plain
+        words that must all appear (each matched as an FTS5 phrase, so "foo-bar"
+        or "zone:12" need no escaping), or a substring without FTS5.
+        """
+        where, params = self._filters(server, level, subsystem, since)
+        if text and text.strip():
+            if self.fts:
+                where.append("id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+                params.append(self._fts_phrases(text))
+            else:
+                where.append("message LIKE ?")
+                params.append(f"%{text}%")
+        query = "SELECT ts, server, stream, level, subsystem, zone, message FROM records"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY ts DESC LIMIT ?"
+        return self._reader().execute(query, params + [limit]).fetchall()
+
+    @staticmethod
+    def _fts_phrases(text):
+        """An FTS5 query matching every word of `text`, each quoted so its punctuation is not FTS syntax."""
+        return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+    def counts(self, group_by="zone", server=None, level=None, subsystem=None, since=None):
+        """Record counts grouped by one column, e.g. counts("zone", subsystem="lua", level="error")."""
+        if group_by not in ("server", "stream", "level", "subsystem", "zone"):
+            raise ValueError(f"Can't group log records by {group_by}")
+        where, params = self._filters(server, level, subsystem, since)
+        query = f"SELECT {group_by}, COUNT(*) FROM records"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" GROUP BY {group_by} ORDER BY COUNT(*) DESC"
+        return self._reader().execute(query, params).fetchall()
+
+    @staticmethod
+    def _filters(server, level, subsystem, since):
+        where, params = [], []
+        for column, value in (("server", server), ("level", level), ("subsystem", subsystem)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("ts >= ?")
+            params.append(time.time() - since)
+        return where, params
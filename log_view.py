@@ -0,0 +1,349 @@
+import re
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_left, bisect_right
+from tkinter import ttk
+
+STDERR = 1
+WARNING = 2
+ERROR = 4
+
+_STDERR_TAG = re.compile(rb"\[STDERR\]")
+_ERROR_WORDS = re.compile(rb"(?i)\b(error|fatal|critical|exception|crash(ed)?)\b")
+_WARNING_WORDS = re.compile(rb"(?i)\bwarn(ing)?\b")
+
+LEVELS = {"All levels": 0, "Warnings and errors": WARNING, "Errors only": ERROR}
+
+
+def classify(line):
+    """Flag bits (STDERR, WARNING, ERROR) for one encoded log line."""
+    flags = STDERR if _STDERR_TAG.search(line) else 0
+    if _ERROR_WORDS.search(line):
+        flags |= ERROR
+    elif _WARNING_WORDS.search(line):
+        flags |= WARNING
+    return flags
+
+
+def passes(flags, show_stdout, show_stderr, min_level):
+    if not (show_stderr if flags & STDERR else show_stdout):
+        return False
+    if min_level == ERROR:
+        return bool(flags & ERROR)
+    if min_level == WARNING:
+        return bool(flags & (WARNING | ERROR))
+    return True
+
+
+class LogIndex:
+    """Server output kept as one UTF-8 buffer plus an array of line start offsets.
+
+    Lines have absolute ids that survive trimming: once more than max_lines
+    are held, the oldest quarter is dropped and `base` (the id of the first
+    line held) moves forward. Appends happen on the Tk thread; searches work
+    on a snapshot so they never see a half-trimmed index.
+    """
+
+    def __init__(self, max_lines=100000):
+        self.max_lines = max_lines
+        self.data = bytearray()
+        self.offsets = array('q')  # Start of each held line in data
+        self.flags = bytearray()  # STDERR/WARNING/ERROR bits per held line
+        self.base = 0
+        self.lock = threading.Lock()
+
+    @property
+    def end(self):
+        """Id one past the newest line."""
+        return self.base + len(self.offsets)
+
+    def append(self, lines):
+        with self.lock:
+            for line in lines:
+                encoded = line.encode("utf-8", "replace") + b"\n"
+                self.offsets.append(len(self.data))
+                self.flags.append(classify(encoded))
+                self.data += encoded
+            if len(self.offsets) > self.max_lines:
+                self._trim(len(self.offsets) - self.max_lines * 3 // 4)
+
+    def _trim(self, count):
+        cut = self.offsets[count]
+        del self.data[:cut]
+        self.offsets = array('q', (offset - cut for offset in self.offsets[count:]))
+        del self.flags[:count]
+        self.base += count
+
+    def line_bytes(self, line_id):
+        index = line_id - self.base
+        start = self.offsets[index]
+        end = self.offsets[index + 1] if index + 1 < len(self.offsets) else len(self.data)
+        return bytes(self.data[start:end - 1])
+
+    def line(self, line_id):
+        return self.line_bytes(line_id).decode("utf-8", "replace")
+
+    def line_flags(self, line_id):
+        return self.flags[line_id - self.base]
+
+    def text(self):
+        return self.data.decode("utf-8", "replace")
+
+    def snapshot(self):
+        with self.lock:
+            return self.base, bytes(self.data), array('q', self.offsets), bytes(self.flags)
+
+
+def scan(snapshot, pattern, show_stdout, show_stderr, min_level):
+    """Ids of the lines in a LogIndex snapshot that pass the filters and match `pattern` (compiled bytes regex or None).
+
+    A MULTILINE copy of the regex runs over the whole buffer to find candidate
+    lines, mapped back with a binary search, which is far faster than testing
+    line by line when matches are sparse. Each candidate is confirmed with
+    pattern.search() on the line alone, the same test live lines get, so
+    anchors and matches that would cross a newline behave identically.
+    """
+    base, data, offsets, flags = snapshot
+    if pattern is None:
+        candidates = range(len(offsets))
+    else:
+        finder = re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+        candidates = []
+        position = 0
+        while True:
+            match = finder.search(data, position)
+            if match is None:
+                break
+            index = bisect_right(offsets, match.start()) - 1
+            start = offsets[index]
+            end = offsets[index + 1] - 1 if index + 1 < len(offsets) else len(data) - 1  # The line's newline
+            if pattern.search(data[start:end]):
+                candidates.append(index)
+            position = end + 1  # One hit per line is enough; carry on from the next line
+    return array('q', (
+        base + index for index in candidates if passes(flags[index], show_stdout, show_stderr, min_level)
+    ))
+
+
+class LogView:
+    """Virtualized, capped log view for one server tab.
+
+    All output lives in a LogIndex; the Text widget only ever holds the lines
+    on screen, so inserts and scrolling cost the same after a day of output
+    as after a minute. Regex search and stream/level filters are computed on
+    a worker thread from an index snapshot, then kept current as lines come in.
+    """
+
+    def __init__(self, parent, executor, call_on_ui_thread, max_lines=100000, bg='#2e2e2e', fg='#ffffff'):
+        self.executor = executor  # Runs searches off the Tk thread
+        self.call_on_ui_thread = call_on_ui_thread  # Posts search results back to the Tk thread
+        self.index = LogIndex(max_lines)
+        self.frame = tk.Frame(parent, bg='#1e1e1e')
+
+        toolbar = tk.Frame(self.frame, bg='#1e1e1e')
+        toolbar.pack(fill=tk.X)
+        tk.Label(toolbar, text="Search:", bg='#1e1e1e', fg='#ffffff').pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_scan())
+        tk.Entry(toolbar, textvariable=self.search_var, width=30).pack(side=tk.LEFT)
+        self.stdout_var = tk.BooleanVar(value=True)
+        self.stderr_var = tk.BooleanVar(value=True)
+        for text, variable in (("STDOUT", self.stdout_var), ("STDERR", self.stderr_var)):
+            tk.Checkbutton(toolbar, text=text, variable=variable, command=self.schedule_scan,
+                           bg='#1e1e1e', fg='#ffffff', selectcolor='#2e2e2e').pack(side=tk.LEFT, padx=5)
+        self.level_var = tk.StringVar(value="All levels")
+        level_box = ttk.Combobox(toolbar, textvariable=self.level_var, values=list(LEVELS), state="readonly", width=20)
+        level_box.pack(side=tk.LEFT, padx=5)
+        level_box.bind("<<ComboboxSelected>>", lambda event: self.schedule_scan())
+        self.status_label = tk.Label(toolbar, text="", bg='#1e1e1e', fg='#aaaaaa')
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        body = tk.Frame(self.frame, bg='#1e1e1e')
+        body.pack(fill=tk.BOTH, expand=True)
+        self.text = tk.Text(body, height=20, width=60, wrap=tk.NONE, bg=bg, fg=fg, insertbackground='#ffffff')
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scrollbar)
+        x_scrollbar = ttk.Scrollbar(body, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=x_scrollbar.set)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        x_scrollbar.grid(row=1, column=0, sticky="ew")
+        body.grid_rowconfigure(0, weight=1)
+        body.grid_columnconfigure(0, weight=1)
+        self.text.tag_configure("stderr", foreground="#ff7777")
+        self.text.tag_configure("warning", foreground="#ffcc00")
+        self.text.tag_configure("match", background="#665500")
+
+        self.text.bind("<MouseWheel>", lambda event: self.scroll_by(-3 if event.delta > 0 else 3) or "break")
+        self.text.bind("<Button-4>", lambda event: self.scroll_by(-3) or "break")
+        self.text.bind("<Button-5>", lambda event: self.scroll_by(3) or "break")
+        self.text.bind("<Prior>", lambda event: self.scroll_by(-self.visible_rows) or "break")
+        self.text.bind("<Next>", lambda event: self.scroll_by(self.visible_rows) or "break")
+        self.text.bind("<Configure>", self.on_resize)
+
+        self.visible_rows = 20
+        self.top = 0  # Position of the first visible line in the current view
+        self.follow = True  # Stick to the newest line
+        self.view_ids = None  # Matching line ids while a search or filter is active, else every line is shown
+        self.pattern = None
+        self.filters = (True, True, 0)
+        self.scan_future = None
+        self.scan_generation = 0
+        self.scan_after_id = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def config(self, **kwargs):
+        """Colour options apply to the text area, like the ScrolledText this replaces."""
+        self.text.config(**kwargs)
+
+    configure = config
+
+    def get_text(self):
+        """Every line still held in the index, for saving the log."""
+        return self.index.text()
+
+    def append(self, lines):
+        """Add new output lines. Called on the Tk thread."""
+        old_base = self.index.base
+        start = self.index.end
+        self.index.append(lines)
+        trimmed = self.index.base - old_base
+
+        if self.view_ids is not None:
+            if self.scan_future is None:  # Results still pending cover these lines when they land
+                self._extend_view(start)
+            if trimmed:
+                dropped = bisect_left(self.view_ids, self.index.base)
+                del self.view_ids[:dropped]
+                self.top = max(0, self.top - dropped)
+        elif trimmed:
+            self.top = max(0, self.top - trimmed)
+
+        if self.follow:
+            self.top = max(0, self.total() - self.visible_rows)
+            self.render()
+        else:
+            self._update_scrollbar()
+
+    def total(self):
+        return len(self.view_ids) if self.view_ids is not None else self.index.end - self.index.base
+
+    def schedule_scan(self):
+        """Debounce filter and search changes so typing doesn't start a scan per keystroke."""
+        if self.scan_after_id:
+            self.text.after_cancel(self.scan_after_id)
+        self.scan_after_id = self.text.after(200, self.start_scan)
+
+    def start_scan(self):
+        self.scan_after_id = None
+        search = self.search_var.get()
+        try:
+            self.pattern = re.compile(search.encode("utf-8")) if search else None
+        except re.error as e:
+            self.status_label.config(text=f"Invalid regex: {e}")
+            return
+        self.filters = (self.stdout_var.get(), self.stderr_var.get(), LEVELS[self.level_var.get()])
+        self.scan_generation += 1
+        if self.scan_future:
+            self.scan_future.cancel()
+            self.scan_future = None
+
+        if self.pattern is None and self.filters == (True, True, 0):
+            self.view_ids = None
+            self.status_label.config(text="")
+            self.follow = True
+            self.top = max(0, self.total() - self.visible_rows)
+            self.render()
+            return
+
+        generation = self.scan_generation
+        snapshot = self.index.snapshot()
+        snapshot_end = snapshot[0] + len(snapshot[2])
+        self.status_label.config(text="Searching...")
+        self.scan_future = self.executor.submit(scan, snapshot, self.pattern, *self.filters)
+        self.scan_future.add_done_callback(
+            lambda future: self.call_on_ui_thread(self.on_scan_done, future, generation, snapshot_end)
+        )
+
+    def on_scan_done(self, future, generation, snapshot_end):
+        if generation != self.scan_generation or future.cancelled():
+            return  # A newer search replaced this one
+        self.scan_future = None
+        error = future.exception()
+        if error:
+            self.status_label.config(text=f"Search failed: {error}")
+            return
+        self.view_ids = future.result()
+        # Lines that arrived while the scan ran, or were trimmed from under it
+        del self.view_ids[:bisect_left(self.view_ids, self.index.base)]
+        self._extend_view(max(snapshot_end, self.index.base))
+        self.follow = True
+        self.top = max(0, self.total() - self.visible_rows)
+        self.render()
+
+    def _extend_view(self, start):
+        show_stdout, show_stderr, min_level = self.filters
+        for line_id in range(start, self.index.end):
+            if not passes(self.index.line_flags(line_id), show_stdout, show_stderr, min_level):
+                continue
+            if self.pattern is None or self.pattern.search(self.index.line_bytes(line_id)):
+                self.view_ids.append(line_id)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total()))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, position):
+        bottom = max(0, self.total() - self.visible_rows)
+        self.top = max(0, min(position, bottom))
+        self.follow = self.top >= bottom
+        self.render()
+
+    def on_resize(self, event):
+        line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace") or 1
+        rows = max(1, event.height // line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            if self.follow:
+                self.top = max(0, self.total() - self.visible_rows)
+            self.render()
+
+    def render(self):
+        """Replace the Text contents with just the visible window of lines."""
+        if self.view_ids is not None:
+            line_ids = self.view_ids[self.top:self.top + self.visible_rows]
+        else:
+            first = self.index.base + self.top
+            line_ids = range(first, min(first + self.visible_rows, self.index.end))
+
+        self.text.delete("1.0", tk.END)
+        for row, line_id in enumerate(line_ids, start=1):
+            flags = self.index.line_flags(line_id)
+            tag = "stderr" if flags & (STDERR | ERROR) else "warning" if flags & WARNING else ()
+            self.text.insert(tk.END, self.index.line(line_id) + "\n", tag)
+            if self.pattern is not None:
+                self._highlight(row)
+        self._update_scrollbar()
+        if self.view_ids is not None:
+            self.status_label.config(text=f"{len(self.view_ids)} matching lines")
+
+    def _highlight(self, row):
+        line = self.text.get(f"{row}.0", f"{row}.end").encode("utf-8", "replace")
+        for match in self.pattern.finditer(line):
+            # Matches are found on bytes; convert the offsets back to characters
+            start = len(line[:match.start()].decode("utf-8", "replace"))
+            end = len(line[:match.end()].decode("utf-8", "replace"))
+            self.text.tag_add("match", f"{row}.{start}", f"{row}.{end}")
+
+    def _update_scrollbar(self):
+        total = max(self.total(), 1)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
@@ -0,0 +1,178 @@
+import os
+import gzip
+import queue
+import shutil
+import threading
+import time
+import datetime
+import logging
+
+try:
+    import zstandard  # Optional, only needed for compression="zstd"
+except ImportError:
+    zstandard = None
+
+
+class _SegmentCompressor:
+    """Background thread that compresses rotated log segments and removes the originals."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.logger = logging.getLogger(__name__)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, source_path, target_path, compression):
+        self.queue.put((source_path, target_path, compression))
+
+    def _run(self):
+        while True:
+            source_path, target_path, compression = self.queue.get()
+            try:
+                with open(source_path, "rb") as source:
+                    if compression == "zstd":
+                        with open(target_path, "wb") as target:
+                            zstandard.ZstdCompressor().copy_stream(source, target)
+                    else:
+                        with gzip.open(target_path, "wb") as target:
+                            shutil.copyfileobj(source, target, 1024 * 1024)
+                os.remove(source_path)
+            except Exception as e:
+                self.logger.error(f"Failed to compress log segment {source_path}: {e}")
+            finally:
+                self.queue.task_done()
+
+
+_compressor = None
+_compressor_lock = threading.Lock()
+
+
+def _get_compressor():
+    """Start the shared compressor thread on first use."""
+    global _compressor
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = _SegmentCompressor()
+        return _compressor
+
+
+class RotatingLogWriter:
+    """Continuous on-disk log sink for one server.
+
+    Lines are written through a buffered file as they arrive. The live segment
+    is rotated once it reaches max_bytes or max_age seconds, and rotated
+    segments are compressed (gzip or zstd) on a background thread. Writes
+    come from the supervisor's pipe reader, so nothing here raises: the first
+    OSError (disk full, permissions, a file locked on Windows) is logged and
+    the writer disables itself.
+    """
+
+    FLUSH_INTERVAL = 1.0  # Seconds between forced flushes so the live segment can be tailed
+
+    def __init__(self, directory, base_name, max_bytes=64 * 1024 * 1024, max_age=24 * 3600, compression="gzip"):
+        self.directory = directory
+        self.base_name = base_name
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.logger = logging.getLogger(__name__)
+
+        if compression == "zstd" and zstandard is None:
+            self.logger.warning("zstandard is not installed, falling back to gzip for log rotation.")
+            compression = "gzip"
+        self.compression = compression  # "gzip", "zstd" or None to keep rotated segments as-is
+
+        self.lock = threading.Lock()
+        self.rotated_segments = []
+        self.live_segment = None
+        self._file = None
+        self._size = 0
+        self._opened_at = 0
+        self._last_flush = 0
+        self._index = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_segment()
+
+    def write_line(self, line):
+        """Append a line to the live segment, rotating first if it is full or too old."""
+        data = line + "\n"
+        with self.lock:
+            if self._file is None:
+                return
+            now = time.monotonic()
+            if self._size >= self.max_bytes or now - self._opened_at >= self.max_age:
+                self._rotate()
+                if self._file is None:
+                    return
+            try:
+                self._file.write(data)
+                self._size += len(data)
+                if now - self._last_flush >= self.FLUSH_INTERVAL:
+                    self._file.flush()
+                    self._last_flush = now
+            except OSError as e:
+                self._disable(f"write to {self.live_segment}", e)
+
+    def flush(self):
+        with self.lock:
+            if self._file:
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    self._disable(f"flush {self.live_segment}", e)
+
+    def segments(self):
+        """Return rotated (compressed) segment paths followed by the live segment."""
+        self.flush()
+        with self.lock:
+            return self.rotated_segments + ([self.live_segment] if self.live_segment else [])
+
+    def close(self):
+        """Close the live segment. It is left uncompressed so it stays easy to inspect."""
+        with self.lock:
+            if self._file:
+                try:
+                    self._file.close()
+                except OSError as e:
+                    self.logger.error(f"Failed to close log segment {self.live_segment}: {e}")
+                self._file = None
+
+    def _disable(self, action, error):
+        """Stop writing after an I/O error; the server keeps running without its on-disk log."""
+        self.logger.error(f"Failed to {action}: {error}. Disk logging for {self.base_name} is disabled.")
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _open_segment(self):
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.live_segment = os.path.join(self.directory, f"{self.base_name}_{timestamp}_{self._index:04d}.log")
+        self._index += 1
+        try:
+            self._file = open(self.live_segment, "w", encoding="utf-8", errors="replace", buffering=256 * 1024)
+        except OSError as e:
+            self._file = None
+            self._disable(f"open log segment {self.live_segment}", e)
+            return
+        self._size = 0
+        self._opened_at = time.monotonic()
+        self._last_flush = self._opened_at
+
+    def _rotate(self):
+        try:
+            self._file.close()
+        except OSError as e:
+            self._disable(f"close log segment {self.live_segment}", e)
+            return
+        self._file = None
+        finished_segment = self.live_segment
+        if self.compression:
+            target_path = finished_segment + (".zst" if self.compression == "zstd" else ".gz")
+            _get_compressor().submit(finished_segment, target_path, self.compression)
+            self.rotated_segments.append(target_path)
+        else:
+            self.rotated_segments.append(finished_segment)
+        self._open_segment()
@@ -1,3 +1,6 @@
+import time
+LAUNCH_TIME = time.perf_counter()  # Taken before the heavy imports so cold start covers them
+
 import os
 import sys
 import tkinter as tk
@@ -6,6 +9,10 @@ from config_handler import ConfigHandler
 from server_manager import ServerManager
 from resource_monitor import ResourceMonitor
 from sql_manager import SQLManager
+from sql_backup import BackupEngine
+from query_cache import QueryCache
+from log_store import LogStore
+from metrics import MetricsServer
 from gui import GUI
 import json
 
@@ -63,14 +70,75 @@ def main():
     config_handler.load_config()
     
     # Initialize managers
-    server_manager = ServerManager(config_handler.server_dir)
-    resource_monitor = ResourceMonitor()
-    sql_manager = SQLManager()
+    server_manager = ServerManager(
+        config_handler.server_dir,
+        log_max_lines=config_handler.log_buffer_max_lines,
+        log_max_bytes=config_handler.log_buffer_max_bytes,
+        log_output_dir=config_handler.log_output_dir,
+        log_rotate_bytes=config_handler.log_rotate_bytes,
+        log_rotate_seconds=config_handler.log_rotate_seconds,
+        log_compression=config_handler.log_compression,
+        process_rescan_interval=config_handler.process_rescan_interval,
+        restart_policy_options=config_handler.restart_policy,
+        server_dependencies=config_handler.server_dependencies,
+        server_readiness=config_handler.server_readiness,
+        ready_timeout=config_handler.server_ready_timeout,
+        map_instances=config_handler.map_instances,
+        crash_loop_threshold=config_handler.crash_loop_threshold,
+        crash_loop_window=config_handler.crash_loop_window
+    )
+    log_store = LogStore(
+        config_handler.log_store_path,
+        retention=config_handler.log_store_retention_hours * 3600
+    )
+    log_store.start()
+    server_manager.add_line_listener(log_store.add)
+    resource_monitor = ResourceMonitor(
+        resolution=config_handler.resource_sample_interval,
+        retention=config_handler.resource_history_samples,
+        detail_interval=config_handler.resource_process_detail_interval
+    )
+    resource_monitor.set_process_source(server_manager.get_server_pids)
+    resource_monitor.start()
+    sql_manager = SQLManager(
+        pool_size=config_handler.sql_pool_size,
+        query_timeout=config_handler.sql_query_timeout,
+        reconnect_attempts=config_handler.sql_reconnect_attempts,
+        transfer_batch_size=config_handler.sql_transfer_batch_size,
+        transfer_transaction_rows=config_handler.sql_transfer_transaction_rows,
+        prepared_cache_size=config_handler.sql_prepared_cache_size,
+        result_max_rows=config_handler.sql_result_max_rows,
+        query_cache=QueryCache(
+            enabled=config_handler.sql_cache_enabled,
+            max_bytes=config_handler.sql_cache_max_bytes,
+            ttl=config_handler.sql_cache_ttl
+        )
+    )
+    server_manager.set_zone_shard_writer(sql_manager.execute_statements)
+    backup_engine = BackupEngine(
+        sql_manager,
+        workers=config_handler.sql_backup_workers,
+        chunk_rows=config_handler.sql_backup_chunk_rows,
+        compression=config_handler.sql_backup_compression
+    )
+
+    metrics_server = None
+    if config_handler.metrics_port:
+        metrics_server = MetricsServer(host=config_handler.api_host, port=config_handler.metrics_port)
+        metrics_server.start()
 
     # Create the GUI, passing in all required managers and version info
-    gui = GUI(root, config_handler, server_manager, resource_monitor, sql_manager, version)
+    gui = GUI(root, config_handler, server_manager, resource_monitor, sql_manager, version, backup_engine=backup_engine)
     logger.info("GUI initialized, starting main loop")
+    # after_idle runs once the first frame has been drawn
+    root.after_idle(lambda: logger.info(
+        f"Launcher ready in {(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms "
+        f"(asset cache: {gui.assets.hits} hits, {gui.assets.misses} misses)"
+    ))
     root.mainloop()
+    log_store.stop()
+    if metrics_server:
+        metrics_server.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,264 @@
+import math
+import time
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Cells:
+    """Per-thread value cells summed on read.
+
+    Every thread only ever writes its own cell, so updates need no lock and
+    are never lost: the hot paths (the supervisor's line callback, SQL
+    workers) pay a dict lookup and an add. A scrape reads all cells without
+    stopping the writers and may be a few increments behind, which is fine
+    for monotonic counters.
+    """
+
+    __slots__ = ("cells", "size")
+
+    def __init__(self, size=1):
+        self.cells = {}  # thread id -> list of `size` numbers
+        self.size = size
+
+    def cell(self):
+        ident = threading.get_ident()
+        cell = self.cells.get(ident)
+        if cell is None:
+            cell = self.cells.setdefault(ident, [0] * self.size)  # setdefault is atomic
+        return cell
+
+    def totals(self):
+        totals = [0] * self.size
+        for cell in list(self.cells.values()):
+            for index, value in enumerate(cell):
+                totals[index] += value
+        return totals
+
+
+class Counter:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _Cells()
+
+    def inc(self, amount=1):
+        self._cells.cell()[0] += amount
+
+    def value(self):
+        return self._cells.totals()[0]
+
+
+class Gauge:
+    """A value set by one owner; assignment is atomic, so no cells are needed."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+
+class Histogram:
+    __slots__ = ("buckets", "_cells")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One cell per thread: a count for each bucket plus +Inf, then the sum
+        self._cells = _Cells(len(self.buckets) + 2)
+
+    def observe(self, value):
+        cell = self._cells.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self):
+        """Context manager observing the seconds its block took."""
+        return _Timer(self)
+
+    def snapshot(self):
+        """(cumulative bucket counts including +Inf, count, sum)."""
+        totals = self._cells.totals()
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class MetricFamily:
+    """A named metric with a fixed set of label names and one child per label combination."""
+
+    KINDS = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+    def __init__(self, name, documentation, kind, labelnames=(), **options):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.options = options  # e.g. buckets for histograms
+        self.children = {}  # label values tuple -> Counter/Gauge/Histogram
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children.setdefault(values, self.KINDS[self.kind](**self.options))
+        return child
+
+
+class MetricsRegistry:
+    """Every metric the launcher exports, rendered in OpenMetrics text format.
+
+    Families hold values pushed from the hot paths. Collectors are callables
+    run at scrape time that return (name, documentation, kind, [(labels,
+    value), ...]) for state that is cheaper to read on demand, like which
+    servers are up or the ResourceMonitor's latest samples. Collectors must
+    only read cached state, never block.
+    """
+
+    def __init__(self):
+        self.families = {}  # name -> MetricFamily
+        self.collectors = []
+        self._lock = threading.Lock()  # Registration only, never taken on updates
+        self.logger = logging.getLogger(__name__)
+
+    def _family(self, name, documentation, kind, labelnames, **options):
+        with self._lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = MetricFamily(name, documentation, kind, labelnames, **options)
+            return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._family(name, documentation, "counter", labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._family(name, documentation, "gauge", labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._family(name, documentation, "histogram", labelnames, buckets=buckets)
+
+    def add_collector(self, collector):
+        with self._lock:
+            self.collectors = self.collectors + [collector]
+
+    def render(self):
+        lines = []
+        for family in list(self.families.values()):
+            self._render_family(lines, family)
+        for collector in self.collectors:
+            try:
+                collected = collector()
+            except Exception as e:
+                self.logger.error(f"Metrics collector {collector} failed: {e}")
+                continue
+            for name, documentation, kind, samples in collected:
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"# HELP {name} {_escape(documentation)}")
+                suffix = "_total" if kind == "counter" else ""
+                for labels, value in samples:
+                    lines.append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_family(lines, family):
+        name = family.name
+        lines.append(f"# TYPE {name} {family.kind}")
+        lines.append(f"# HELP {name} {_escape(family.documentation)}")
+        for values, child in list(family.children.items()):
+            labels = dict(zip(family.labelnames, values))
+            if family.kind == "counter":
+                lines.append(f"{name}_total{_labels(labels)} {_number(child.value())}")
+            elif family.kind == "gauge":
+                lines.append(f"{name}{_labels(labels)} {_number(child.value())}")
+            else:
+                cumulative, count, total = child.snapshot()
+                for bound, bucket_count in zip(child.buckets + (math.inf,), cumulative):
+                    le = "+Inf" if bound == math.inf else repr(float(bound))
+                    lines.append(f"{name}_bucket{_labels(dict(labels, le=le))} {bucket_count}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()  # Shared by every component unless one is given its own
+
+
+class MetricsServer:
+    """Serves GET /metrics from a registry, for running the exporter alongside the GUI."""
+
+    def __init__(self, registry=None, host="127.0.0.1", port=9108):
+        self.registry = registry or REGISTRY
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True, name="MetricsServer").start()
+        self.logger.info(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
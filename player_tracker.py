@@ -0,0 +1,121 @@
+import threading
+import time
+import logging
+from collections import Counter, deque
+
+
+class PlayerTracker:
+    """In-memory index of online sessions, kept current by cheap incremental polls of xidb.
+
+    accounts_sessions has no change timestamp and its rows are deleted at
+    logout, so there is no watermark to poll from. Instead every poll runs a
+    one-row checksum over the sessions and their characters' zones, and only
+    re-reads the session list when the checksum moves. The fresh list is
+    diffed against the index so only logins, logouts and zone changes are
+    applied and handed to the UI.
+    """
+
+    PROBE_QUERY = (
+        "SELECT COUNT(*), COALESCE(BIT_XOR(CRC32(CONCAT_WS(',', s.charid, c.pos_zone))), 0) "
+        "FROM accounts_sessions s JOIN chars c ON c.charid = s.charid"
+    )
+    SESSIONS_QUERY = (
+        "SELECT s.charid, s.accid, c.charname, c.pos_zone "
+        "FROM accounts_sessions s JOIN chars c ON c.charid = s.charid"
+    )
+    ZONES_QUERY = "SELECT zoneid, name FROM zone_settings"
+
+    def __init__(self, sql_manager, instance_for_zone=None, login_window=300):
+        self.sql_manager = sql_manager
+        self.instance_for_zone = instance_for_zone  # zone id -> map instance name, or None when not sharded
+        self.login_window = login_window  # Seconds of logins the login rate is averaged over
+        self.sessions = {}  # charid -> (accid, charname, zone id)
+        self.zone_counts = Counter()
+        self.zone_names = {}  # zone id -> name, read once
+        self.logins = deque()  # Monotonic times sessions were first seen
+        self.checksum = None
+        self.last_poll = None  # Wall clock time of the last successful poll
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def poll(self):
+        """Poll xidb once and apply any changes. Blocking; run it on the SQL worker pool.
+
+        Returns a delta dict with "added", "removed" and "moved" charid lists,
+        or None when nothing changed since the previous poll.
+        """
+        # Each poll needs a fresh read view; a snapshot left over from an earlier read would return the
+        # same checksum forever. release_connection() rolls back the read transaction, so none survives.
+        with self.sql_manager.pooled_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                if not self.zone_names:
+                    cursor.execute(self.ZONES_QUERY)
+                    self.zone_names = {zone_id: name.replace("_", " ") for zone_id, name in cursor.fetchall()}
+                cursor.execute(self.PROBE_QUERY)
+                checksum = tuple(cursor.fetchone())
+                if checksum == self.checksum:
+                    self.last_poll = time.time()
+                    return None
+                cursor.execute(self.SESSIONS_QUERY)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+
+        delta = self._apply(rows, first_poll=self.checksum is None)
+        self.checksum = checksum
+        self.last_poll = time.time()
+        return delta
+
+    def _apply(self, rows, first_poll):
+        now = time.monotonic()
+        current = {charid: (accid, charname, zone) for charid, accid, charname, zone in rows}
+        with self.lock:
+            added = [charid for charid in current if charid not in self.sessions]
+            removed = [charid for charid in self.sessions if charid not in current]
+            moved = [
+                charid for charid, session in current.items()
+                if charid in self.sessions and self.sessions[charid][2] != session[2]
+            ]
+            for charid in removed + moved:
+                self.zone_counts[self.sessions[charid][2]] -= 1
+            for charid in added + moved:
+                self.zone_counts[current[charid][2]] += 1
+            self.zone_counts = +self.zone_counts  # Drop zones that emptied
+            self.sessions = current
+            if not first_poll:
+                # Sessions already open when the launcher started aren't logins
+                self.logins.extend([now] * len(added))
+            self._trim_logins(now)
+        return {"added": added, "removed": removed, "moved": moved}
+
+    def _trim_logins(self, now):
+        while self.logins and now - self.logins[0] > self.login_window:
+            self.logins.popleft()
+
+    def online_count(self):
+        with self.lock:
+            return len(self.sessions)
+
+    def by_zone(self):
+        """{zone name: online count}"""
+        with self.lock:
+            return {self.zone_name(zone): count for zone, count in self.zone_counts.items()}
+
+    def by_instance(self):
+        """{map instance name: online count}; zones that aren't sharded count towards "Map Server"."""
+        instances = Counter()
+        with self.lock:
+            for zone, count in self.zone_counts.items():
+                instance = self.instance_for_zone(zone) if self.instance_for_zone else None
+                instances[instance or "Map Server"] += count
+        return dict(instances)
+
+    def login_rate(self):
+        """Logins per minute over the last login_window seconds."""
+        with self.lock:
+            self._trim_logins(time.monotonic())
+            return len(self.logins) * 60 / self.login_window
+
+    def zone_name(self, zone):
+        return self.zone_names.get(zone, f"Zone {zone}")
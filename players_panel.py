@@ -0,0 +1,65 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+
+class PlayersPanel:
+    """Players online per zone and per map instance, plus the login rate.
+
+    Rows are updated in place from PlayerTracker deltas: a poll where nothing
+    changed only refreshes the summary line, and a login or zone change only
+    touches the rows whose counts moved.
+    """
+
+    def __init__(self, parent, player_tracker, bg_color='#1e1e1e', text_color='#ffffff'):
+        self.player_tracker = player_tracker
+        self.frame = tk.Frame(parent, bg=bg_color)
+        self.summary_label = tk.Label(self.frame, text="Players online: not connected", bg=bg_color, fg=text_color, anchor="w")
+        self.summary_label.pack(fill=tk.X, padx=5)
+
+        tables = tk.Frame(self.frame, bg=bg_color)
+        tables.pack(fill=tk.X)
+        self.zone_tree = self._make_tree(tables, "Zone")
+        self.instance_tree = self._make_tree(tables, "Map instance")
+        self.zone_items = {}  # zone name -> Treeview item
+        self.instance_items = {}  # instance name -> Treeview item
+
+    @staticmethod
+    def _make_tree(parent, title):
+        tree = ttk.Treeview(parent, columns=("name", "online"), show="headings", height=6)
+        tree.heading("name", text=title)
+        tree.heading("online", text="Online")
+        tree.column("name", width=220)
+        tree.column("online", width=70, anchor="e")
+        tree.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        return tree
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def update(self, delta):
+        """Apply the result of PlayerTracker.poll(); None means nothing changed."""
+        tracker = self.player_tracker
+        polled = time.strftime("%H:%M:%S", time.localtime(tracker.last_poll)) if tracker.last_poll else "never"
+        self.summary_label.config(
+            text=f"Players online: {tracker.online_count()}    Logins/min: {tracker.login_rate():.1f}    Updated: {polled}"
+        )
+        if delta is None:
+            return
+        self._sync(self.zone_tree, self.zone_items, tracker.by_zone())
+        self._sync(self.instance_tree, self.instance_items, tracker.by_instance())
+
+    @staticmethod
+    def _sync(tree, items, counts):
+        """Update changed rows, add new ones, drop emptied ones and keep the busiest first."""
+        for name in [name for name in items if name not in counts]:
+            tree.delete(items.pop(name))
+        for name, count in counts.items():
+            item = items.get(name)
+            if item is None:
+                items[name] = tree.insert("", tk.END, values=(name, count))
+            elif tree.set(item, "online") != str(count):
+                tree.set(item, "online", count)
+        for index, name in enumerate(sorted(counts, key=counts.get, reverse=True)):
+            if tree.index(items[name]) != index:
+                tree.move(items[name], "", index)
@@ -0,0 +1,268 @@
+import asyncio
+import locale
+import logging
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+
+class RestartPolicy:
+    """Decides whether and when a server is restarted after it exits.
+
+    The first restart in a window happens immediately, later ones back off
+    exponentially. Once max_restarts have happened within `window` seconds the
+    policy gives up. Setting `held` to a reason (e.g. a detected crash loop)
+    suspends restarts until it is cleared. Subclass and override next_delay()
+    for custom behaviour.
+    """
+
+    def __init__(self, enabled=False, backoff_initial=1.0, backoff_factor=2.0, backoff_max=60.0,
+                 max_restarts=5, window=300, depends_on=()):
+        self.enabled = enabled
+        self.backoff_initial = backoff_initial
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.max_restarts = max_restarts
+        self.window = window
+        self.depends_on = list(depends_on)  # Servers that must be back up before this one restarts
+        self.restart_times = deque()
+        self.held = None  # Why restarts are suspended, or None
+
+    def next_delay(self, returncode):
+        """Return the seconds to wait before restarting, or None to leave the server down."""
+        if not self.enabled or self.held:
+            return None
+
+        now = time.monotonic()
+        while self.restart_times and now - self.restart_times[0] > self.window:
+            self.restart_times.popleft()
+        if len(self.restart_times) >= self.max_restarts:
+            return None
+
+        recent = len(self.restart_times)
+        self.restart_times.append(now)
+        if recent == 0:
+            return 0
+        return min(self.backoff_max, self.backoff_initial * self.backoff_factor ** (recent - 1))
+
+
+class ProcessSpec:
+    """Everything the supervisor needs to (re)launch one server."""
+
+    def __init__(self, name, command, cwd=None, env=None, policy=None,
+                 on_start=None, on_line=None, on_exit=None, on_event=None):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.policy = policy
+        self.on_start = on_start  # on_start(spec, managed_process)
+        self.on_line = on_line  # on_line(name, output_type, line), called on the supervisor thread
+        self.on_exit = on_exit  # on_exit(spec, returncode, stop_requested), called in a worker thread
+        self.on_event = on_event  # on_event(spec, message) for restart/give-up notices
+        self.restart_count = 0
+        self.stop_requested = False  # Set by a stop while no process is running; cancels a pending restart
+
+
+class ManagedProcess:
+    """Thread-safe handle to a supervised child, mirroring the parts of Popen the launcher uses."""
+
+    def __init__(self, process, loop):
+        self.process = process
+        self.loop = loop
+        self.pid = process.pid
+        self.returncode = None
+        self.stop_requested = False
+        self._exited = threading.Event()
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        """Ask the process to exit. A requested stop is never restarted."""
+        self.stop_requested = True
+        self.loop.call_soon_threadsafe(self._signal, "terminate")
+
+    def kill(self):
+        self.stop_requested = True
+        self.loop.call_soon_threadsafe(self._signal, "kill")
+
+    def wait(self, timeout=None):
+        self._exited.wait(timeout)
+        return self.returncode
+
+    def _signal(self, method):
+        if self.returncode is None:
+            try:
+                getattr(self.process, method)()
+            except ProcessLookupError:
+                pass
+
+    def _set_exited(self, returncode):
+        self.returncode = returncode
+        self._exited.set()
+
+
+class ProcessSupervisor:
+    """Single asyncio event loop that owns every server process.
+
+    One background thread reads all stdout/stderr pipes, waits on all children
+    and applies each server's RestartPolicy the moment a process exits,
+    replacing the reader and monitor threads that used to be started per server.
+    """
+
+    STREAM_LIMIT = 1024 * 1024  # Longest single output line accepted from a server
+    DRAIN_TIMEOUT = 5  # Seconds to keep reading after an exit, in case a grandchild holds the pipes open
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.processes = {}  # server name -> ManagedProcess
+        self.specs = {}  # server name -> ProcessSpec of the latest launch
+        self.pending_restarts = set()  # Servers waiting out a restart delay
+        self.encoding = locale.getpreferredencoding(False)
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        """Start the supervisor thread if it isn't running yet."""
+        if self.thread:
+            return
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True, name="ProcessSupervisor")
+        self.thread.start()
+        ready.wait()
+
+    def spawn(self, spec, timeout=30):
+        """Launch a server from any thread and return its ManagedProcess. Raises if the launch fails."""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._spawn(spec), self.loop)
+        return future.result(timeout)
+
+    def get_process(self, name):
+        return self.processes.get(name)
+
+    def is_running(self, name):
+        managed = self.processes.get(name)
+        return managed is not None and managed.returncode is None
+
+    def cancel_restart(self, name):
+        """Keep a server down: a restart waiting out its backoff is dropped. Returns whether one was pending."""
+        spec = self.specs.get(name)
+        if spec is None:
+            return False
+        spec.stop_requested = True
+        return name in self.pending_restarts
+
+    def _run_loop(self, ready):
+        # The default loop on Windows is the proactor loop, which supports subprocess pipes
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        ready.set()
+        self.loop.run_forever()
+
+    async def _spawn(self, spec):
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        process = await asyncio.create_subprocess_exec(
+            *spec.command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=spec.cwd,
+            env=spec.env,
+            limit=self.STREAM_LIMIT,
+            creationflags=creationflags
+        )
+        managed = ManagedProcess(process, self.loop)
+        self.processes[spec.name] = managed
+        self.specs[spec.name] = spec
+        if spec.on_start:
+            spec.on_start(spec, managed)
+        self.loop.create_task(self._supervise(spec, managed))
+        return managed
+
+    async def _supervise(self, spec, managed):
+        process = managed.process
+        readers = asyncio.ensure_future(asyncio.gather(
+            self._read_stream(spec, process.stdout, "stdout"),
+            self._read_stream(spec, process.stderr, "stderr")
+        ))
+        # Before Python 3.12 wait() also waits for the pipes to close, which a grandchild
+        # holding them can put off indefinitely, so watch the exit code as well
+        exited = asyncio.ensure_future(process.wait())
+        while process.returncode is None and not exited.done():
+            await asyncio.wait({exited}, timeout=0.2)
+        returncode = process.returncode
+        managed._set_exited(returncode)
+        _, still_reading = await asyncio.wait({readers}, timeout=self.DRAIN_TIMEOUT)
+        if still_reading:
+            self.logger.warning(f"{spec.name} exited but its output pipes are still open, no longer reading them.")
+            readers.cancel()
+            exited.cancel()
+
+        # Exit handlers write crash reports, keep that disk I/O off the event loop
+        if spec.on_exit:
+            try:
+                await self.loop.run_in_executor(None, spec.on_exit, spec, returncode, managed.stop_requested)
+            except Exception as e:
+                self.logger.error(f"Exit handler for {spec.name} failed: {e}")
+
+        if managed.stop_requested or spec.stop_requested or spec.policy is None:
+            return
+
+        delay = spec.policy.next_delay(returncode)
+        if delay is None:
+            held = getattr(spec.policy, "held", None)
+            if held:
+                self._notify(spec, f"Not restarting {spec.name}: {held}")
+            elif spec.policy.enabled:
+                self._notify(spec, f"{spec.name} exceeded its restart limit, not restarting.")
+            return
+
+        self.pending_restarts.add(spec.name)
+        try:
+            if delay:
+                self._notify(spec, f"Restarting {spec.name} in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            await self._wait_for_dependencies(spec)
+
+            # Skip if the server was started or stopped by hand while we were waiting
+            if spec.stop_requested:
+                self._notify(spec, f"Cancelled the pending restart of {spec.name}.")
+                return
+            if self.processes.get(spec.name) is not managed or not spec.policy.enabled:
+                return
+
+            self._notify(spec, f"Restarting {spec.name} after exit code {returncode}...")
+            spec.restart_count += 1
+            await self._spawn(spec)
+        except Exception as e:
+            self._notify(spec, f"Failed to restart {spec.name}: {e}")
+        finally:
+            self.pending_restarts.discard(spec.name)
+
+    async def _wait_for_dependencies(self, spec):
+        """Hold a restart until every dependency that is itself restarting is back up."""
+        while any(dependency in self.pending_restarts for dependency in spec.policy.depends_on):
+            await asyncio.sleep(0.2)
+
+    async def _read_stream(self, spec, stream, output_type):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Line longer than STREAM_LIMIT; the oversized chunk is discarded
+                continue
+            if not line:
+                break
+            if spec.on_line:
+                try:
+                    spec.on_line(spec.name, output_type, line.decode(self.encoding, errors="replace").rstrip())
+                except Exception as e:
+                    # Keep draining the pipe; a dead reader would block the child and lose its exit
+                    self.logger.error(f"Line handler for {spec.name} failed: {e}")
+
+    def _notify(self, spec, message):
+        self.logger.info(message)
+        if spec.on_event:
+            spec.on_event(spec, message)
@@ -0,0 +1,100 @@
+import threading
+import time
+import logging
+import psutil
+
+
+class ProcessTracker:
+    """Index of server name -> (pid, create_time) for the managed xi_* processes.
+
+    Entries come from the Popen handles the launcher already owns and are
+    confirmed with a cheap psutil.Process(pid) lookup. A full process_iter scan
+    only runs every `rescan_interval` seconds (or on demand via rescan()) to
+    adopt servers that were started outside the launcher.
+    """
+
+    def __init__(self, executables, rescan_interval=300, arguments=None):
+        self.executables = executables  # server name -> executable name
+        self.arguments = arguments or {}  # server name -> command line arguments, tells instances apart
+        self.rescan_interval = rescan_interval
+        self.processes = {}  # server name -> (pid, create_time)
+        self.last_scan = 0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, server_name, pid):
+        """Track a process the launcher just started."""
+        try:
+            create_time = psutil.Process(pid).create_time()
+        except psutil.Error:
+            return
+        with self.lock:
+            self.processes[server_name] = (pid, create_time)
+
+    def forget(self, server_name):
+        with self.lock:
+            self.processes.pop(server_name, None)
+
+    def get_pid(self, server_name):
+        """Return the PID of a live server process, or None."""
+        with self.lock:
+            entry = self.processes.get(server_name)
+        if entry and self._is_alive(*entry):
+            return entry[0]
+        if entry:
+            self.forget(server_name)
+
+        if time.monotonic() - self.last_scan >= self.rescan_interval:
+            self.rescan()
+            with self.lock:
+                entry = self.processes.get(server_name)
+            return entry[0] if entry else None
+        return None
+
+    def is_running(self, server_name):
+        return self.get_pid(server_name) is not None
+
+    def rescan(self):
+        """Walk the full process table once and adopt any running server executables.
+
+        Returns {server name: pid} for every server process found.
+        """
+        server_names = {}
+        for server_name, executable in self.executables.items():
+            server_names.setdefault(executable, []).append(server_name)
+
+        found = {}
+        for proc in psutil.process_iter(['name', 'create_time']):
+            candidates = server_names.get(proc.info['name'])
+            if not candidates:
+                continue
+            server_name = candidates[0] if len(candidates) == 1 else self._match_instance(proc, candidates)
+            if server_name and server_name not in found:
+                found[server_name] = (proc.pid, proc.info['create_time'])
+
+        with self.lock:
+            for server_name, entry in found.items():
+                if self.processes.get(server_name) != entry:
+                    self.logger.info(f"Adopted running {server_name} process (PID {entry[0]})")
+                self.processes[server_name] = entry
+            self.last_scan = time.monotonic()
+        return {server_name: entry[0] for server_name, entry in found.items()}
+
+    def _match_instance(self, proc, candidates):
+        """Pick which of several instances sharing an executable a process is, by its arguments."""
+        try:
+            proc_args = proc.cmdline()[1:]
+        except psutil.Error:
+            return None
+        for server_name in candidates:
+            if proc_args == list(self.arguments.get(server_name, [])):
+                return server_name
+        return None
+
+    def _is_alive(self, pid, create_time):
+        """Cheap liveness check; the create time guards against PID reuse."""
+        try:
+            proc = psutil.Process(pid)
+            return proc.create_time() == create_time and proc.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
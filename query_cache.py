@@ -0,0 +1,179 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Statements positively known to only read; anything else is treated as a possible write
+_READ_STATEMENT = re.compile(r"^(SELECT|WITH)\b", re.IGNORECASE)
+_READ_ONLY_STATEMENT = re.compile(r"^(SELECT|WITH|SHOW|DESCRIBE|DESC|EXPLAIN)\b", re.IGNORECASE)
+# Data changes inside a read-looking statement, e.g. "WITH ... UPDATE" or "SELECT ... INTO"
+_EMBEDDED_WRITE = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b|\bINTO\s+(OUTFILE|DUMPFILE)\b", re.IGNORECASE)
+# Writes whose affected tables can be read off the statement; any other write clears the whole cache
+_TABLE_WRITE_STATEMENT = re.compile(
+    r"^(INSERT|UPDATE|DELETE|REPLACE|ALTER|DROP|CREATE|RENAME|LOAD)\b", re.IGNORECASE
+)
+_LEADING_COMMENTS = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+# Results that depend on time, session state or locks must never be served from the cache
+_UNCACHEABLE = re.compile(
+    r"\b(NOW|SYSDATE|CURDATE|CURTIME|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP|UNIX_TIMESTAMP|UTC_\w+|"
+    r"RAND|UUID\w*|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|CONNECTION_ID|SLEEP|GET_LOCK|SQL_NO_CACHE)\b"
+    r"|\bFOR\s+UPDATE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|@",
+    re.IGNORECASE
+)
+_NAME = r"(?:`[^`]+`|\w+)(?:\s*\.\s*(?:`[^`]+`|\w+))?"
+# An alias after a table name, as long as it isn't the keyword that ends the table list
+_ALIAS = (
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|SET|ON|USING|JOIN|INNER|LEFT|RIGHT|CROSS|STRAIGHT_JOIN|NATURAL|GROUP|ORDER|"
+    r"LIMIT|HAVING|UNION|VALUES?|SELECT|PARTITION|WINDOW|FOR|LOCK|INTO|USE|FORCE|IGNORE|TO)\b)(?:`[^`]+`|\w+))?"
+)
+# A table reference or comma-separated list of them: "FROM chars c, accounts a"
+_TABLE_REFERENCE = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO|TABLE|TABLES)\s+({_NAME}{_ALIAS}(?:\s*,\s*{_NAME}{_ALIAS})*)",
+    re.IGNORECASE
+)
+_LIST_ENTRY_NAME = re.compile(rf"^\s*({_NAME})")
+_QUOTED_OR_SPACE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)|\s+")
+
+
+def normalize_query(query):
+    """Collapse whitespace outside quoted strings and drop trailing semicolons, so formatting doesn't split the cache."""
+    normalized = _QUOTED_OR_SPACE.sub(lambda match: match.group(1) or " ", query.strip())
+    return normalized.rstrip("; ")
+
+
+def referenced_tables(query):
+    """Lower-case table names (without schema or backticks) a statement reads or writes."""
+    tables = set()
+    for reference_list in _TABLE_REFERENCE.findall(query):
+        for entry in reference_list.split(","):
+            match = _LIST_ENTRY_NAME.match(entry)
+            if match:
+                tables.add(match.group(1).split(".")[-1].strip().strip("`").lower())
+    return tables
+
+
+def strip_leading_comments(query):
+    """The statement without the comments and whitespace in front of it."""
+    return query[_LEADING_COMMENTS.match(query).end():]
+
+
+def is_cacheable(query):
+    statement = strip_leading_comments(query)
+    return (bool(_READ_STATEMENT.match(statement)) and not _EMBEDDED_WRITE.search(statement)
+            and not _UNCACHEABLE.search(statement))
+
+
+def is_write(query):
+    """Anything not positively recognised as a read (CALL, SET, unknown statements, ...) may write."""
+    statement = strip_leading_comments(query)
+    return not _READ_ONLY_STATEMENT.match(statement) or bool(_EMBEDDED_WRITE.search(statement))
+
+
+def estimate_bytes(rows):
+    """Rough memory footprint of a result: the row tuples plus every value in them."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class QueryCache:
+    """Opt-in LRU cache of SELECT results, keyed on normalized query text and parameters.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the cached results exceed `max_bytes`. A write statement
+    that goes through SQLManager drops every entry that reads one of the
+    tables it touches; writes made by the game servers themselves are only
+    picked up when the TTL runs out.
+    """
+
+    def __init__(self, enabled=False, max_bytes=32 * 1024 * 1024, ttl=30):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # Seconds an entry may be served for
+        self.entries = OrderedDict()  # key -> (expires_at, columns, rows, size, tables), least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(query, params=None):
+        return normalize_query(query), tuple(params) if params else ()
+
+    def get(self, query, params=None):
+        """Return (columns, rows) for a cached result, or None. Only counts cacheable queries."""
+        if not self.enabled or not is_cacheable(query):
+            return None
+        key = self.key(query, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, query, params, columns, rows, size=None):
+        """Store a complete result. Results bigger than a quarter of the cache aren't worth keeping."""
+        if not self.enabled or not is_cacheable(query):
+            return
+        size = estimate_bytes(rows) if size is None else size
+        if size > self.max_bytes // 4:
+            return
+        key = self.key(query, params)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, list(columns), rows, size, referenced_tables(query))
+            self.bytes += size
+            while self.bytes > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def note_statement(self, query):
+        """Invalidate whatever a write statement may have changed.
+
+        Plain DML and DDL drop the entries that read the tables they name.
+        Other writes, such as CALL or a statement with no recognisable table,
+        could touch anything and clear the whole cache.
+        """
+        if not self.entries or not is_write(query):
+            return
+        statement = strip_leading_comments(query)
+        tables = referenced_tables(statement) if _TABLE_WRITE_STATEMENT.match(statement) else None
+        self.invalidate_tables(tables)
+
+    def invalidate_tables(self, tables=None):
+        """Drop entries that read any of `tables`, or every entry when the tables aren't known."""
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if not tables or entry[4] & tables:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.bytes -= entry[3]
@@ -0,0 +1,88 @@
+import json
+import os
+import logging
+
+# Written to the library file the first time the launcher runs without one
+DEFAULT_QUERIES = [
+    {
+        "name": "Find character by name",
+        "description": "Character id, account, zone and position for a character name.",
+        "sql": "SELECT charid, accid, charname, pos_zone, pos_x, pos_y, pos_z FROM chars WHERE charname = %s",
+        "params": ["Character name"]
+    },
+    {
+        "name": "Characters on account",
+        "description": "Every character belonging to an account login.",
+        "sql": "SELECT c.charid, c.charname, c.pos_zone FROM chars c "
+               "JOIN accounts a ON a.id = c.accid WHERE a.login = %s",
+        "params": ["Account login"]
+    },
+    {
+        "name": "Items by owner",
+        "description": "Inventory of a character across every container.",
+        "sql": "SELECT i.location, i.slot, i.itemId, i.quantity FROM char_inventory i "
+               "JOIN chars c ON c.charid = i.charid WHERE c.charname = %s ORDER BY i.location, i.slot",
+        "params": ["Character name"]
+    },
+    {
+        "name": "Online characters",
+        "description": "Characters with an open session and the zone they are in.",
+        "sql": "SELECT c.charid, c.charname, c.pos_zone FROM accounts_sessions s "
+               "JOIN chars c ON c.charid = s.charid ORDER BY c.charname",
+        "params": []
+    },
+    {
+        "name": "Auction house listings by seller",
+        "description": "Unsold auction house listings posted by a character.",
+        "sql": "SELECT id, itemid, stack, price, date FROM auction_house WHERE seller_name = %s AND sale = 0",
+        "params": ["Seller name"]
+    }
+]
+
+
+class NamedQuery:
+    """A saved, parameterised admin query. `sql` uses %s placeholders, one per entry in `params`."""
+
+    def __init__(self, name, sql, params=None, description=""):
+        self.name = name
+        self.sql = sql
+        self.params = list(params or [])  # Prompt labels, in placeholder order
+        self.description = description
+
+    def to_dict(self):
+        return {"name": self.name, "description": self.description, "sql": self.sql, "params": self.params}
+
+
+class QueryLibrary:
+    """Named queries loaded from a JSON file that sits next to config.json."""
+
+    def __init__(self, path="assets/config/queries.json"):
+        self.path = path
+        self.queries = {}  # name -> NamedQuery, in file order
+        self.logger = logging.getLogger(__name__)
+
+    def load(self):
+        """Read the library file, creating it with the default queries if it doesn't exist."""
+        if not os.path.exists(self.path):
+            self.queries = {entry["name"]: NamedQuery(**entry) for entry in DEFAULT_QUERIES}
+            self.save()
+            return self.queries
+        try:
+            with open(self.path, "r", encoding="utf-8") as library_file:
+                entries = json.load(library_file).get("queries", [])
+            self.queries = {entry["name"]: NamedQuery(**entry) for entry in entries}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.error(f"Failed to load the query library {self.path}: {e}")
+            self.queries = {}
+        return self.queries
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as library_file:
+            json.dump({"queries": [query.to_dict() for query in self.queries.values()]}, library_file, indent=4)
+
+    def names(self):
+        return list(self.queries)
+
+    def get(self, name):
+        return self.queries.get(name)
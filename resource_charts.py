@@ -0,0 +1,115 @@
+import os
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class ResourceCharts:
+    """Streaming charts for the Resources tab.
+
+    The figure is drawn in full only when the layout changes (first show,
+    resize, a new server line or a y-axis rescale). Every other refresh
+    restores the cached background, updates the existing line artists with
+    set_data() and blits just the axes, which keeps the per-second cost tiny.
+    """
+
+    HOST_METRICS = (("cpu", "CPU %"), ("memory", "Memory %"), ("disk", "Disk %"))
+    NETWORK_METRICS = (("net_sent", "Sent MB/s"), ("net_recv", "Recv MB/s"))
+
+    def __init__(self, parent, resource_monitor, points=120, bg_color='#1e1e1e', text_color='#ffffff'):
+        self.resource_monitor = resource_monitor
+        self.points = points  # Samples shown on each chart
+        self.x_values = list(range(points))
+
+        self.figure = Figure(figsize=(8, 6), dpi=100, facecolor=bg_color)
+        self.host_ax = self.figure.add_subplot(311)
+        self.network_ax = self.figure.add_subplot(312)
+        self.process_ax = self.figure.add_subplot(313)
+        for ax, title, ylim in (
+            (self.host_ax, "Host usage (%)", 100),
+            (self.network_ax, "Network (MB/s)", 1),
+            (self.process_ax, "Server CPU (% of one core)", 100)
+        ):
+            ax.set_title(title, color=text_color, fontsize=9)
+            ax.set_xlim(0, points - 1)
+            ax.set_ylim(0, ylim)
+            ax.set_facecolor('#2e2e2e')
+            ax.tick_params(colors=text_color, labelsize=8)
+            ax.set_xticks([])
+        self.figure.tight_layout()
+
+        # animated=True keeps the lines out of the cached background
+        self.host_lines = {
+            metric: self.host_ax.plot([], [], label=label, animated=True)[0] for metric, label in self.HOST_METRICS
+        }
+        self.network_lines = {
+            metric: self.network_ax.plot([], [], label=label, animated=True)[0] for metric, label in self.NETWORK_METRICS
+        }
+        self.process_lines = {}
+        self.host_ax.legend(loc="upper left", fontsize=7)
+        self.network_ax.legend(loc="upper left", fontsize=7)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def refresh(self):
+        """Push the latest ResourceMonitor history into the charts."""
+        needs_full_draw = self.background is None
+
+        for metric, line in self.host_lines.items():
+            self._set_line(line, self.resource_monitor.history(metric, count=self.points))
+
+        network_peak = 0.0
+        for metric, line in self.network_lines.items():
+            values = self.resource_monitor.history(metric, count=self.points)
+            network_peak = max([network_peak] + values)
+            self._set_line(line, values)
+        needs_full_draw |= self._rescale(self.network_ax, network_peak)
+
+        for server_name in self.resource_monitor.get_process_metrics():
+            if server_name not in self.process_lines:
+                self.process_lines[server_name] = self.process_ax.plot([], [], label=server_name, animated=True)[0]
+                self.process_ax.legend(loc="upper left", fontsize=7)
+                needs_full_draw = True
+        process_peak = 0.0
+        for server_name, line in self.process_lines.items():
+            values = self.resource_monitor.process_history(server_name, "cpu", count=self.points)
+            process_peak = max([process_peak] + values)
+            self._set_line(line, values)
+        # psutil reports process CPU per core, so a busy multithreaded server goes past 100
+        needs_full_draw |= self._rescale(self.process_ax, process_peak, floor=100, ceiling=100 * (os.cpu_count() or 1))
+
+        if needs_full_draw:
+            # Redraws the static parts and recaptures the background through _on_draw
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+        self._draw_lines()
+        self.canvas.blit(self.figure.bbox)
+
+    def _set_line(self, line, values):
+        # Right-align the data so the newest sample is always at the right edge
+        line.set_data(self.x_values[self.points - len(values):], values)
+
+    def _rescale(self, ax, peak, floor=1, ceiling=None):
+        """Grow or shrink the y-axis in coarse steps so rescales (full redraws) stay rare."""
+        _, top = ax.get_ylim()
+        if (peak > top and (ceiling is None or top < ceiling)) or (top > floor and peak < top / 4):
+            limit = max(floor, peak * 1.5)
+            ax.set_ylim(0, min(limit, ceiling) if ceiling else limit)
+            return True
+        return False
+
+    def _draw_lines(self):
+        for ax, lines in (
+            (self.host_ax, self.host_lines),
+            (self.network_ax, self.network_lines),
+            (self.process_ax, self.process_lines)
+        ):
+            for line in lines.values():
+                ax.draw_artist(line)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
@@ -1,17 +1,124 @@
 # resource_monitor.py
 
+import threading
+import time
+import logging
+from array import array
 import psutil
+from metrics import REGISTRY
+
+METRICS = ("cpu", "memory", "disk", "net_sent", "net_recv")
+PROCESS_SERIES = ("cpu", "rss")  # Per-process metrics that also keep a history
+
+
+class RingSeries:
+    """Fixed-size ring of floats stored in a preallocated array('d')."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * capacity))
+        self.index = 0  # Next slot to write
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def views(self):
+        """Zero-copy memoryviews of the samples, oldest first: (older_part, newer_part)."""
+        buffer = memoryview(self.data)
+        if self.count < self.capacity:
+            return buffer[:0], buffer[:self.count]
+        return buffer[self.index:], buffer[:self.index]
+
+    def values(self, count=None):
+        """Copy of the samples in order, optionally only the newest `count`."""
+        older, newer = self.views()
+        values = older.tolist() + newer.tolist()
+        return values[-count:] if count else values
+
+    def last(self):
+        return self.data[self.index - 1] if self.count else None
+
+
+class _Downsampler:
+    """Averages fine samples into one coarse sample per `period` seconds."""
+
+    def __init__(self, period, capacity):
+        self.period = period
+        self.series = RingSeries(capacity)
+        self.bucket = None
+        self.total = 0.0
+        self.samples = 0
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.period)
+        if self.bucket is not None and bucket != self.bucket and self.samples:
+            self.series.append(self.total / self.samples)
+            self.total = 0.0
+            self.samples = 0
+        self.bucket = bucket
+        self.total += value
+        self.samples += 1
+
 
 class ResourceMonitor:
-    def __init__(self):
-        self.cpu_usage_history = []
-        self.memory_usage_history = []
-        self.disk_usage_history = []
-        self.net_sent_history = []
-        self.net_recv_history = []
+    """Samples host and per-server process resource usage on a background thread.
+
+    Each metric is kept at three resolutions in fixed-size rings: raw samples
+    every `resolution` seconds, plus per-minute and per-hour averages, so days
+    of history fit in a few KB and reading it never blocks on psutil.
+    Per-process USS, open files and connections walk the process's memory
+    maps and handle tables, so they are only re-read every `detail_interval`
+    seconds and the last values are reused in between.
+    """
+
+    RESOLUTIONS = ("second", "minute", "hour")
+
+    def __init__(self, resolution=1.0, retention=600, minute_retention=1440, hour_retention=168, metrics=None,
+                 detail_interval=30.0):
+        self.resolution = resolution  # Seconds between raw samples
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.series = {
+            metric: {
+                "second": RingSeries(retention),
+                "minute": _Downsampler(60, minute_retention),
+                "hour": _Downsampler(3600, hour_retention)
+            }
+            for metric in METRICS
+        }
+        self.retention = retention
+        self.process_source = None  # Callable returning {server name: pid}
+        self.process_metrics = {}  # server name -> latest per-process sample
+        self.process_series = {}  # server name -> {metric: RingSeries}
+        self._process_handles = {}  # pid -> psutil.Process, kept so cpu_percent() has a baseline
+        self.detail_interval = detail_interval  # Seconds between the slow per-process reads
+        self._process_details = {}  # pid -> (monotonic time read, {"uss", "open_files", "connections"})
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._last_net = None
+
+        (metrics or REGISTRY).add_collector(self.collect_metrics)
+
+        # Prime the CPU counter so the first non-blocking reading is meaningful
+        psutil.cpu_percent(interval=None)
+
+    def start(self):
+        """Start the background sampler thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ResourceMonitor")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
 
     def get_cpu_usage(self):
-        return psutil.cpu_percent(interval=1)
+        """CPU usage since the previous call; never blocks."""
+        return psutil.cpu_percent(interval=None)
 
     def get_memory_usage(self):
         return psutil.virtual_memory().percent
@@ -23,27 +130,196 @@ class ResourceMonitor:
         net_info = psutil.net_io_counters()
         return net_info.bytes_sent / (1024 ** 2), net_info.bytes_recv / (1024 ** 2)
 
-    def update_usage_data(self):
-        """Updates historical data for CPU, Memory, Disk, and Network."""
-        self.cpu_usage_history.append(self.get_cpu_usage())
-        self.memory_usage_history.append(self.get_memory_usage())
-        self.disk_usage_history.append(self.get_disk_usage())
-
+    def sample(self):
+        """Take one sample of every metric and store it."""
+        now = time.monotonic()
         sent, recv = self.get_network_usage()
-        self.net_sent_history.append(sent)
-        self.net_recv_history.append(recv)
+        if self._last_net:
+            last_time, last_sent, last_recv = self._last_net
+            elapsed = max(now - last_time, 1e-6)
+            sent_rate, recv_rate = (sent - last_sent) / elapsed, (recv - last_recv) / elapsed  # MB/s
+        else:
+            sent_rate = recv_rate = 0.0
+        self._last_net = (now, sent, recv)
+
+        values = {
+            "cpu": self.get_cpu_usage(),
+            "memory": self.get_memory_usage(),
+            "disk": self.get_disk_usage(),
+            "net_sent": sent_rate,
+            "net_recv": recv_rate
+        }
+        timestamp = time.time()
+        with self.lock:
+            for metric, value in values.items():
+                series = self.series[metric]
+                series["second"].append(value)
+                series["minute"].add(timestamp, value)
+                series["hour"].add(timestamp, value)
+        return values
+
+    def set_process_source(self, process_source):
+        """Register a callable returning {server name: pid} for per-server sampling."""
+        self.process_source = process_source
+
+    def sample_processes(self):
+        """Sample CPU, memory, threads, handles and I/O for every tracked server process."""
+        if not self.process_source:
+            return {}
+
+        samples = {}
+        pids = self.process_source()
+        for server_name, pid in pids.items():
+            sample = self._sample_process(pid)
+            if sample:
+                samples[server_name] = sample
+
+        # Drop handles for processes that are gone
+        live_pids = set(pids.values())
+        for pid in list(self._process_handles):
+            if pid not in live_pids:
+                del self._process_handles[pid]
+        for pid in list(self._process_details):
+            if pid not in live_pids:
+                del self._process_details[pid]
+
+        with self.lock:
+            self.process_metrics = samples
+            for server_name, sample in samples.items():
+                series = self.process_series.setdefault(
+                    server_name, {metric: RingSeries(self.retention) for metric in PROCESS_SERIES}
+                )
+                for metric in PROCESS_SERIES:
+                    series[metric].append(sample[metric])
+        return samples
+
+    def get_process_metrics(self, server_name=None):
+        """Latest per-process sample for one server, or all of them."""
+        with self.lock:
+            if server_name:
+                return self.process_metrics.get(server_name)
+            return dict(self.process_metrics)
+
+    def collect_metrics(self):
+        """Scrape-time metrics from the latest samples; never calls psutil."""
+        with self.lock:
+            host = {metric: self.series[metric]["second"].last() for metric in METRICS}
+            processes = dict(self.process_metrics)
+        cpu = [({"server": name}, sample["cpu"]) for name, sample in processes.items() if sample]
+        rss = [({"server": name}, sample["rss"]) for name, sample in processes.items() if sample]
+        return [
+            ("xi_host_cpu_percent", "Host CPU usage", "gauge", [({}, host["cpu"])]),
+            ("xi_host_memory_percent", "Host memory usage", "gauge", [({}, host["memory"])]),
+            ("xi_host_disk_percent", "Host disk usage", "gauge", [({}, host["disk"])]),
+            ("xi_host_network_sent_megabytes_per_second", "Host network send rate", "gauge", [({}, host["net_sent"])]),
+            ("xi_host_network_received_megabytes_per_second", "Host network receive rate", "gauge", [({}, host["net_recv"])]),
+            ("xi_process_cpu_percent", "CPU usage of each server process", "gauge", cpu),
+            ("xi_process_resident_memory_bytes", "Resident memory of each server process", "gauge", rss),
+        ]
 
-        # Limit the data to 60 points to keep graphs clean and manageable
-        if len(self.cpu_usage_history) > 60:
-            self.cpu_usage_history.pop(0)
-            self.memory_usage_history.pop(0)
-            self.disk_usage_history.pop(0)
-            self.net_sent_history.pop(0)
-            self.net_recv_history.pop(0)
+    def process_history(self, server_name, metric, count=None):
+        """History of a per-process metric ("cpu" or "rss") for a server, oldest first."""
+        with self.lock:
+            series = self.process_series.get(server_name)
+            return series[metric].values(count) if series else []
 
+    def _sample_process(self, pid):
+        proc = self._process_handles.get(pid)
+        if proc is None:
+            try:
+                proc = psutil.Process(pid)
+            except psutil.Error:
+                return None
+            proc.cpu_percent(interval=None)  # First call only sets the baseline
+            self._process_handles[pid] = proc
+
+        try:
+            # oneshot() caches the underlying OS queries so the reads below cost one pass
+            with proc.oneshot():
+                memory = proc.memory_info()
+                sample = {
+                    "pid": pid,
+                    "cpu": proc.cpu_percent(interval=None),
+                    "rss": memory.rss,
+                    "uss": None,
+                    "threads": proc.num_threads(),
+                    "open_files": None,
+                    "connections": None,
+                    "handles": proc.num_handles() if hasattr(proc, "num_handles") else None,
+                    "read_bytes": None,
+                    "write_bytes": None
+                }
+                try:
+                    io = proc.io_counters()
+                    sample["read_bytes"], sample["write_bytes"] = io.read_bytes, io.write_bytes
+                except (psutil.AccessDenied, AttributeError):
+                    pass
+            sample.update(self._process_detail(pid, proc))
+            return sample
+        except psutil.Error:
+            self._process_handles.pop(pid, None)
+            return None
+
+    def _process_detail(self, pid, proc):
+        """USS, open files and connections, re-read at most every detail_interval seconds.
+
+        None of these are covered by oneshot(), each may need extra privileges,
+        and they are far slower than the rest of a sample.
+        """
+        now = time.monotonic()
+        cached = self._process_details.get(pid)
+        if cached and now - cached[0] < self.detail_interval:
+            return cached[1]
+        detail = {"uss": None, "open_files": None, "connections": None}
+        try:
+            detail["uss"] = proc.memory_full_info().uss
+        except (psutil.AccessDenied, AttributeError):
+            pass
+        try:
+            detail["open_files"] = len(proc.open_files())
+        except psutil.AccessDenied:
+            pass
+        try:
+            detail["connections"] = len(proc.net_connections() if hasattr(proc, "net_connections") else proc.connections())
+        except psutil.AccessDenied:
+            pass
+        self._process_details[pid] = (now, detail)
+        return detail
+
+    def history(self, metric, resolution="second", count=None):
+        """Return a copy of a metric's history at the given resolution, oldest first."""
+        with self.lock:
+            return self._ring(metric, resolution).values(count)
+
+    def views(self, metric, resolution="second"):
+        """Zero-copy (older, newer) memoryviews of a metric's history; valid until the next sample."""
+        with self.lock:
+            return self._ring(metric, resolution).views()
+
+    def latest(self, metric):
+        with self.lock:
+            return self.series[metric]["second"].last()
+
+    def update_usage_data(self):
+        """Return the most recent 60 raw samples of every metric."""
         return {
-            'cpu': self.cpu_usage_history,
-            'memory': self.memory_usage_history,
-            'disk': self.disk_usage_history,
-            'network': {'sent': self.net_sent_history, 'recv': self.net_recv_history}
+            'cpu': self.history("cpu", count=60),
+            'memory': self.history("memory", count=60),
+            'disk': self.history("disk", count=60),
+            'network': {'sent': self.history("net_sent", count=60), 'recv': self.history("net_recv", count=60)}
         }
+
+    def _ring(self, metric, resolution):
+        series = self.series[metric][resolution]
+        return series if resolution == "second" else series.series
+
+    def _run(self):
+        next_sample = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+                self.sample_processes()
+            except Exception as e:
+                self.logger.error(f"Resource sampling failed: {e}")
+            next_sample += self.resolution
+            self._stop_event.wait(max(0.0, next_sample - time.monotonic()))
@@ -0,0 +1,120 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class ResultGrid:
+    """Virtualized table for SQL results.
+
+    The Treeview only ever holds the rows on screen; they are sliced out of
+    the ResultStream's rows as the view scrolls. While the stream is still
+    reading later pages the grid polls it, so the scrollbar grows with the
+    result and `on_progress(stream, loading)` can report the row count.
+    """
+
+    def __init__(self, parent, visible_rows=20, on_progress=None, poll_ms=250):
+        self.visible_rows = visible_rows
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+
+        self.frame = tk.Frame(parent, bg='#1e1e1e')
+        self.tree = ttk.Treeview(self.frame, show="headings", height=visible_rows, selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.x_scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.x_scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.x_scrollbar.grid(row=1, column=0, sticky="ew")
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        for widget in (self.tree, self.scrollbar):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_by(-3))
+            widget.bind("<Button-5>", lambda event: self.scroll_by(3))
+
+        self.stream = None
+        self.top = 0  # Index of the first visible row
+        self._poll_id = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def show(self, stream):
+        """Display a freshly opened ResultStream, replacing any previous result."""
+        self.close()
+        self.stream = stream
+        self.top = 0
+
+        self.tree["columns"] = stream.columns
+        for column in stream.columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=120, stretch=False)
+        self.render()
+        if stream.loading:
+            self._poll_id = self.frame.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        """Pick up the rows the stream read since the last poll."""
+        self._poll_id = None
+        if not self.stream:
+            return
+        loading = self.stream.loading  # Read first, so a finished stream is rendered in full
+        self.render()
+        if self.on_progress:
+            self.on_progress(self.stream, loading)
+        if loading:
+            self._poll_id = self.frame.after(self.poll_ms, self.poll)
+
+    def close(self):
+        """Drop the current result, stop it reading further pages and clear the grid."""
+        if self._poll_id is not None:
+            self.frame.after_cancel(self._poll_id)
+            self._poll_id = None
+        if self.stream:
+            self.stream.close()
+        self.stream = None
+        self.tree.delete(*self.tree.get_children())
+
+    @property
+    def known_rows(self):
+        return len(self.stream.rows) if self.stream else 0
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.known_rows))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, row):
+        if not self.stream:
+            return
+        self.top = max(0, min(row, self.known_rows - self.visible_rows))
+        self.render()
+
+    def render(self):
+        """Show the rows in the visible window."""
+        if not self.stream:
+            return
+        rows = self.stream.rows[self.top:self.top + self.visible_rows]
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", tk.END, values=[self.format_value(value) for value in row])
+
+        total = max(self.known_rows, 1)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return "NULL"
+        if isinstance(value, (bytes, bytearray)):
+            return value[:32].hex() + ("..." if len(value) > 32 else "")
+        return str(value)
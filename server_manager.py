@@ -1,22 +1,150 @@
-import subprocess
-import threading
-import time
 import psutil  # For process management
 import logging
 import os
+import time
 import datetime
-import sys
+from log_buffer import LogRingBuffer
+from log_writer import RotatingLogWriter
+from process_tracker import ProcessTracker
+from process_supervisor import ProcessSupervisor, ProcessSpec, RestartPolicy
+from startup_orchestrator import StartupOrchestrator
+from crash_signatures import CrashIndex
+from metrics import REGISTRY
 
 class ServerManager:
-    def __init__(self, server_dir=None, crash_log_dir="crash_logs"):
+    # Map each server name to its executable
+    EXECUTABLES = {
+        "World Server": "xi_world.exe",
+        "Search Server": "xi_search.exe",
+        "Map Server": "xi_map.exe",
+        "Connect Server": "xi_connect.exe"
+    }
+
+    def __init__(self, server_dir=None, crash_log_dir="crash_logs", log_max_lines=5000, log_max_bytes=1024 * 1024,
+                 log_output_dir=None, log_rotate_bytes=64 * 1024 * 1024, log_rotate_seconds=24 * 3600,
+                 log_compression="gzip", process_rescan_interval=300, restart_policy_options=None,
+                 server_dependencies=None, server_readiness=None, ready_timeout=30, map_instances=None,
+                 crash_loop_threshold=3, crash_loop_window=600, metrics=None):
         self.server_dir = server_dir
         self.server_processes = {}  # This will hold the process objects by server name
         self.logger = logging.getLogger(__name__)
-        self.monitoring_threads = {}  # Keep track of monitoring threads for each server
+        self.supervisor = ProcessSupervisor()  # One event loop reads, waits on and restarts every server
+        self.restart_policies = {}  # Restart policy for each server
+        self.restart_policy_options = restart_policy_options or {}  # Defaults for new RestartPolicy objects
+        self.servers = self._build_server_table(map_instances or [])  # server name -> launch settings
+        self.server_dependencies = self._expand_dependencies(server_dependencies or {})  # server name -> servers it depends on
+        self.output_callbacks = {}  # Where each server's output lines are forwarded
+        self.line_listeners = []  # Extra callbacks fed every output line, e.g. readiness watchers
+        self.zone_shard_writer = None  # Runs zone_shard_updates() against xidb before a map instance starts
+        server_readiness = server_readiness or {}
+        readiness = {
+            name: server_readiness.get(name, server_readiness.get("Map Server", {}) if server["icon"] == "map" else {})
+            for name, server in self.servers.items()
+        }
+        self.startup_orchestrator = StartupOrchestrator(
+            self, dependencies=self.server_dependencies, readiness=readiness, ready_timeout=ready_timeout
+        )
         self.crash_log_dir = crash_log_dir
         os.makedirs(self.crash_log_dir, exist_ok=True)  # Ensure the crash log folder exists
-        self.server_logs = {}  # Store logs incrementally
+        # Known crash signatures; a crash loop holds the server's restarts
+        self.crash_index = CrashIndex(
+            os.path.join(self.crash_log_dir, "signatures.json"),
+            threshold=crash_loop_threshold,
+            window=crash_loop_window
+        )
+        self.server_logs = {}  # Bounded per-stream tails kept in memory
+        self.log_max_lines = log_max_lines
+        self.log_max_bytes = log_max_bytes
+        self.log_writers = {}  # Continuous on-disk log sink for each server
+        self.log_output_dir = log_output_dir
+        self.log_rotate_bytes = log_rotate_bytes
+        self.log_rotate_seconds = log_rotate_seconds
+        self.log_compression = log_compression
+        registry = metrics or REGISTRY
+        self.line_counts = registry.counter("xi_server_log_lines", "Output lines read from each server", ("server", "stream"))
+        self.restart_counts = registry.counter("xi_server_restarts", "Automatic restarts of each server", ("server",))
+        self.crash_counts = registry.counter("xi_server_crashes", "Unrequested non-zero exits of each server", ("server",))
+        self.started_at = {}  # server name -> wall clock time its current process was launched
+        registry.add_collector(self.collect_metrics)
+        self.process_tracker = ProcessTracker(
+            {name: server["executable"] for name, server in self.servers.items()},
+            rescan_interval=process_rescan_interval,
+            arguments={name: server["args"] for name, server in self.servers.items()}
+        )
     
+    def _build_server_table(self, map_instances):
+        """Build the launch table, replacing the single Map Server with the configured map instances.
+
+        Each map instance is a dict with a "name" and optional "args", "port",
+        "cpu_affinity" (list of CPU indexes), "zones" (list of [first, last]
+        zone id ranges) and "restart_policy" (RestartPolicy options).
+        """
+        servers = {}
+        for server_name, executable in self.EXECUTABLES.items():
+            if server_name == "Map Server" and map_instances:
+                for instance in map_instances:
+                    args = [str(arg) for arg in instance.get("args", [])]
+                    if instance.get("port") and "--port" not in args:
+                        args += ["--port", str(instance["port"])]
+                    servers[instance["name"]] = {
+                        "executable": executable,
+                        "args": args,
+                        "port": instance.get("port"),
+                        "cpu_affinity": instance.get("cpu_affinity"),
+                        "zones": instance.get("zones", []),
+                        "restart_policy": instance.get("restart_policy", {}),
+                        "icon": "map"
+                    }
+            else:
+                servers[server_name] = {"executable": executable, "args": [], "port": None, "cpu_affinity": None,
+                                        "zones": [], "restart_policy": {}, "icon": server_name.split()[0].lower()}
+        return servers
+
+    def _expand_dependencies(self, dependencies):
+        """Apply "Map Server" dependencies to every map instance, in both directions."""
+        map_instances = [name for name in self.servers if name not in self.EXECUTABLES]
+        if not map_instances:
+            return dict(dependencies)
+
+        expanded = {}
+        for server_name, depends_on in dependencies.items():
+            depends_on = [dep for dep_name in depends_on
+                          for dep in (map_instances if dep_name == "Map Server" else [dep_name])]
+            targets = map_instances if server_name == "Map Server" else [server_name]
+            for target in targets:
+                expanded.setdefault(target, []).extend(depends_on)
+        return expanded
+
+    def server_names(self):
+        """Names of every server the launcher manages, in start order."""
+        return list(self.servers)
+
+    def get_zone_instance(self, zone_id):
+        """Return the name of the map instance serving a zone, or None if it isn't sharded."""
+        for server_name, server in self.servers.items():
+            for first, last in server["zones"]:
+                if first <= zone_id <= last:
+                    return server_name
+        return None
+
+    def zone_shard_updates(self, server_name=None):
+        """SQL (query, params) pairs that point zone_settings at each map instance's port.
+
+        xi_map instances pick up their zones from xidb, so start_server runs
+        these through the zone shard writer before launching an instance.
+        Pass a server name to get only that instance's zones.
+        """
+        updates = []
+        for name, server in self.servers.items():
+            if not server["port"] or (server_name and name != server_name):
+                continue
+            for first, last in server["zones"]:
+                updates.append((
+                    "UPDATE zone_settings SET zoneport = %s WHERE zoneid BETWEEN %s AND %s",
+                    (server["port"], first, last)
+                ))
+        return updates
+
     def get_timestamp(self):
         """Generate a timestamp for log filenames."""
         return datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -25,6 +153,10 @@ class ServerManager:
         self.server_dir = directory
         self.logger.info(f"Server directory set to: {self.server_dir}")
 
+    def set_zone_shard_writer(self, writer):
+        """Register writer(statements) that runs a list of (query, params) pairs on the game database."""
+        self.zone_shard_writer = writer
+
     def start_server(self, server_name, output_callback):
         if not self.server_dir:
             output_callback("Server directory not set.")
@@ -36,120 +168,296 @@ class ServerManager:
             return None
 
         # Map the correct executable based on the server name
-        executables = {
-            "World Server": "xi_world.exe",
-            "Search Server": "xi_search.exe",
-            "Map Server": "xi_map.exe",
-            "Connect Server": "xi_connect.exe"
-        }
-
-        executable = executables.get(server_name)
-        if not executable:
+        server = self.servers.get(server_name)
+        if not server:
             output_callback(f"Unknown server: {server_name}")
             return None
+        executable = server["executable"]
 
-        # Build the command to execute
-        command = [f'{self.server_dir}/{executable}']
+        updates = self.zone_shard_updates(server_name) if self.zone_shard_writer else []
+        if updates:
+            # The instance reads which zones it serves from zone_settings when it boots
+            try:
+                self.zone_shard_writer(updates)
+            except Exception as e:
+                output_callback(f"Could not apply the zone shard table for {server_name}: {e}")
 
-        try:
-            # Add creationflags=subprocess.CREATE_NO_WINDOW on Windows to prevent new windows from popping up
-            creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
-
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=self.server_dir,  # Set the working directory
-                env=os.environ,  # Pass the current environment variables
-                creationflags=creationflags  # Prevent popups on Windows
-            )
+        # Build the command to execute
+        command = [f'{self.server_dir}/{executable}'] + server["args"]
 
-            # Store the process object for later use (e.g., stopping the server)
-            self.server_processes[server_name] = process
-            self.server_logs[server_name] = {"stdout": [], "stderr": []}  # Initialize logs
+        self.output_callbacks[server_name] = output_callback
+        policy = self.get_restart_policy(server_name)
+        policy.restart_times.clear()  # A manual start resets the restart window
+        policy.held = None  # ...and lifts a crash loop hold
+        self.crash_index.reset(server_name)
 
-            # Start threads to capture stdout and stderr
-            threading.Thread(target=self._capture_output, args=(process.stdout, output_callback, server_name, "stdout"), daemon=True).start()
-            threading.Thread(target=self._capture_output, args=(process.stderr, output_callback, server_name, "stderr"), daemon=True).start()
+        spec = ProcessSpec(
+            server_name,
+            command,
+            cwd=self.server_dir,  # Set the working directory
+            env=os.environ,  # Pass the current environment variables
+            policy=policy,
+            on_start=self._handle_start,
+            on_line=self._handle_line,
+            on_exit=self._handle_exit,
+            on_event=lambda spec, message: self._emit(spec.name, message)
+        )
 
+        try:
+            # The supervisor reads the pipes, waits on the process and applies the restart policy
+            process = self.supervisor.spawn(spec)
             self.logger.info(f"Started {server_name} using {executable}")
-
-            # Monitor the process and handle crashes or stops
-            threading.Thread(target=self.monitor_server, args=(server_name,), daemon=True).start()
-
             return process
-
         except Exception as e:
             output_callback(f"Failed to start {server_name}: {str(e)}")
             return None
 
+    def start_all_servers(self, output_callback, server_names=None, on_complete=None):
+        """Start servers in dependency order, launching independent ones in parallel.
+
+        output_callback(server_name, message) receives progress and output lines.
+        """
+        return self.startup_orchestrator.start_all(server_names or self.server_names(), output_callback, on_complete)
+
+    def add_line_listener(self, listener):
+        """Register listener(server_name, output_type, line) for every captured output line."""
+        # Copy-on-write so the supervisor thread can iterate without locking
+        self.line_listeners = self.line_listeners + [listener]
+
+    def remove_line_listener(self, listener):
+        self.line_listeners = [existing for existing in self.line_listeners if existing is not listener]
+
+    def get_restart_policy(self, server_name):
+        """Return the restart policy for a server, creating a default one on first use."""
+        if server_name not in self.restart_policies:
+            options = dict(self.restart_policy_options)
+            options.update(self.servers.get(server_name, {}).get("restart_policy", {}))
+            self.restart_policies[server_name] = RestartPolicy(
+                depends_on=self.server_dependencies.get(server_name, ()),
+                **options
+            )
+        return self.restart_policies[server_name]
+
+    def set_restart_policy(self, server_name, policy):
+        """Replace the restart policy for a server (any object with `enabled`, `depends_on` and next_delay())."""
+        self.restart_policies[server_name] = policy
+
+    def set_auto_restart(self, server_name, enabled):
+        """Enable or disable automatic restarts for a server."""
+        self.get_restart_policy(server_name).enabled = enabled
+
     def is_server_running(self, server_name):
-        """Check if the server is already running by checking process name."""
-        executables = {
-            "World Server": "xi_world.exe",
-            "Search Server": "xi_search.exe",
-            "Map Server": "xi_map.exe",
-            "Connect Server": "xi_connect.exe"
+        """Check if the server is already running using the cached process table."""
+        if server_name not in self.servers:
+            return False  # Unknown server
+        return self.process_tracker.is_running(server_name)
+
+    def get_server_pids(self):
+        """Return {server name: pid} for every server process that is still running."""
+        return {
+            server_name: process.pid
+            for server_name, process in list(self.server_processes.items())
+            if process.poll() is None
         }
 
-        executable = executables.get(server_name)
-        if not executable:
-            return False  # Unknown server
+    def rescan_processes(self):
+        """Force a full process table scan to adopt servers started outside the launcher.
+
+        Returns {server name: pid} for the servers found running. The scan can
+        take a second or more, so keep it off the Tk thread.
+        """
+        return self.process_tracker.rescan()
 
-        # Check if any process is running with the name of the executable
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'] == executable:
-                return True
-        return False
+    def stop_server(self, server_name, timeout=10):
+        """Stop the server if it's running, or cancel a restart it is waiting on. The exit handler saves the log.
 
-    def stop_server(self, server_name):
-        """Stop the server if it's running and save the log."""
+        Waits up to `timeout` seconds for a graceful exit, then kills the
+        process and waits as long again, so a stop never blocks for good.
+        """
         process = self.server_processes.get(server_name)
         if process and process.poll() is None:  # Ensure the process is still running
-            process.terminate()  # Gracefully terminate the process
-            process.wait()  # Wait for the process to fully terminate
+            process.terminate()  # Gracefully terminate the process, a requested stop is never restarted
+            if process.wait(timeout) is None:
+                self.logger.warning(f"{server_name} did not exit within {timeout}s, killing it.")
+                process.kill()
+                if process.wait(timeout) is None:
+                    self.logger.error(f"{server_name} is still running after being killed.")
+                    return
             self.logger.info(f"{server_name} has been stopped.")
-            self.save_log(server_name, "stopped")
+        elif self.supervisor.cancel_restart(server_name):
+            self.logger.info(f"{server_name} was waiting to restart; the restart is cancelled.")
         else:
             self.logger.warning(f"No running process found for {server_name}.")
 
+    def _create_log_buffers(self):
+        """Create fresh stdout/stderr ring buffers for a server."""
+        return {
+            output_type: LogRingBuffer(max_lines=self.log_max_lines, max_bytes=self.log_max_bytes)
+            for output_type in ("stdout", "stderr")
+        }
+
+    def _create_log_writer(self, server_name):
+        """Open the rotating on-disk log for a server, closing any previous one."""
+        previous_writer = self.log_writers.get(server_name)
+        if previous_writer:
+            previous_writer.close()
+
+        # Fall back to the crash log folder when no log output folder has been chosen
+        log_dir = self.log_output_dir or os.path.join(self.crash_log_dir, "server_logs")
+        try:
+            return RotatingLogWriter(
+                log_dir,
+                server_name.replace(" ", "_"),
+                max_bytes=self.log_rotate_bytes,
+                max_age=self.log_rotate_seconds,
+                compression=self.log_compression
+            )
+        except OSError as e:
+            self.logger.error(f"Failed to open log file for {server_name} in {log_dir}: {e}")
+            return None
+
     def save_log(self, server_name, status):
-        """Save the logs for the server to the crash or stop log folder."""
+        """Save the recent logs for the server to the crash or stop log folder and return the file path."""
         log_file_path = os.path.join(self.crash_log_dir, f"{server_name}_{status}_{self.get_timestamp()}.log")
 
         if server_name not in self.server_logs:
-            return
+            return None
 
-        # Combine stdout and stderr and save them to a log file
+        # Write the in-memory tail of each stream plus pointers to the full on-disk history
         try:
             with open(log_file_path, 'w') as log_file:
                 log_file.write(f"Logs for {server_name} ({status}):\n\n")
-                log_file.write("STDOUT:\n" + "\n".join(self.server_logs[server_name]["stdout"]) + "\n")
-                log_file.write("STDERR:\n" + "\n".join(self.server_logs[server_name]["stderr"]) + "\n")
+                log_writer = self.log_writers.get(server_name)
+                if log_writer:
+                    log_file.write(f"Full log: {log_writer.live_segment}\n")
+                    for segment in log_writer.segments()[:-1]:
+                        log_file.write(f"Rotated segment: {segment}\n")
+                    log_file.write("\n")
+                for output_type, buffer in self.server_logs[server_name].items():
+                    tail = buffer.tail()
+                    log_file.write(f"{output_type.upper()} (last {len(tail)} lines):\n")
+                    log_file.writelines(line + "\n" for line in tail)
+                    log_file.write("\n")
             self.logger.info(f"Log saved for {server_name} at {log_file_path}")
+            return log_file_path
         except Exception as e:
             self.logger.error(f"Failed to save log for {server_name}: {e}")
+            return None
 
-    def monitor_server(self, server_name):
-        """Monitor the server process and handle if it crashes or stops."""
-        process = self.server_processes.get(server_name)
-        if process:
-            process.wait()  # Wait for the process to finish
-            if process.returncode != 0:
-                self.logger.warning(f"{server_name} crashed with exit code {process.returncode}")
-                self.save_log(server_name, "crashed")
-            else:
-                self.save_log(server_name, "stopped")
+    def _record_crash(self, server_name, returncode):
+        """Fingerprint a crash, write or extend its crash log, and hold restarts if it is looping."""
+        logs = self.server_logs.get(server_name, {})
+        # xi_* servers log most errors to stdout, so use its tail when stderr has nothing
+        tail = logs["stderr"].tail(50) if "stderr" in logs else []
+        if not tail and "stdout" in logs:
+            tail = logs["stdout"].tail(50)
+        signature, entry, crash_loop = self.crash_index.record(server_name, returncode, tail)
+
+        log_file = entry["log_file"]
+        if log_file and os.path.exists(log_file):
+            # A known crash: note the repeat in its existing log instead of writing another file
+            try:
+                with open(log_file, "a") as file:
+                    file.write(f"Repeated at {self.get_timestamp()} (exit code {returncode}, seen {entry['count']} times)\n")
+            except OSError as e:
+                self.logger.error(f"Failed to update crash log {log_file}: {e}")
+        else:
+            entry["log_file"] = self.save_log(server_name, "crashed")
+        self.crash_index.save()
+
+        if entry["count"] > 1:
+            self._emit(server_name, f"Same crash as before (signature {signature}, seen {entry['count']} times).")
+        if crash_loop:
+            reason = (f"crash loop, signature {signature} seen {self.crash_index.threshold} times "
+                      f"within {self.crash_index.window}s")
+            self.get_restart_policy(server_name).held = reason
+            self.logger.error(f"{server_name}: {reason}; restarts held until it is started manually")
 
-    def _capture_output(self, pipe, output_callback, server_name, output_type):
-        """Capture and log the output from the process's stdout or stderr."""
+    def _handle_start(self, spec, process):
+        """Supervisor callback: a server process was launched (first start or restart)."""
+        server_name = spec.name
+        self.server_processes[server_name] = process
+        self.process_tracker.register(server_name, process.pid)
+        self._apply_cpu_affinity(server_name, process.pid)
+        self.server_logs[server_name] = self._create_log_buffers()  # Initialize logs
+        self.log_writers[server_name] = self._create_log_writer(server_name)
+        self.started_at[server_name] = time.time()
+        if spec.restart_count:
+            self.restart_counts.labels(server_name).inc()
+            self._emit(server_name, f"Restarted {server_name} with PID: {process.pid}")
+
+    def _apply_cpu_affinity(self, server_name, pid):
+        """Pin a server process to the CPUs configured for it, if any."""
+        cpus = self.servers[server_name]["cpu_affinity"]
+        if not cpus:
+            return
         try:
-            with pipe:
-                for line in iter(pipe.readline, ''):
-                    output_callback(f"[{server_name}][{output_type.upper()}] {line.strip()}")
-                    if server_name in self.server_logs:
-                        self.server_logs[server_name][output_type].append(line.strip())
-        except Exception as e:
-            output_callback(f"Error capturing output from {server_name}: {str(e)}")
+            psutil.Process(pid).cpu_affinity(cpus)
+        except (psutil.Error, AttributeError, ValueError) as e:
+            # cpu_affinity isn't available on every platform
+            self.logger.warning(f"Could not set CPU affinity {cpus} for {server_name}: {e}")
+
+    def _handle_exit(self, spec, returncode, stop_requested):
+        """Supervisor callback: a server process exited and its pipes are drained."""
+        server_name = spec.name
+        self.process_tracker.forget(server_name)
+        self.started_at.pop(server_name, None)
+
+        if stop_requested:
+            self.save_log(server_name, "stopped")
+        elif returncode != 0:
+            self.logger.warning(f"{server_name} crashed with exit code {returncode}")
+            self._emit(server_name, f"{server_name} crashed with exit code {returncode}.")
+            self.crash_counts.labels(server_name).inc()
+            self._record_crash(server_name, returncode)
+        else:
+            self._emit(server_name, f"{server_name} has stopped.")
+            self.save_log(server_name, "stopped")
+
+        log_writer = self.log_writers.get(server_name)
+        if log_writer:
+            log_writer.close()
+
+    def _handle_line(self, server_name, output_type, line):
+        """Supervisor callback: record one line of stdout or stderr output."""
+        self._emit(server_name, f"[{server_name}][{output_type.upper()}] {line}")
+        self.line_counts.labels(server_name, output_type).inc()
+        if server_name in self.server_logs:
+            self.server_logs[server_name][output_type].append(line)
+        log_writer = self.log_writers.get(server_name)
+        if log_writer:
+            log_writer.write_line(f"[{output_type.upper()}] {line}")
+        for listener in self.line_listeners:
+            try:
+                listener(server_name, output_type, line)
+            except Exception as e:
+                self.logger.error(f"Line listener {listener} for {server_name} failed: {e}")
+
+    def collect_metrics(self):
+        """Scrape-time metrics: up/down, uptime and restart holds, read from cached state only."""
+        now = time.time()
+        up, uptime, held = [], [], []
+        for server_name in self.server_names():
+            labels = {"server": server_name}
+            process = self.server_processes.get(server_name)
+            running = process is not None and process.poll() is None  # No process table scan on the scrape thread
+            up.append((labels, 1 if running else 0))
+            started_at = self.started_at.get(server_name)
+            if running and started_at:
+                uptime.append((labels, now - started_at))
+            policy = self.restart_policies.get(server_name)
+            held.append((labels, 1 if getattr(policy, "held", None) else 0))
+        return [
+            ("xi_server_up", "Whether the server process is running", "gauge", up),
+            ("xi_server_uptime_seconds", "Seconds since the server process was launched", "gauge", uptime),
+            ("xi_server_restart_held", "Whether automatic restarts are held after a crash loop", "gauge", held),
+        ]
+
+    def _emit(self, server_name, message):
+        """Forward a message to the output callback registered for a server."""
+        output_callback = self.output_callbacks.get(server_name)
+        if output_callback:
+            try:
+                output_callback(message)
+            except Exception as e:
+                self.logger.error(f"Output callback for {server_name} failed: {e}")
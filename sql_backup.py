@@ -0,0 +1,383 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import mysql.connector
+from sql_jobs import BINARY_TYPES, CSV_NULL, QueryCancelled, QueryJob
+
+try:
+    import zstandard  # Optional, only needed for compression="zstd"
+except ImportError:
+    zstandard = None
+
+MANIFEST = "manifest.json"
+
+
+class BackupEngine:
+    """Parallel logical backup and restore of the game database.
+
+    A backup reads every table through `workers` connections that all share
+    one consistent InnoDB snapshot: FLUSH TABLES WITH READ LOCK is held only
+    long enough for each connection to START TRANSACTION WITH CONSISTENT
+    SNAPSHOT, so the live server is never blocked for the length of the dump.
+    Rows are streamed into compressed CSV chunks of `chunk_rows` rows, and a
+    manifest with the table definitions is written last, so a directory with
+    a manifest is always a complete backup. A restore recreates the tables
+    and loads the chunks in parallel with foreign key and unique checks off.
+    """
+
+    def __init__(self, sql_manager, workers=4, chunk_rows=100000, compression="gzip"):
+        self.sql_manager = sql_manager
+        self.workers = max(1, workers)
+        self.chunk_rows = chunk_rows  # Rows per chunk file; chunks are the unit of parallel restore
+        self.logger = logging.getLogger(__name__)
+        if compression == "zstd" and zstandard is None:
+            self.logger.warning("zstandard is not installed, falling back to gzip for backups.")
+            compression = "gzip"
+        self.compression = compression
+
+    def submit_backup(self, directory, progress=None):
+        """Back up the database into a new folder under `directory` on the SQL worker pool.
+
+        Returns a QueryJob whose future resolves to the backup folder.
+        """
+        job = QueryJob("BACKUP")
+        job.future = self.sql_manager.executor.submit(self.backup, directory, progress, job)
+        return job
+
+    def submit_restore(self, directory, progress=None):
+        """Restore a backup folder on the SQL worker pool; the job's future resolves to the row count."""
+        job = QueryJob("RESTORE")
+        job.future = self.sql_manager.executor.submit(self.restore, directory, progress, job)
+        return job
+
+    def backup(self, directory, progress=None, job=None):
+        """Dump every base table into a new timestamped folder under `directory` and return its path.
+
+        progress(rows_done, estimated_total) is called from the reader threads.
+        """
+        job = job or QueryJob("BACKUP")
+        database = self.sql_manager.connection_config["database"]
+        folder = self._new_folder(directory, f"{database}-{datetime.datetime.now():%Y%m%d-%H%M%S}")
+
+        coordinator = self._connect()
+        readers = []
+        try:
+            tables, estimated_total = self._describe_tables(coordinator)
+            readers, consistent = self._open_snapshots(coordinator, min(self.workers, len(tables)) or 1)
+
+            pending = queue.Queue()
+            for table in tables:  # Largest first, so the long tables don't end up last
+                pending.put(table)
+            counter_lock = threading.Lock()
+            errors = []
+
+            def read_tables(connection):
+                while not errors:
+                    try:
+                        table = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        self._dump_table(connection, table, folder, job, progress, estimated_total, counter_lock)
+                    except Exception as e:
+                        errors.append(e)
+                        job.cancelled = True  # Stop the other readers too
+
+            threads = [
+                threading.Thread(target=read_tables, args=(connection,), daemon=True, name=f"Backup-{index}")
+                for index, connection in enumerate(readers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if errors:
+                raise errors[0]
+            if job.cancelled:
+                raise QueryCancelled()
+
+            manifest = {
+                "format": 1,
+                "database": database,
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "consistent": consistent,
+                "compression": self.compression,
+                "rows": job.rows_fetched,
+                "tables": {table["name"]: table for table in tables}
+            }
+            # Written last, under a temporary name, so an interrupted backup has no manifest
+            temp_path = os.path.join(folder, MANIFEST + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            os.replace(temp_path, os.path.join(folder, MANIFEST))
+            self.logger.info(f"Backed up {job.rows_fetched} rows from {len(tables)} tables into {folder}")
+            return folder
+        finally:
+            for connection in readers:
+                self._close(connection)
+            self._close(coordinator)
+
+    def restore(self, folder, progress=None, job=None):
+        """Recreate every table in a backup folder and load its chunks in parallel. Returns the row count."""
+        job = job or QueryJob("RESTORE")
+        with open(os.path.join(folder, MANIFEST), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        tables = manifest["tables"]
+        total_rows = manifest.get("rows")
+
+        coordinator = self._connect()
+        try:
+            cursor = coordinator.cursor()
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            for name, table in tables.items():
+                cursor.execute(f"DROP TABLE IF EXISTS `{name}`")
+                cursor.execute(table["create"])
+            cursor.close()
+        finally:
+            self._close(coordinator)
+        self.sql_manager.query_cache.clear()
+
+        chunks = [(table, chunk) for table in tables.values() for chunk in table["chunks"]]
+        chunks.sort(key=lambda item: item[1]["rows"], reverse=True)
+        local = threading.local()
+        connections = []
+        counter_lock = threading.Lock()
+
+        def load(table, chunk):
+            if job.cancelled:
+                raise QueryCancelled()
+            connection = getattr(local, "connection", None)
+            if connection is None:
+                connection = local.connection = self._connect()
+                with counter_lock:
+                    connections.append(connection)
+                cursor = connection.cursor()
+                cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+                cursor.close()
+            self._load_chunk(connection, table, os.path.join(folder, chunk["file"]), job, progress, total_rows, counter_lock)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Restore") as pool:
+                futures = [pool.submit(load, table, chunk) for table, chunk in chunks]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception:
+                        job.cancelled = True  # Let the other chunks bail out early
+                        raise
+        finally:
+            for connection in connections:
+                self._close(connection)
+        self.logger.info(f"Restored {job.rows_fetched} rows into {len(tables)} tables from {folder}")
+        return job.rows_fetched
+
+    def _describe_tables(self, connection):
+        """List the base tables with their definitions, dumpable columns and an estimated total row count."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT TABLE_NAME, COALESCE(TABLE_ROWS, 0) FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE' "
+                "ORDER BY DATA_LENGTH DESC"
+            )
+            tables = [{"name": name, "estimated_rows": int(rows)} for name, rows in cursor.fetchall()]
+
+            cursor.execute(
+                "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, EXTRA FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+            )
+            columns = {}
+            for table_name, column, data_type, extra in cursor.fetchall():
+                if "GENERATED" in (extra or "").upper():
+                    continue  # Computed by the server, can't be inserted
+                columns.setdefault(table_name, []).append((column, data_type.lower() in BINARY_TYPES))
+
+            for table in tables:
+                cursor.execute(f"SHOW CREATE TABLE `{table['name']}`")
+                table["create"] = cursor.fetchone()[1]
+                table["columns"] = [column for column, _ in columns.get(table["name"], [])]
+                table["binary_columns"] = [column for column, binary in columns.get(table["name"], []) if binary]
+                table["rows"] = 0
+                table["chunks"] = []
+            return tables, sum(table.pop("estimated_rows") for table in tables)
+        finally:
+            cursor.close()
+
+    def _open_snapshots(self, coordinator, count):
+        """Open `count` reader connections on one shared snapshot. Returns (connections, consistent)."""
+        cursor = coordinator.cursor()
+        try:
+            cursor.execute("FLUSH TABLES WITH READ LOCK")
+        except mysql.connector.Error as e:
+            # Without the RELOAD privilege separate snapshots can't be lined up, so read on one connection
+            self.logger.warning(f"FLUSH TABLES WITH READ LOCK failed ({e}), backing up on a single connection.")
+            cursor.close()
+            connection = self._connect()
+            self._start_snapshot(connection)
+            return [connection], True
+
+        connections = []
+        try:
+            for _ in range(count):
+                connection = self._connect()
+                connections.append(connection)
+                self._start_snapshot(connection)
+        except Exception:
+            for connection in connections:
+                self._close(connection)
+            raise
+        finally:
+            cursor.execute("UNLOCK TABLES")
+            cursor.close()
+        return connections, True
+
+    @staticmethod
+    def _start_snapshot(connection):
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        cursor.close()
+
+    @staticmethod
+    def _new_folder(directory, name):
+        """Create and return a folder that didn't exist yet, adding "-2", "-3", ... if `name` is taken."""
+        folder = os.path.join(directory, name)
+        suffix = 1
+        while True:
+            try:
+                os.makedirs(folder)
+                return folder
+            except FileExistsError:
+                suffix += 1
+                folder = os.path.join(directory, f"{name}-{suffix}")
+
+    def _dump_table(self, connection, table, folder, job, progress, estimated_total, counter_lock):
+        """Stream one table into numbered chunk files, recording them on the table entry."""
+        binary = [column in table["binary_columns"] for column in table["columns"]]
+        column_list = ", ".join(f"`{column}`" for column in table["columns"])
+        cursor = connection.cursor(buffered=False)
+        chunk_file = None
+        chunk_rows = 0
+        try:
+            cursor.execute(f"SELECT {column_list} FROM `{table['name']}`")
+            while True:
+                if job.cancelled:
+                    # Stop the server streaming the rest of the table before the connection closes
+                    self.sql_manager.kill_connection_query(connection.connection_id)
+                    try:
+                        cursor.fetchall()
+                    except mysql.connector.Error:
+                        pass
+                    raise QueryCancelled()
+                rows = cursor.fetchmany(self.sql_manager.transfer_batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    if chunk_file is None:
+                        name = f"{table['name']}.{len(table['chunks']):05d}.csv{self._extension()}"
+                        chunk_file, writer = self._open_chunk(os.path.join(folder, name), "w")
+                        table["chunks"].append({"file": name, "rows": 0})
+                        chunk_rows = 0
+                    writer.writerow([
+                        CSV_NULL if value is None else value.hex() if is_binary
+                        else ",".join(sorted(value)) if isinstance(value, set) else value  # SET columns
+                        for value, is_binary in zip(row, binary)
+                    ])
+                    chunk_rows += 1
+                    if chunk_rows >= self.chunk_rows:
+                        table["chunks"][-1]["rows"] = chunk_rows
+                        chunk_file.close()
+                        chunk_file = None
+                table["rows"] += len(rows)
+                with counter_lock:
+                    job.rows_fetched += len(rows)
+                    done = job.rows_fetched
+                if progress:
+                    progress(done, estimated_total)
+        finally:
+            if chunk_file is not None:
+                table["chunks"][-1]["rows"] = chunk_rows
+                chunk_file.close()
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+
+    def _load_chunk(self, connection, table, path, job, progress, total_rows, counter_lock):
+        """Insert one chunk file with batched executemany and commit it as one transaction."""
+        columns = table["columns"]
+        binary = [column in table["binary_columns"] for column in columns]
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        insert = f"INSERT INTO `{table['name']}` ({column_list}) VALUES ({placeholders})"
+        batch_size = self.sql_manager.transfer_batch_size
+
+        chunk_file, reader = self._open_chunk(path, "r")
+        cursor = connection.cursor()
+        try:
+            rows = []
+            for record in reader:
+                rows.append([
+                    None if value == CSV_NULL else bytes.fromhex(value) if is_binary else value
+                    for value, is_binary in zip(record, binary)
+                ])
+                if len(rows) >= batch_size:
+                    self._insert_batch(cursor, insert, rows, job, progress, total_rows, counter_lock)
+                    rows = []
+            if rows:
+                self._insert_batch(cursor, insert, rows, job, progress, total_rows, counter_lock)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            chunk_file.close()
+
+    @staticmethod
+    def _insert_batch(cursor, insert, rows, job, progress, total_rows, counter_lock):
+        if job.cancelled:
+            raise QueryCancelled()
+        cursor.executemany(insert, rows)
+        with counter_lock:
+            job.rows_fetched += len(rows)
+            done = job.rows_fetched
+        if progress:
+            progress(done, total_rows)
+
+    def _extension(self):
+        return ".zst" if self.compression == "zstd" else ".gz"
+
+    def _open_chunk(self, path, mode):
+        """Open a compressed chunk for CSV writing or reading; returns (file, csv writer/reader)."""
+        if path.endswith(".zst"):
+            raw = open(path, mode + "b")
+            if mode == "w":
+                stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+            else:
+                stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        else:
+            # Level 1 keeps compression from becoming the bottleneck of a large dump
+            text = gzip.open(path, mode + "t", compresslevel=1, encoding="utf-8", newline="")
+        return text, (csv.writer(text) if mode == "w" else csv.reader(text))
+
+    def _connect(self):
+        """A dedicated connection, so long-running dump and load statements neither hold
+        pool slots nor inherit the SQL tab's statement timeout."""
+        if self.sql_manager.connection_config is None:
+            raise mysql.connector.Error("No database connection. Please connect first.")
+        return mysql.connector.connect(**self.sql_manager.connection_config)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except mysql.connector.Error as e:
+            self.logger.warning(f"Error closing backup connection: {e}")
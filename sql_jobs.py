@@ -0,0 +1,28 @@
+import time
+
+# Shared by the GUI, SQLManager and BackupEngine; kept free of mysql.connector so importing it is cheap
+
+CSV_NULL = "\\N"  # How NULL is written to CSV; LOAD DATA reads it back as NULL
+BINARY_TYPES = {"binary", "varbinary", "tinyblob", "blob", "mediumblob", "longblob"}  # Hex-encoded in CSV files
+
+
+class QueryCancelled(Exception):
+    """Raised by a query job that was cancelled before or while it ran."""
+
+
+class QueryJob:
+    """A query submitted to the SQLManager worker pool.
+
+    `future` resolves to a ResultStream for statements that return rows or
+    {"rowcount": n} otherwise. `connection_id` is the server thread running
+    the statement, used to KILL QUERY it on cancel.
+    """
+
+    def __init__(self, query, params=None):
+        self.query = query
+        self.params = params
+        self.future = None
+        self.connection_id = None
+        self.cancelled = False
+        self.rows_fetched = 0
+        self.started_at = time.monotonic()
@@ -1,121 +1,839 @@
+import csv
+import itertools
+import os
+import re
+import threading
+import time
+import logging
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import mysql.connector
-import tkinter as tk
+from mysql.connector import errorcode, pooling
+from query_cache import QueryCache
+from sql_jobs import BINARY_TYPES, CSV_NULL, QueryCancelled, QueryJob
+from metrics import REGISTRY
+
+try:
+    import pyarrow as pa  # Optional, only needed for Parquet import/export
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+class ResultStream:
+    """A query result for the SQL tab's result grid, read in pages.
+
+    open() returns as soon as the first page has arrived, so the grid can show
+    it straight away. If more rows follow, the rest are read on the worker
+    pool in the background while `loading` is set; the connection goes back
+    to the pool when the result ends, `max_rows` is reached (the remaining
+    rows are discarded and `truncated` is set) or close() is called.
+    Scrolling back slices the rows read so far instead of re-running the
+    query, so it works for any statement that returns rows (SHOW, DESCRIBE,
+    ...) and always shows the same rows.
+    """
+
+    def __init__(self, manager, job, page_size=500, max_rows=100000):
+        self.manager = manager
+        self.job = job
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.columns = []
+        self.rows = []
+        self.truncated = False  # More rows than max_rows; the rest were not read
+        self.loading = False  # Later pages are still being read in the background
+        self.error = None  # Why background reading stopped early, if it failed
+        self._closed = False
+        self._connection = None
+        self._cursor = None
+
+    @classmethod
+    def from_rows(cls, manager, job, page_size, columns, rows):
+        """A stream over rows already in memory (a cached or prepared statement result)."""
+        stream = cls(manager, job, page_size)
+        stream.columns = list(columns)
+        stream.rows = rows
+        job.rows_fetched = len(rows)
+        return stream
+
+    def open(self):
+        """Run the query and read its first page. Returns self, or {"rowcount": n} for statements without rows."""
+        self._connection = self.manager.acquire_connection()
+        try:
+            self.job.connection_id = self._connection.connection_id
+            if self.job.cancelled:
+                raise QueryCancelled()
+            self._cursor = self._connection.cursor(buffered=False)
+            with self.manager.query_latency.labels("stream").time():
+                self._cursor.execute(self.job.query, self.job.params)
+            if not self._cursor.with_rows:
+                self._connection.commit()
+                self.manager.query_cache.note_statement(self.job.query)
+                rowcount = self._cursor.rowcount
+                self._finish()
+                return {"rowcount": rowcount}
+            self.columns = list(self._cursor.column_names)
+            self.manager.query_cache.note_statement(self.job.query)
+            self.loading = True
+            if self.job.cancelled:
+                self._abandon()
+                raise QueryCancelled()
+            self._read_page()
+        except BaseException:
+            self._finish()
+            raise
+        if self.loading:
+            self.manager.executor.submit(self._read_rest)
+        return self
+
+    def close(self):
+        """Stop reading further pages; the rows read so far stay available."""
+        self._closed = True
+
+    def _read_rest(self):
+        """Read the remaining pages in the background until the result ends, the cap is reached or close()."""
+        try:
+            while self.loading:
+                if self._closed or self.job.cancelled:
+                    self._abandon()
+                    self._finish()
+                    return
+                self._read_page()
+        except Exception as e:
+            if not (self._closed or self.job.cancelled):
+                self.error = e
+                self.manager.logger.error(f"Error reading the rest of a query result: {e}")
+            self._finish()
+
+    def _read_page(self):
+        """Read one page, finishing the stream at the end of the result or at max_rows."""
+        rows = self._cursor.fetchmany(min(self.page_size, self.max_rows - len(self.rows)) or 1)
+        if len(self.rows) >= self.max_rows:
+            if rows:
+                self.truncated = True
+                self._abandon()
+            self._finish()
+            return
+        self.rows.extend(rows)
+        self.job.rows_fetched = len(self.rows)
+        if not rows:
+            self._finish()
+            self.manager.query_cache.put(self.job.query, self.job.params, self.columns, self.rows)
+
+    def _abandon(self):
+        """Stop the server streaming the remaining rows, then clear what is left on the wire."""
+        self.manager.kill_connection_query(self._connection.connection_id)
+        try:
+            self._cursor.fetchall()
+        except mysql.connector.Error:
+            pass
+
+    def _finish(self):
+        """Close the cursor and give the connection back to the pool."""
+        self.loading = False
+        if self._cursor is not None:
+            try:
+                self._cursor.close()
+            except mysql.connector.Error:
+                pass
+            self._cursor = None
+        if self._connection is not None:
+            self.manager.release_connection(self._connection)
+            self._connection = None
+
 
 class SQLManager:
-    def __init__(self, gui=None):
-        self.connection = None
+    def __init__(self, gui=None, pool_size=5, query_timeout=30, reconnect_attempts=5, checkout_timeout=10,
+                 transfer_batch_size=5000, transfer_transaction_rows=50000, query_cache=None, prepared_cache_size=32,
+                 metrics=None, result_max_rows=100000):
+        self.pool = None
         self.gui = gui  # Pass the GUI instance to SQLManager to access the textbox
+        self.pool_size = pool_size  # Connections shared by the SQL tab and background jobs
+        self.query_timeout = query_timeout  # Seconds before the server aborts a statement (0 disables)
+        self.reconnect_attempts = reconnect_attempts
+        self.checkout_timeout = checkout_timeout  # Seconds to wait for a free pooled connection
+        self.connection_config = None
+        self.timeout_variable = None  # Session variable used for query_timeout, detected on first use
+        self._slots = threading.BoundedSemaphore(pool_size)  # Lets callers wait for a free connection; shared by every pool, never replaced
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="SQLWorker")
+        self.transfer_batch_size = transfer_batch_size  # Rows per fetchmany/executemany during import and export
+        self.transfer_transaction_rows = transfer_transaction_rows  # Rows per commit during import
+        self.query_cache = query_cache or QueryCache()  # Disabled unless the caller opts in
+        self.prepared_cache_size = prepared_cache_size  # Prepared statements kept open per pooled connection
+        self.result_max_rows = result_max_rows  # Rows of an SQL tab result kept in memory; the rest are dropped
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> OrderedDict(sql -> prepared cursor)
+        self._prepared_lock = threading.Lock()
+        self._pool_ids = itertools.count(1)
+        self._timed_sessions = weakref.WeakSet()  # Connections whose current session has the query timeout set
+        # Time spent in cursor.execute, by how the query was run: "adhoc", "stream" or "prepared"
+        self.query_latency = (metrics or REGISTRY).histogram(
+            "xi_sql_query_duration_seconds", "SQL statement execution time", ("kind",)
+        )
+        self.logger = logging.getLogger(__name__)
 
     def connect(self, host, user, password, database, port=3306):
-        """Connect to the SQL database using the provided credentials."""
+        """Create a connection pool for the SQL database using the provided credentials."""
         try:
-            if self.connection and self.connection.is_connected():
+            if self.pool and self.is_connected():
                 self.log_to_textbox("Already connected to the database.")
                 return True
 
-            # Establish a new connection
-            self.connection = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database,
-                port=port
+            self.connection_config = {
+                "host": host,
+                "user": user,
+                "password": password,
+                "database": database,
+                "port": port
+            }
+            self.pool = pooling.MySQLConnectionPool(
+                pool_name=f"xidb_{id(self)}_{next(self._pool_ids)}",  # Tells a reconnect's pool from a closed one
+                pool_size=self.pool_size,
+                # Resetting the session on every return would deallocate the cached prepared statements
+                pool_reset_session=False,
+                **self.connection_config
             )
             self.log_to_textbox(f"Successfully connected to database '{database}' at {host}:{port}")
             return True
         except mysql.connector.Error as e:
+            self.pool = None
             self.log_to_error_log(f"Error connecting to the SQL database: {e}")
-            return False  
+            return False
+
+    @contextmanager
+    def pooled_connection(self):
+        """Check out a healthy connection from the pool and return it when done.
+
+        Waits up to checkout_timeout for a free connection, reconnects dead ones
+        with exponential backoff and applies the per-query timeout.
+        """
+        connection = self.acquire_connection()
+        try:
+            yield connection
+        finally:
+            self.release_connection(connection)
+
+    @contextmanager
+    def dedicated_connection(self, **options):
+        """A connection outside the pool, for bulk transfers that run for minutes.
+
+        It holds no pool slot and skips the per-query timeout, which would
+        otherwise kill a multi-million-row export or import part way through.
+        """
+        if self.connection_config is None:
+            raise mysql.connector.Error("No database connection. Please connect first.")
+        connection = mysql.connector.connect(**self.connection_config, **options)
+        try:
+            yield connection
+        finally:
+            try:
+                connection.close()
+            except mysql.connector.Error as e:
+                self.logger.warning(f"Error closing a dedicated connection: {e}")
+
+    def acquire_connection(self):
+        """Check out a healthy pooled connection; pair every call with release_connection()."""
+        if self.pool is None:
+            raise mysql.connector.Error("No database connection. Please connect first.")
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise mysql.connector.Error(f"No free database connection after {self.checkout_timeout}s.")
+        try:
+            return self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release_connection(self, connection):
+        """Return a connection checked out with acquire_connection() to the pool."""
+        try:
+            # The pool doesn't reset sessions (that would drop the prepared statements), so end any
+            # transaction a read left open; otherwise the next user sees a stale REPEATABLE READ snapshot
+            if connection.is_connected() and connection.in_transaction:
+                connection.rollback()
+        except mysql.connector.Error as e:
+            self.logger.warning(f"Error ending the transaction before returning a connection: {e}")
+        try:
+            if self.pool is None or connection.pool_name != self.pool.pool_name:
+                connection.disconnect()  # Its pool was closed while the connection was out
+            else:
+                connection.close()  # Returns the connection to the pool
+        except mysql.connector.Error as e:
+            self.logger.warning(f"Error returning connection to the pool: {e}")
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        """Get a connection from the pool, reconnecting with backoff if the server went away."""
+        delay = 0.5
+        for attempt in range(1, self.reconnect_attempts + 1):
+            connection = None
+            try:
+                connection = self.pool.get_connection()
+                raw_connection = getattr(connection, "_cnx", connection)
+                if not connection.is_connected():
+                    # A new session has none of the old statements or settings
+                    self._forget_prepared(connection)
+                    self._timed_sessions.discard(raw_connection)
+                    connection.reconnect(attempts=1, delay=0)
+                if raw_connection not in self._timed_sessions:
+                    self._apply_query_timeout(connection)
+                    self._timed_sessions.add(raw_connection)
+                return connection
+            except mysql.connector.Error as e:
+                if connection is not None:
+                    try:
+                        connection.close()  # Give the broken connection back so the pool can reopen it
+                    except mysql.connector.Error:
+                        pass
+                if attempt == self.reconnect_attempts:
+                    raise
+                self.logger.warning(f"Database connection failed ({e}), retrying in {delay:.1f}s "
+                                    f"({attempt}/{self.reconnect_attempts})")
+                time.sleep(delay)
+                delay = min(delay * 2, 10)
+
+    def _apply_query_timeout(self, connection):
+        """Limit statement run time for this session (MariaDB max_statement_time, MySQL max_execution_time)."""
+        if not self.query_timeout:
+            return
+        cursor = connection.cursor()
+        try:
+            if self.timeout_variable is None:
+                try:
+                    cursor.execute("SET SESSION max_statement_time = %s", (self.query_timeout,))
+                    self.timeout_variable = "max_statement_time"
+                except mysql.connector.Error:
+                    cursor.execute("SET SESSION max_execution_time = %s", (int(self.query_timeout * 1000),))
+                    self.timeout_variable = "max_execution_time"
+            elif self.timeout_variable == "max_statement_time":
+                cursor.execute("SET SESSION max_statement_time = %s", (self.query_timeout,))
+            else:
+                cursor.execute("SET SESSION max_execution_time = %s", (int(self.query_timeout * 1000),))
+        finally:
+            cursor.close()
 
     def execute_query(self, query, params=None):
-        """Execute any SQL query and display the results in the GUI."""
-        if self.connection is None or not self.is_connected():
+        """Execute any SQL query on a pooled connection and display the results in the GUI.
+
+        Returns the fetched rows for statements that produce rows, otherwise the
+        affected row count, or None on failure. Only the row count is logged;
+        the SQL tab shows rows through open_stream and the result grid.
+        """
+        if self.pool is None:
             self.log_to_textbox("No database connection or lost connection. Please connect first.", is_error=True)
             return None
 
-        try:
-            # Use a basic cursor
-            cursor = self.connection.cursor()
+        cached = self.query_cache.get(query, params)
+        if cached:
+            results = cached[1]
+            self.log_to_textbox(f"Query served from cache. Fetched {len(results)} rows.", is_error=False)
+            return results
 
-            # Execute the query
-            cursor.execute(query, params)
-
-            # Fetch the results if there are any
-            if cursor.with_rows:
-                results = cursor.fetchall()
-                self.log_to_textbox(f"Query executed successfully. Fetched {len(results)} rows.", is_error=False)
+        try:
+            with self.pooled_connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    # Execute the query
+                    with self.query_latency.labels("adhoc").time():
+                        cursor.execute(query, params)
 
-                # Insert the result of the query into the GUI
-                for row in results:
-                    self.log_to_textbox(str(row), is_error=False)  # Show each row in the text box
+                    # Fetch the results if there are any
+                    if cursor.with_rows:
+                        results = cursor.fetchall()
+                        self.query_cache.note_statement(query)  # e.g. a CALL that writes and returns rows
+                        self.query_cache.put(query, params, cursor.column_names, results)
+                        self.log_to_textbox(f"Query executed successfully. Fetched {len(results)} rows.", is_error=False)
+                        return results
 
-            return cursor
+                    connection.commit()
+                    self.query_cache.note_statement(query)
+                    self.log_to_textbox(f"Query executed successfully. {cursor.rowcount} rows affected.", is_error=False)
+                    return cursor.rowcount
+                finally:
+                    cursor.close()  # Ensure the cursor is closed after execution
         except mysql.connector.Error as e:
             # More detailed error logging
             self.log_to_textbox(f"SQL query failed: {e}", is_error=True)
             return None
+
+
+    def execute_statements(self, statements):
+        """Run (query, params) pairs that don't return rows in one transaction; raises mysql.connector.Error."""
+        with self.pooled_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                for query, params in statements:
+                    cursor.execute(query, params)
+                connection.commit()
+            finally:
+                cursor.close()
+        for query, _ in statements:
+            self.query_cache.note_statement(query)
+
+    def open_stream(self, query, params=None, page_size=500):
+        """Execute a query on the worker pool and stream its result for paging.
+
+        The job's future resolves to a ResultStream once its first page has
+        been read (the rest, up to result_max_rows rows, follow in the
+        background), or to {"rowcount": n} for statements without rows.
+        """
+        job = QueryJob(query, params)
+        job.future = self.executor.submit(self._open_stream_job, job, page_size)
+        return job
+
+    def submit_prepared(self, query, params=None, page_size=500):
+        """Run a parameterised query as a server-side prepared statement on the worker pool.
+
+        The statement is prepared once per pooled connection and reused, so
+        repeated lookups skip parsing and planning. The job's future resolves
+        to an in-memory ResultStream, or to {"rowcount": n} for statements
+        without rows.
+        """
+        job = QueryJob(query, params)
+        job.future = self.executor.submit(self._run_prepared, job, page_size)
+        return job
+
+    def _run_prepared(self, job, page_size):
+        with self.pooled_connection() as connection:
+            job.connection_id = connection.connection_id
+            if job.cancelled:
+                raise QueryCancelled()
+            try:
+                cursor = self._prepared_cursor(connection, job.query)
+                try:
+                    with self.query_latency.labels("prepared").time():
+                        cursor.execute(job.query, job.params)
+                except mysql.connector.Error as e:
+                    if e.errno != errorcode.ER_UNKNOWN_STMT_HANDLER:
+                        raise
+                    # The server dropped the statement (e.g. the session was reset), prepare it again
+                    self._forget_prepared(connection)
+                    cursor = self._prepared_cursor(connection, job.query)
+                    cursor.execute(job.query, job.params)
+                if not cursor.with_rows:
+                    connection.commit()
+                    self.query_cache.note_statement(job.query)
+                    return {"rowcount": cursor.rowcount}
+                rows = cursor.fetchall()
+                self.query_cache.note_statement(job.query)
+                return ResultStream.from_rows(self, job, page_size, cursor.column_names, rows)
+            except mysql.connector.Error as e:
+                if job.cancelled and e.errno == errorcode.ER_QUERY_INTERRUPTED:
+                    raise QueryCancelled() from e
+                if not connection.is_connected():
+                    self._forget_prepared(connection)
+                raise
+
+    def _prepared_cursor(self, connection, query):
+        """The cached prepared cursor for `query` on this connection, preparing it on first use."""
+        # The pooled wrapper is new on every checkout, the connection underneath is not
+        raw_connection = getattr(connection, "_cnx", connection)
+        with self._prepared_lock:
+            cursors = self._prepared.setdefault(raw_connection, OrderedDict())
+        cursor = cursors.get(query)
+        if cursor is not None:
+            cursors.move_to_end(query)
+            return cursor
+        cursor = connection.cursor(prepared=True)
+        cursors[query] = cursor
+        while len(cursors) > self.prepared_cache_size:
+            _, evicted = cursors.popitem(last=False)
+            self._close_cursor(evicted)  # Deallocates the statement on the server
+        return cursor
+
+    def _forget_prepared(self, connection):
+        raw_connection = getattr(connection, "_cnx", connection)
+        with self._prepared_lock:
+            cursors = self._prepared.pop(raw_connection, None)
+        for cursor in (cursors or {}).values():
+            self._close_cursor(cursor)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+
+    def _open_stream_job(self, job, page_size):
+        cached = self.query_cache.get(job.query, job.params)
+        if cached:
+            return ResultStream.from_rows(self, job, page_size, *cached)
+        stream = ResultStream(self, job, page_size, self.result_max_rows)
+        try:
+            return stream.open()
+        except mysql.connector.Error as e:
+            if job.cancelled and e.errno == errorcode.ER_QUERY_INTERRUPTED:
+                raise QueryCancelled() from e
+            raise
+
+    def submit_export(self, table, path, file_format="csv", progress=None):
+        """Export a table on the worker pool; returns a QueryJob whose future resolves to the row count."""
+        job = QueryJob(f"SELECT * FROM {self.quote_table(table)}")
+        job.future = self.executor.submit(self.export_table, table, path, file_format, progress, job)
+        return job
+
+    def submit_import(self, table, path, file_format="csv", progress=None, use_load_data=False):
+        """Import a file on the worker pool; returns a QueryJob whose future resolves to the row count."""
+        job = QueryJob(f"INSERT INTO {self.quote_table(table)}")
+        job.future = self.executor.submit(self.import_table, table, path, file_format, progress, use_load_data, job)
+        return job
+
+    @staticmethod
+    def quote_table(table):
+        """Backtick-quote a table name (optionally schema.table), rejecting anything that isn't an identifier."""
+        parts = table.split(".")
+        if not all(re.fullmatch(r"[A-Za-z0-9_$]+", part) for part in parts):
+            raise ValueError(f"Invalid table name: {table}")
+        return ".".join(f"`{part}`" for part in parts)
+
+    def export_table(self, table, path, file_format="csv", progress=None, job=None):
+        """Stream every row of a table into a CSV or Parquet file in fetchmany chunks.
+
+        progress(rows_done, estimated_total) is called after every chunk from
+        the calling thread. Returns the number of rows written.
+        """
+        job = job or QueryJob(f"SELECT * FROM {self.quote_table(table)}")
+        if file_format == "parquet" and pa is None:
+            raise RuntimeError("Parquet export needs the pyarrow package.")
+        estimated_total = self._estimate_rows(table)
+
+        with self.dedicated_connection() as connection:
+            job.connection_id = connection.connection_id
+            binary_columns = self._binary_columns(connection, table) if file_format == "csv" else set()
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(job.query)
+                columns = list(cursor.column_names)
+                if file_format == "parquet":
+                    self._write_parquet(cursor, columns, path, job, progress, estimated_total)
+                else:
+                    self._write_csv(cursor, columns, binary_columns, path, job, progress, estimated_total)
+            except mysql.connector.Error as e:
+                if job.cancelled and e.errno == errorcode.ER_QUERY_INTERRUPTED:
+                    raise QueryCancelled() from e
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    pass
+        return job.rows_fetched
+
+    def _write_csv(self, cursor, columns, binary_columns, path, job, progress, estimated_total):
+        binary = [column in binary_columns for column in columns]
+        with open(path, "w", newline="", encoding="utf-8", buffering=1024 * 1024) as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(columns)
+            for rows in self._iter_batches(cursor, job):
+                writer.writerows(
+                    [
+                        CSV_NULL if value is None else value.hex() if is_binary else value
+                        for value, is_binary in zip(row, binary)
+                    ]
+                    for row in rows
+                )
+                if progress:
+                    progress(job.rows_fetched, estimated_total)
+
+    def _write_parquet(self, cursor, columns, path, job, progress, estimated_total):
+        writer = None
+        try:
+            for rows in self._iter_batches(cursor, job):
+                arrays = [pa.array([row[index] for row in rows]) for index in range(len(columns))]
+                if writer is None:
+                    # Columns that are all NULL in the first chunk would infer a null type, store them as text
+                    schema = pa.schema([
+                        (name, pa.string() if pa.types.is_null(array.type) else array.type)
+                        for name, array in zip(columns, arrays)
+                    ])
+                    writer = pq.ParquetWriter(path, schema)
+                batch = pa.Table.from_arrays(
+                    [array.cast(field.type) for array, field in zip(arrays, writer.schema)],
+                    schema=writer.schema
+                )
+                writer.write_table(batch)
+                if progress:
+                    progress(job.rows_fetched, estimated_total)
+            if writer is None:
+                pq.write_table(pa.table({name: pa.array([], pa.string()) for name in columns}), path)
         finally:
-            cursor.close()  # Ensure the cursor is closed after execution
+            if writer is not None:
+                writer.close()
 
+    def _iter_batches(self, cursor, job):
+        while True:
+            if job.cancelled:
+                # Stop the server streaming the rest before the connection goes back to the pool
+                self.kill_connection_query(job.connection_id)
+                try:
+                    cursor.fetchall()
+                except mysql.connector.Error:
+                    pass
+                raise QueryCancelled()
+            rows = cursor.fetchmany(self.transfer_batch_size)
+            if not rows:
+                return
+            job.rows_fetched += len(rows)
+            yield rows
 
-    def clear_unread_results(self):
-        """Clear any unread results in the connection."""
+    def import_table(self, table, path, file_format="csv", progress=None, use_load_data=False, job=None):
+        """Load a CSV or Parquet file into an existing table.
+
+        Rows go in with batched executemany and are committed every
+        transfer_transaction_rows rows. For CSV, use_load_data hands the whole
+        file to LOAD DATA LOCAL INFILE instead, which is faster but needs
+        local_infile enabled on the server. Returns the number of rows loaded.
+        """
+        job = job or QueryJob(f"INSERT INTO {self.quote_table(table)}")
+        if file_format == "parquet" and pa is None:
+            raise RuntimeError("Parquet import needs the pyarrow package.")
+        if use_load_data and file_format == "csv":
+            return self._load_data_infile(table, path, job)
+
+        batches = self._read_parquet(path) if file_format == "parquet" else self._read_csv(path)
+        with self.dedicated_connection() as connection:
+            job.connection_id = connection.connection_id
+            # Parquet keeps bytes as bytes; CSV files carry binary columns hex-encoded
+            binary_columns = self._binary_columns(connection, table) if file_format == "csv" else set()
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+                uncommitted = 0
+                insert = None
+                for columns, rows, fraction in batches:
+                    if job.cancelled:
+                        connection.rollback()
+                        raise QueryCancelled()
+                    if insert is None:
+                        column_list = ", ".join(f"`{column}`" for column in columns)
+                        placeholders = ", ".join(["%s"] * len(columns))
+                        insert = f"INSERT INTO {self.quote_table(table)} ({column_list}) VALUES ({placeholders})"
+                        binary = [index for index, column in enumerate(columns) if column in binary_columns]
+                    if binary:
+                        for row in rows:
+                            for index in binary:
+                                if row[index] is not None:
+                                    row[index] = bytes.fromhex(row[index])
+                    cursor.executemany(insert, rows)
+                    job.rows_fetched += len(rows)
+                    uncommitted += len(rows)
+                    if uncommitted >= self.transfer_transaction_rows:
+                        connection.commit()
+                        uncommitted = 0
+                    if progress:
+                        progress(job.rows_fetched, fraction)
+                connection.commit()
+                self.query_cache.invalidate_tables({table.split(".")[-1].lower()})
+            except mysql.connector.Error as e:
+                if job.cancelled and e.errno == errorcode.ER_QUERY_INTERRUPTED:
+                    connection.rollback()
+                    raise QueryCancelled() from e
+                raise
+            finally:
+                try:
+                    cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+                    cursor.close()
+                except mysql.connector.Error:
+                    pass
+        return job.rows_fetched
+
+    def _read_csv(self, path):
+        """Yield (columns, rows, fraction_of_file_read) batches from a CSV file written by export_table."""
+        total_bytes = os.path.getsize(path) or 1
+        with open(path, newline="", encoding="utf-8", buffering=1024 * 1024) as csv_file:
+            reader = csv.reader(csv_file)
+            columns = next(reader)
+            rows = []
+            for row in reader:
+                rows.append([None if value == CSV_NULL else value for value in row])
+                if len(rows) >= self.transfer_batch_size:
+                    yield columns, rows, min(1.0, csv_file.buffer.tell() / total_bytes)
+                    rows = []
+            if rows:
+                yield columns, rows, 1.0
+
+    def _read_parquet(self, path):
+        parquet_file = pq.ParquetFile(path)
+        total_rows = parquet_file.metadata.num_rows or 1
+        columns = parquet_file.schema_arrow.names
+        done = 0
+        for batch in parquet_file.iter_batches(batch_size=self.transfer_batch_size):
+            rows = [tuple(record.values()) for record in batch.to_pylist()]
+            done += len(rows)
+            yield columns, rows, done / total_rows
+
+    def _load_data_infile(self, table, path, job):
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            columns = next(csv.reader(csv_file))
+        # LOAD DATA LOCAL needs a connection opened with allow_local_infile, so the pool can't be used
+        with self.dedicated_connection(allow_local_infile=True) as connection:
+            job.connection_id = connection.connection_id
+            binary_columns = self._binary_columns(connection, table)
+            # Read every field into a variable so the \N NULL marker can be mapped back without
+            # enabling backslash escapes, which would mangle backslashes in the data
+            variables = ", ".join(f"@v{index}" for index in range(len(columns)))
+            assignments = ", ".join(
+                f"`{column}` = UNHEX(NULLIF(@v{index}, '\\\\N'))" if column in binary_columns
+                else f"`{column}` = NULLIF(@v{index}, '\\\\N')"
+                for index, column in enumerate(columns)
+            )
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.quote_table(table)} CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                    "LINES TERMINATED BY '\\r\\n' IGNORE 1 LINES "
+                    f"({variables}) SET {assignments}",
+                    (os.path.abspath(path),)
+                )
+                job.rows_fetched = cursor.rowcount
+                connection.commit()
+                self.query_cache.invalidate_tables({table.split(".")[-1].lower()})
+                return job.rows_fetched
+            except mysql.connector.Error as e:
+                if job.cancelled and e.errno == errorcode.ER_QUERY_INTERRUPTED:
+                    raise QueryCancelled() from e
+                raise
+            finally:
+                cursor.close()
+
+    def _binary_columns(self, connection, table):
+        """Names of a table's BINARY/VARBINARY/BLOB columns, which CSV files store as hex."""
+        parts = table.split(".")
+        schema = parts[0] if len(parts) == 2 else self.connection_config["database"]
+        cursor = connection.cursor()
         try:
-            cursor = self.connection.cursor()
-            while self.connection.unread_result:
-                cursor.fetchall()  # Fetch and discard unread results
-            self.log_to_textbox("Cleared unread results.")
+            cursor.execute(
+                "SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                (schema, parts[-1])
+            )
+            return {column for column, data_type in cursor.fetchall() if data_type.lower() in BINARY_TYPES}
+        finally:
+            cursor.close()
+
+    def _estimate_rows(self, table):
+        """Cheap row-count estimate from information_schema, or None."""
+        parts = table.split(".")
+        schema = parts[0] if len(parts) == 2 else self.connection_config["database"]
+        try:
+            with self.pooled_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                    (schema, parts[-1])
+                )
+                row = cursor.fetchone()
+                cursor.close()
+                return row[0] if row else None
+        except mysql.connector.Error:
+            return None
+
+    def cancel_query(self, job):
+        """Cancel a submitted query. A running statement is stopped with KILL QUERY from a separate connection."""
+        job.cancelled = True
+        if job.future.cancel():
+            return  # It never started
+        # KILL needs a round trip, keep it off the caller's (usually the Tk) thread
+        threading.Thread(target=self._kill_query, args=(job,), daemon=True).start()
+
+    def _kill_query(self, job):
+        if job.connection_id is None or job.future.done():
+            return
+        self.kill_connection_query(job.connection_id)
+
+    def kill_connection_query(self, connection_id):
+        """Stop whatever statement a server connection is running."""
+        try:
+            # A dedicated connection so a cancel still works when every pooled connection is busy
+            connection = mysql.connector.connect(**self.connection_config)
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f"KILL QUERY {int(connection_id)}")
+                cursor.close()
+            finally:
+                connection.close()
         except mysql.connector.Error as e:
-            self.log_error_to_textbox(f"Error while clearing unread results: {e}")
+            self.logger.error(f"Failed to cancel query on connection {connection_id}: {e}")
+
+    def clear_unread_results(self):
+        """Pooled connections are fully read before they go back to the pool, so there is nothing to clear."""
+        self.log_to_textbox("Cleared unread results.")
 
     def log_to_textbox(self, message, is_error=False):
         """Log message to the appropriate text box (results or error_log)."""
         if self.gui:
+            # Widgets may only be touched from the Tk thread
+            if threading.current_thread() is not threading.main_thread():
+                self.gui.call_on_ui_thread(self.log_to_textbox, message, is_error)
+                return
             if is_error:
                 # Log errors in the error log tab
-                self.gui.error_log_text.insert(tk.END, message + "\n")
-                self.gui.error_log_text.see(tk.END)  # Scroll to the end
+                self.gui.error_log_text.insert("end", message + "\n")
+                self.gui.error_log_text.see("end")  # Scroll to the end
             else:
                 # Log regular results in the main result text box
-                self.gui.result_text.insert(tk.END, message + "\n")
-                self.gui.result_text.see(tk.END)  # Scroll to the end
+                self.gui.result_text.insert("end", message + "\n")
+                self.gui.result_text.see("end")  # Scroll to the end
 
     def log_to_error_log(self, message):
         """Log message to the Errors/Logs tab."""
         # Log messages directly to the error_log_text widget
         if hasattr(self, 'error_log_text'):
-            self.error_log_text.insert(tk.END, message + "\n")
-            self.error_log_text.see(tk.END)  # Scroll to the end
+            self.error_log_text.insert("end", message + "\n")
+            self.error_log_text.see("end")  # Scroll to the end
         else:
             print(f"Error: {message}")  # Fallback logging to the console if the widget is missing
 
 
     def is_connected(self):
-        """Check if the connection to the database is still active."""
-        if self.connection:
-            return self.connection.is_connected()
-        return False
+        """Check if the database is reachable through the pool."""
+        if self.pool is None:
+            return False
+        # If every connection is checked out the pool is clearly in use
+        if not self._slots.acquire(blocking=False):
+            return True
+        try:
+            connection = self.pool.get_connection()
+            try:
+                return connection.is_connected()
+            finally:
+                connection.close()
+        except mysql.connector.Error:
+            return False
+        finally:
+            self._slots.release()
 
     def close(self):
-        """Close the connection."""
-        if self.connection:
+        """Disconnect the pool's idle connections and forget the pool.
+
+        Connections still checked out are disconnected when they are released.
+        """
+        if self.pool:
+            pool, self.pool = self.pool, None
+            with self._prepared_lock:
+                self._prepared.clear()
+            idle = []
+            try:
+                # Take every idle connection out of the pool; PoolError means none are left
+                for _ in range(self.pool_size):
+                    idle.append(pool.get_connection())
+            except mysql.connector.Error:
+                pass
             try:
-                self.connection.close()
+                for connection in idle:
+                    connection.disconnect()
                 self.log_to_textbox("Database connection closed.")
             except mysql.connector.Error as e:
-                self.log_error_to_textbox(f"Error while closing the connection: {e}")
+                self.log_to_textbox(f"Error while closing the connection: {e}", is_error=True)
 
     def clear_query(self):
-        """Clear the SQL query text box and any unread results."""
+        """Clear the SQL query text box."""
         if self.gui and hasattr(self.gui, 'query_text'):
-            self.gui.query_text.delete("1.0", tk.END)  # Clear the input box
+            self.gui.query_text.delete("1.0", "end")  # Clear the input box
 
-        # Clear unread results if there are any
-        if self.connection and self.connection.unread_result:
-            cursor = self.connection.cursor()
-            cursor.fetchall()  # Fetch and discard any unread results
-            self.log_to_textbox("Unread results cleared.", is_error=False)
-        else:
-            self.log_to_textbox("No unread results to clear.", is_error=False)
+        # Results are always fully read before a pooled connection is returned
+        self.log_to_textbox("No unread results to clear.", is_error=False)
 
         self.log_to_textbox("Query input cleared.", is_error=False)
@@ -0,0 +1,101 @@
+import threading
+import logging
+
+
+class SQLStatusController:
+    """Owns the SQL tab's connection status icon.
+
+    A background thread probes the database every `probe_interval` seconds,
+    so the ping never runs on the Tk thread, and posts to the UI only when the
+    connected state actually changes. The icon animation runs on exactly one
+    after() timer that is only ever rescheduled by itself, and only changes
+    frames while the icon is on screen. Frames are loaded with
+    load_frames(connected) the first time they are shown. Every set_state()
+    and probe_now() starts a new generation, and a probe result from an older
+    generation is dropped, so a ping that started before a connect or
+    disconnect can't flip the icon back.
+    """
+
+    def __init__(self, root, sql_manager, icon_label, load_frames, call_on_ui_thread,
+                 probe_interval=5, frame_ms=160, on_change=None):
+        self.root = root
+        self.sql_manager = sql_manager
+        self.icon_label = icon_label
+        self.load_frames = load_frames
+        self.frames = {}  # connected -> list of PhotoImages, filled on first use
+        self.call_on_ui_thread = call_on_ui_thread  # Hands probe results to the Tk thread
+        self.probe_interval = probe_interval
+        self.frame_ms = frame_ms
+        self.on_change = on_change  # on_change(connected), called on the Tk thread
+        self.connected = False
+        self.generation = 0  # Bumped on the Tk thread whenever a probe in flight may be out of date
+        self.frame_index = 0
+        self._after_id = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        """Start the probe thread and the animation timer."""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.frame_ms, self._animate)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._probe_loop, daemon=True, name="SQLStatusProbe")
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def probe_now(self):
+        """Re-check the connection right away, e.g. after connecting or disconnecting."""
+        self.generation += 1
+        self._wake.set()
+
+    def set_state(self, connected):
+        """Switch the icon to the connected or disconnected animation. No-op if the state is unchanged."""
+        self.generation += 1
+        if connected == self.connected:
+            return
+        self.connected = connected
+        self.frame_index = 0
+        if self.on_change:
+            self.on_change(connected)
+
+    def _animate(self):
+        if self.icon_label.winfo_viewable():
+            frames = self.frames.get(self.connected)
+            if frames is None:
+                try:
+                    frames = self.load_frames(self.connected)
+                except Exception as e:
+                    self.logger.error(f"Error loading status icons: {e}")
+                    frames = []
+                self.frames[self.connected] = frames
+            if frames:
+                self.icon_label.config(image=frames[self.frame_index % len(frames)])
+                self.frame_index = (self.frame_index + 1) % len(frames)
+        self._after_id = self.root.after(self.frame_ms, self._animate)
+
+    def _apply_probe(self, connected, generation):
+        if generation == self.generation:
+            self.set_state(connected)
+
+    def _probe_loop(self):
+        while not self._stop_event.is_set():
+            # Clear before probing so a probe_now() during the ping triggers another one straight after
+            self._wake.clear()
+            generation = self.generation
+            try:
+                connected = self.sql_manager.is_connected()
+            except Exception as e:
+                self.logger.error(f"SQL status probe failed: {e}")
+                connected = False
+            if connected != self.connected:
+                self.call_on_ui_thread(self._apply_probe, connected, generation)
+            self._wake.wait(self.probe_interval)
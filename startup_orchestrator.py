@@ -0,0 +1,183 @@
+import re
+import socket
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupOrchestrator:
+    """Start a set of servers in dependency order, in parallel where possible.
+
+    Each server is launched as soon as all of its dependencies are ready.
+    Readiness comes from the server's readiness config: a regex matched against
+    its output (`log_pattern`) and/or a TCP port accepting connections (`port`).
+    Servers without a readiness signal count as ready once launched. A
+    dependency cycle is reported before anything is launched, and the servers
+    on it (and everything waiting on them) are not started.
+    """
+
+    def __init__(self, server_manager, dependencies=None, readiness=None, ready_timeout=30):
+        self.server_manager = server_manager
+        self.dependencies = dependencies or {}  # server name -> servers it depends on
+        self.readiness = readiness or {}  # server name -> {"log_pattern": ..., "port": ..., "host": ...}
+        self.ready_timeout = ready_timeout
+        self.logger = logging.getLogger(__name__)
+        # server name -> (status, seconds to ready); status is "ready", "running", "timeout", "failed",
+        # "skipped" (a dependency failed) or "cycle", and seconds is only set for "ready"
+        self.last_report = {}
+
+    def start_all(self, server_names, output_callback, on_complete=None):
+        """Start the servers on a background thread; output_callback(server_name, message) gets progress."""
+        thread = threading.Thread(
+            target=self._run, args=(list(server_names), output_callback, on_complete), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _run(self, server_names, output_callback, on_complete):
+        ready_events = {name: threading.Event() for name in server_names}
+        results = {}
+        started_at = time.monotonic()
+
+        cycle = self.find_cycle(server_names)
+        if cycle:
+            message = f"Dependency cycle: {' -> '.join(cycle)}. Not starting {', '.join(sorted(set(cycle)))}."
+            self.logger.error(message)
+            for server_name in set(cycle):
+                output_callback(server_name, message)
+                results[server_name] = ("cycle", None)
+                ready_events[server_name].set()
+
+        def launch(server_name):
+            try:
+                results[server_name] = self._launch(server_name, ready_events, results, output_callback)
+            except Exception as e:
+                self.logger.error(f"Startup of {server_name} failed: {e}")
+                results[server_name] = ("failed", None)
+            finally:
+                ready_events[server_name].set()
+
+        # One short-lived worker per server so independent servers come up in parallel
+        with ThreadPoolExecutor(max_workers=max(1, len(server_names))) as pool:
+            for server_name in server_names:
+                if server_name not in results:
+                    pool.submit(launch, server_name)
+
+        total = time.monotonic() - started_at
+        self.last_report = results
+        summary = ", ".join(
+            f"{name}: {status if seconds is None else f'{seconds:.2f}s'}" for name, (status, seconds) in results.items()
+        )
+        self.logger.info(f"Cluster startup finished in {total:.2f}s ({summary})")
+        if on_complete:
+            on_complete(results, total)
+
+    def find_cycle(self, server_names):
+        """A dependency cycle among `server_names` as [a, b, ..., a], or None.
+
+        Kahn's topological sort removes every server whose dependencies can
+        all start first; whatever is left sits on or behind a cycle.
+        """
+        server_names = set(server_names)
+        depends_on = {
+            name: {dependency for dependency in self.dependencies.get(name, ()) if dependency in server_names}
+            for name in server_names
+        }
+        waiting = {name: len(dependencies) for name, dependencies in depends_on.items()}
+        dependents = {name: [] for name in server_names}
+        for name, dependencies in depends_on.items():
+            for dependency in dependencies:
+                dependents[dependency].append(name)
+        startable = [name for name, count in waiting.items() if count == 0]
+        while startable:
+            for dependent in dependents[startable.pop()]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    startable.append(dependent)
+        blocked = {name for name, count in waiting.items() if count}
+        if not blocked:
+            return None
+
+        # Every blocked server depends on another blocked one; follow those links until one repeats
+        path = [min(blocked)]
+        while path.count(path[-1]) < 2:
+            path.append(min(depends_on[path[-1]] & blocked))
+        return path[path.index(path[-1]):]
+
+    def _launch(self, server_name, ready_events, results, output_callback):
+        """Start one server once its dependencies are up; returns (status, seconds to ready)."""
+        # Wait for the dependencies that are part of this startup
+        for dependency in self.dependencies.get(server_name, ()):
+            if dependency not in ready_events:
+                continue
+            ready_events[dependency].wait()
+            if results.get(dependency, ("failed", None))[0] not in ("ready", "running", "timeout"):
+                output_callback(server_name, f"Not starting {server_name}: {dependency} did not become ready.")
+                return "skipped", None
+
+        if self.server_manager.is_server_running(server_name):
+            output_callback(server_name, f"{server_name} is already running.")
+            return "running", None
+
+        config = self.readiness.get(server_name, {})
+        pattern = re.compile(config["log_pattern"]) if config.get("log_pattern") else None
+        log_ready = threading.Event()
+
+        def watch_output(name, output_type, line):
+            if name == server_name and pattern.search(line):
+                log_ready.set()
+
+        # Register the watcher before launching so an early "ready" line isn't missed
+        if pattern:
+            self.server_manager.add_line_listener(watch_output)
+        try:
+            launched_at = time.monotonic()
+            process = self.server_manager.start_server(server_name, lambda line: output_callback(server_name, line))
+            if not process:
+                return "failed", None
+            output_callback(server_name, f"Started {server_name} with PID: {process.pid}")
+
+            ready = self._wait_until_ready(process, config, pattern, log_ready)
+            elapsed = time.monotonic() - launched_at
+        finally:
+            if pattern:
+                self.server_manager.remove_line_listener(watch_output)
+
+        if ready is None:
+            output_callback(server_name, f"{server_name} exited before becoming ready.")
+            return "failed", None
+        if not ready:
+            timeout = config.get("timeout", self.ready_timeout)
+            output_callback(server_name, f"{server_name} gave no ready signal within {timeout}s, continuing.")
+            return "timeout", None
+        output_callback(server_name, f"{server_name} ready in {elapsed:.2f}s")
+        return "ready", elapsed
+
+    def _wait_until_ready(self, process, config, pattern, log_ready):
+        """Return True when ready, False on timeout, None if the process died first."""
+        port = config.get("port")
+        host = config.get("host", "127.0.0.1")
+        if not pattern and not port:
+            return True
+
+        deadline = time.monotonic() + config.get("timeout", self.ready_timeout)
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return None
+            log_ok = log_ready.is_set() if pattern else True
+            port_ok = self._port_open(host, port) if port else True
+            if log_ok and port_ok:
+                return True
+            if log_ok:
+                time.sleep(0.1)
+            else:
+                log_ready.wait(0.1)
+        return False
+
+    def _port_open(self, host, port):
+        try:
+            with socket.create_connection((host, port), timeout=0.2):
+                return True
+        except OSError:
+            return False
@@ -0,0 +1,40 @@
+import re
+import unittest
+
+from log_view import LogIndex, scan
+
+
+class ScanTest(unittest.TestCase):
+    """scan() over the buffer must agree with the per-line search used for live lines."""
+
+    LINES = ["ERROR one", "line two", "ERROR three"]
+
+    def setUp(self):
+        self.index = LogIndex()
+        self.index.append(self.LINES)
+
+    def per_line(self, pattern):
+        return [line_id for line_id in range(self.index.base, self.index.end)
+                if pattern.search(self.index.line_bytes(line_id))]
+
+    def assert_agrees(self, regex, expected):
+        pattern = re.compile(regex)
+        scanned = list(scan(self.index.snapshot(), pattern, True, True, 0))
+        self.assertEqual(scanned, self.per_line(pattern))
+        self.assertEqual(scanned, expected)
+
+    def test_start_anchor_matches_every_line(self):
+        self.assert_agrees(rb"^ERROR", [0, 2])
+
+    def test_end_anchor_matches_inside_the_buffer(self):
+        self.assert_agrees(rb"two$", [1])
+
+    def test_match_does_not_cross_lines(self):
+        self.assert_agrees(rb"[^z]+three", [2])
+
+    def test_plain_text(self):
+        self.assert_agrees(rb"line", [1])
+
+
+if __name__ == "__main__":
+    unittest.main()